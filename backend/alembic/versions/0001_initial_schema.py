@@ -0,0 +1,207 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Pinned DDL: the tables as first released. Later model changes get their own
+# revisions; this one never follows the models.
+
+MOVIELANGUAGE = sa.Enum(
+    "TELUGU", "HINDI", "TAMIL", "KANNADA", "MALAYALAM", "ENGLISH", "MULTILINGUAL",
+    name="movielanguage"
+)
+MOVIESTATUS = sa.Enum(
+    "ANNOUNCED", "IN_PRODUCTION", "SHOOTING", "POST_PRODUCTION",
+    "TRAILER_RELEASED", "RELEASED", "COMPLETED", "CANCELLED",
+    name="moviestatus"
+)
+TRADETYPE = sa.Enum("BUY", "SELL", "SHORT", "COVER", name="tradetype")
+TRADESTATUS = sa.Enum("PENDING", "EXECUTED", "CANCELLED", "FAILED", name="tradestatus")
+PREDICTIONTYPE = sa.Enum(
+    "TRAILER_REACTION", "BOX_OFFICE", "OPENING_WEEKEND",
+    "LIFETIME_COLLECTION", "HYPE_SCORE", "REDDIT_SENTIMENT",
+    name="predictiontype"
+)
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("username", sa.String(50), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("first_name", sa.String(100)),
+        sa.Column("last_name", sa.String(100)),
+        sa.Column("phone", sa.String(20)),
+        sa.Column("telugu_name", sa.String(100)),
+        sa.Column("preferred_language", sa.String(10)),
+        sa.Column("voice_commands_enabled", sa.Boolean()),
+        sa.Column("initial_balance", sa.Float()),
+        sa.Column("current_balance", sa.Float()),
+        sa.Column("total_profit_loss", sa.Float()),
+        sa.Column("trading_score", sa.Integer()),
+        sa.Column("research_score", sa.Integer()),
+        sa.Column("clan_id", sa.String(36)),
+        sa.Column("clan_role", sa.String(50)),
+        sa.Column("reddit_username", sa.String(50)),
+        sa.Column("reddit_karma", sa.Integer()),
+        sa.Column("is_verified", sa.Boolean()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("is_premium", sa.Boolean()),
+        sa.Column("email_verified", sa.Boolean()),
+        sa.Column("phone_verified", sa.Boolean()),
+        sa.Column("notification_preferences", sa.JSON()),
+        sa.Column("trading_preferences", sa.JSON()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("last_login", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_users_clan_id", "users", ["clan_id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "movies",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("tmdb_id", sa.Integer()),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("original_title", sa.String(255)),
+        sa.Column("telugu_title", sa.String(255)),
+        sa.Column("language", MOVIELANGUAGE),
+        sa.Column("status", MOVIESTATUS),
+        sa.Column("genre", sa.JSON()),
+        sa.Column("runtime", sa.Integer()),
+        sa.Column("budget", sa.Float()),
+        sa.Column("production_company", sa.String(255)),
+        sa.Column("release_date", sa.DateTime(timezone=True)),
+        sa.Column("trailer_release_date", sa.DateTime(timezone=True)),
+        sa.Column("teaser_release_date", sa.DateTime(timezone=True)),
+        sa.Column("director", sa.JSON()),
+        sa.Column("cast", sa.JSON()),
+        sa.Column("producer", sa.JSON()),
+        sa.Column("star_actor", sa.String(100)),
+        sa.Column("heroine", sa.String(100)),
+        sa.Column("music_director", sa.String(100)),
+        sa.Column("cinematographer", sa.String(100)),
+        sa.Column("contract_symbol", sa.String(10), nullable=False),
+        sa.Column("initial_price", sa.Float()),
+        sa.Column("current_price", sa.Float()),
+        sa.Column("total_shares", sa.Integer()),
+        sa.Column("available_shares", sa.Integer()),
+        sa.Column("market_cap", sa.Float()),
+        sa.Column("volume_24h", sa.Float()),
+        sa.Column("price_change_24h", sa.Float()),
+        sa.Column("high_24h", sa.Float()),
+        sa.Column("low_24h", sa.Float()),
+        sa.Column("hype_score", sa.Float()),
+        sa.Column("reddit_sentiment", sa.Float()),
+        sa.Column("twitter_sentiment", sa.Float()),
+        sa.Column("trailer_reaction_score", sa.Float()),
+        sa.Column("predicted_opening_weekend", sa.Float()),
+        sa.Column("predicted_lifetime", sa.Float()),
+        sa.Column("actual_opening_weekend", sa.Float()),
+        sa.Column("actual_lifetime", sa.Float()),
+        sa.Column("is_fdfs_event", sa.Boolean()),
+        sa.Column("is_festival_release", sa.Boolean()),
+        sa.Column("is_clan_boosted", sa.Boolean()),
+        sa.Column("poster_url", sa.String(500)),
+        sa.Column("backdrop_url", sa.String(500)),
+        sa.Column("trailer_url", sa.String(500)),
+        sa.Column("synopsis", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("last_price_update", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_movies_contract_symbol", "movies", ["contract_symbol"], unique=True)
+    op.create_index("ix_movies_title", "movies", ["title"])
+    op.create_index("ix_movies_tmdb_id", "movies", ["tmdb_id"], unique=True)
+
+    op.create_table(
+        "trades",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("movie_id", sa.String(36), sa.ForeignKey("movies.id"), nullable=False),
+        sa.Column("trade_type", TRADETYPE, nullable=False),
+        sa.Column("status", TRADESTATUS),
+        sa.Column("shares", sa.Integer(), nullable=False),
+        sa.Column("price_per_share", sa.Float(), nullable=False),
+        sa.Column("total_amount", sa.Float(), nullable=False),
+        sa.Column("leverage", sa.Float()),
+        sa.Column("margin_required", sa.Float(), nullable=False),
+        sa.Column("margin_used", sa.Float(), nullable=False),
+        sa.Column("executed_at", sa.DateTime(timezone=True)),
+        sa.Column("execution_price", sa.Float()),
+        sa.Column("slippage", sa.Float()),
+        sa.Column("profit_loss", sa.Float()),
+        sa.Column("profit_loss_percentage", sa.Float()),
+        sa.Column("order_id", sa.String(36)),
+        sa.Column("notes", sa.Text()),
+        sa.Column("tags", sa.JSON()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_trades_movie_id", "trades", ["movie_id"])
+    op.create_index("ix_trades_user_id", "trades", ["user_id"])
+
+    op.create_table(
+        "portfolio",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("movie_id", sa.String(36), sa.ForeignKey("movies.id"), nullable=False),
+        sa.Column("shares_owned", sa.Integer()),
+        sa.Column("shares_shorted", sa.Integer()),
+        sa.Column("average_buy_price", sa.Float()),
+        sa.Column("average_sell_price", sa.Float()),
+        sa.Column("current_value", sa.Float()),
+        sa.Column("total_invested", sa.Float()),
+        sa.Column("unrealized_pnl", sa.Float()),
+        sa.Column("realized_pnl", sa.Float()),
+        sa.Column("total_return", sa.Float()),
+        sa.Column("return_24h", sa.Float()),
+        sa.Column("return_7d", sa.Float()),
+        sa.Column("return_30d", sa.Float()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("last_trade_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_portfolio_movie_id", "portfolio", ["movie_id"])
+    op.create_index("ix_portfolio_user_id", "portfolio", ["user_id"])
+
+    op.create_table(
+        "predictions",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("movie_id", sa.String(36), sa.ForeignKey("movies.id"), nullable=False),
+        sa.Column("prediction_type", PREDICTIONTYPE, nullable=False),
+        sa.Column("predicted_value", sa.Float(), nullable=False),
+        sa.Column("actual_value", sa.Float()),
+        sa.Column("confidence", sa.Float()),
+        sa.Column("accuracy_score", sa.Float()),
+        sa.Column("points_earned", sa.Integer()),
+        sa.Column("description", sa.Text()),
+        sa.Column("source", sa.String(100)),
+        sa.Column("tags", sa.JSON()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("expires_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_predictions_movie_id", "predictions", ["movie_id"])
+    op.create_index("ix_predictions_user_id", "predictions", ["user_id"])
+
+
+def downgrade():
+    for table in ("predictions", "portfolio", "trades", "movies", "users"):
+        op.drop_table(table)
+    for enum in (PREDICTIONTYPE, TRADESTATUS, TRADETYPE, MOVIESTATUS, MOVIELANGUAGE):
+        enum.drop(op.get_bind(), checkfirst=True)
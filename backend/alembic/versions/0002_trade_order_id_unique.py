@@ -0,0 +1,21 @@
+"""Unique (user_id, order_id) on trades for idempotent orders
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("uq_trades_user_order_id", "trades", ["user_id", "order_id"], unique=True)
+
+
+def downgrade():
+    op.drop_index("uq_trades_user_order_id", table_name="trades")
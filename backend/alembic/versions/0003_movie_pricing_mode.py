@@ -0,0 +1,24 @@
+"""Per-movie pricing mode and AMM liquidity
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("movies", sa.Column("pricing_mode", sa.String(20), server_default="order_book"))
+    op.add_column("movies", sa.Column("amm_liquidity", sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("movies", "amm_liquidity")
+    op.drop_column("movies", "pricing_mode")
@@ -0,0 +1,33 @@
+"""Market history for backtesting
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "market_history",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("movie_id", sa.String(36), sa.ForeignKey("movies.id"), nullable=False),
+        sa.Column("recorded_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("hype_score", sa.Float(), nullable=False),
+        sa.Column("reddit_sentiment", sa.Float(), nullable=False),
+        sa.Column("volume_24h", sa.Float(), nullable=True),
+    )
+    op.create_index("ix_market_history_movie_recorded", "market_history", ["movie_id", "recorded_at"])
+    op.create_index("ix_market_history_recorded_at", "market_history", ["recorded_at"])
+
+
+def downgrade():
+    op.drop_table("market_history")
@@ -0,0 +1,44 @@
+"""Append-only balance ledger and checkpoints
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "balance_ledger",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("balance_after", sa.Float(), nullable=False),
+        sa.Column("entry_type", sa.String(20), nullable=False),
+        sa.Column("reference_id", sa.String(36), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_balance_ledger_user_id_id", "balance_ledger", ["user_id", "id"])
+
+    op.create_table(
+        "balance_checkpoints",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("ledger_entry_id", sa.BigInteger(), nullable=False),
+        sa.Column("balance", sa.Float(), nullable=False),
+        sa.Column("drift", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_balance_checkpoints_user_entry", "balance_checkpoints", ["user_id", "ledger_entry_id"])
+
+
+def downgrade():
+    op.drop_table("balance_checkpoints")
+    op.drop_table("balance_ledger")
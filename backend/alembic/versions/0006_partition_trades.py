@@ -0,0 +1,74 @@
+"""Range-partition trades by created_at
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.trade_partitions import create_partition_sql, partitions_between, upcoming_partitions
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    op.execute("""
+        CREATE TABLE trade_order_keys (
+            user_id VARCHAR(36) NOT NULL,
+            order_id VARCHAR(36) NOT NULL,
+            trade_id VARCHAR(36) NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (user_id, order_id)
+        )
+    """)
+    op.execute("CREATE INDEX ix_trade_order_keys_created_at ON trade_order_keys (created_at)")
+
+    # Rebuild the heap table as a partitioned table and copy the rows over
+    op.execute("ALTER TABLE trades RENAME TO trades_heap")
+    op.execute("ALTER TABLE trades_heap RENAME CONSTRAINT trades_pkey TO trades_heap_pkey")
+    op.execute("UPDATE trades_heap SET created_at = COALESCE(executed_at, now()) WHERE created_at IS NULL")
+    op.execute("CREATE TABLE trades (LIKE trades_heap INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+    op.execute("ALTER TABLE trades ALTER COLUMN created_at SET NOT NULL")
+    op.execute("ALTER TABLE trades ADD CONSTRAINT trades_pkey PRIMARY KEY (id, created_at)")
+    op.execute("ALTER TABLE trades ADD FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute("ALTER TABLE trades ADD FOREIGN KEY (movie_id) REFERENCES movies (id)")
+    op.execute("CREATE INDEX ix_trades_user_created ON trades (user_id, created_at)")
+    op.execute("CREATE INDEX ix_trades_movie_created ON trades (movie_id, created_at)")
+
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM trades_heap")).scalar()
+    partitions = upcoming_partitions()
+    if oldest is not None and oldest < partitions[0].start:
+        partitions = partitions_between(oldest.date(), partitions[0].start.date()) + partitions[1:]
+    for partition in partitions:
+        op.execute(create_partition_sql(partition))
+
+    op.execute("INSERT INTO trades SELECT * FROM trades_heap")
+    op.execute("""
+        INSERT INTO trade_order_keys (user_id, order_id, trade_id, created_at)
+        SELECT user_id, order_id, id, created_at FROM trades_heap WHERE order_id IS NOT NULL
+        ON CONFLICT DO NOTHING
+    """)
+    op.execute("DROP TABLE trades_heap")
+
+
+def downgrade():
+    op.execute("ALTER TABLE trades RENAME TO trades_partitioned")
+    op.execute("ALTER TABLE trades_partitioned RENAME CONSTRAINT trades_pkey TO trades_partitioned_pkey")
+    op.execute("ALTER INDEX ix_trades_user_created RENAME TO ix_trades_partitioned_user_created")
+    op.execute("ALTER INDEX ix_trades_movie_created RENAME TO ix_trades_partitioned_movie_created")
+    op.execute("CREATE TABLE trades (LIKE trades_partitioned INCLUDING DEFAULTS)")
+    op.execute("ALTER TABLE trades ADD CONSTRAINT trades_pkey PRIMARY KEY (id)")
+    op.execute("ALTER TABLE trades ADD FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute("ALTER TABLE trades ADD FOREIGN KEY (movie_id) REFERENCES movies (id)")
+    op.execute("INSERT INTO trades SELECT * FROM trades_partitioned")
+    op.execute("CREATE INDEX ix_trades_user_id ON trades (user_id)")
+    op.execute("CREATE INDEX ix_trades_movie_id ON trades (movie_id)")
+    op.execute("CREATE UNIQUE INDEX uq_trades_user_order_id ON trades (user_id, order_id)")
+    op.execute("DROP TABLE trades_partitioned CASCADE")
+    op.execute("DROP TABLE trade_order_keys")
@@ -0,0 +1,79 @@
+"""Tournaments, enrolments, folded positions and round standings
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "tournaments",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("kind", sa.Enum("SANKRANTHI_BATTLE", "BATTLE_ROYALE", name="tournamentkind"), nullable=False),
+        sa.Column("status", sa.Enum("UPCOMING", "ACTIVE", "FINISHED", name="tournamentstatus"), nullable=True),
+        sa.Column("movie_ids", sa.JSON(), nullable=True),
+        sa.Column("starts_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("ends_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("round_minutes", sa.Integer(), nullable=True),
+        sa.Column("elimination_fraction", sa.Float(), nullable=True),
+        sa.Column("rounds_taken", sa.Integer(), nullable=True),
+        sa.Column("last_round_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("folded_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_tournaments_status", "tournaments", ["status"])
+
+    op.create_table(
+        "tournament_entries",
+        sa.Column("tournament_id", sa.String(36), sa.ForeignKey("tournaments.id"), primary_key=True),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("enrolled_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("eliminated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("eliminated_round", sa.Integer(), nullable=True),
+        sa.Column("final_rank", sa.Integer(), nullable=True),
+    )
+
+    op.create_table(
+        "tournament_positions",
+        sa.Column("tournament_id", sa.String(36), sa.ForeignKey("tournaments.id"), primary_key=True),
+        sa.Column("user_id", sa.String(36), primary_key=True),
+        sa.Column("movie_id", sa.String(36), primary_key=True),
+        sa.Column("cash", sa.Float(), nullable=False),
+        sa.Column("net_shares", sa.Integer(), nullable=False),
+    )
+
+    op.create_table(
+        "tournament_standings",
+        sa.Column("tournament_id", sa.String(36), sa.ForeignKey("tournaments.id"), primary_key=True),
+        sa.Column("round", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.String(36), primary_key=True),
+        sa.Column("pnl", sa.Float(), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("taken_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_tournament_standings_round_rank", "tournament_standings", ["tournament_id", "round", "rank"]
+    )
+
+    # Tiny block-range index: folding an hour of trades reads only that hour's pages
+    op.create_index("ix_trades_created_brin", "trades", ["created_at"], postgresql_using="brin")
+
+
+def downgrade():
+    op.drop_index("ix_trades_created_brin", table_name="trades")
+    op.drop_table("tournament_standings")
+    op.drop_table("tournament_positions")
+    op.drop_table("tournament_entries")
+    op.drop_table("tournaments")
+    op.execute("DROP TYPE IF EXISTS tournamentstatus")
+    op.execute("DROP TYPE IF EXISTS tournamentkind")
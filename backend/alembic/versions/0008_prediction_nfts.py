@@ -0,0 +1,50 @@
+"""Prediction NFTs and per-movie NFT supply counter
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("movies", sa.Column("nft_supply_used", sa.Integer(), nullable=False, server_default="0"))
+
+    op.create_table(
+        "nfts",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("movie_id", sa.String(36), sa.ForeignKey("movies.id"), nullable=False),
+        sa.Column("owner_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("prediction_id", sa.String(36), sa.ForeignKey("predictions.id"), nullable=True, unique=True),
+        sa.Column("serial", sa.Integer(), nullable=False),
+        sa.Column(
+            "status", sa.Enum("QUEUED", "SUBMITTED", "MINTED", "FAILED", name="nftstatus"), nullable=False
+        ),
+        sa.Column("fee_paid", sa.Float(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=True),
+        sa.Column("batch_id", sa.String(36), nullable=True),
+        sa.Column("tx_hash", sa.String(100), nullable=True),
+        sa.Column("token_id", sa.BigInteger(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("token_metadata", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("submitted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("minted_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("uq_nfts_movie_serial", "nfts", ["movie_id", "serial"], unique=True)
+    op.create_index("ix_nfts_status_created", "nfts", ["status", "created_at"])
+    op.create_index("ix_nfts_owner_id", "nfts", ["owner_id"])
+    op.create_index("ix_nfts_batch_id", "nfts", ["batch_id"])
+
+
+def downgrade():
+    op.drop_table("nfts")
+    op.execute("DROP TYPE IF EXISTS nftstatus")
+    op.drop_column("movies", "nft_supply_used")
@@ -0,0 +1,27 @@
+"""Trades already folded into tournament positions
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "tournament_folded_trades",
+        sa.Column("tournament_id", sa.String(36), sa.ForeignKey("tournaments.id"), primary_key=True),
+        sa.Column("trade_id", sa.String(36), primary_key=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("tournament_folded_trades")
@@ -0,0 +1,26 @@
+"""AMM pool reserves on the movie row
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("movies", sa.Column("amm_shares_reserve", sa.Float(), nullable=True))
+    op.add_column("movies", sa.Column("amm_cash_reserve", sa.Float(), nullable=True))
+    op.add_column("movies", sa.Column("amm_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade():
+    op.drop_column("movies", "amm_version")
+    op.drop_column("movies", "amm_cash_reserve")
+    op.drop_column("movies", "amm_shares_reserve")
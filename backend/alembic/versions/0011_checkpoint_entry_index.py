@@ -0,0 +1,21 @@
+"""Index checkpoints by ledger entry, so a run finds where the last one stopped
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_balance_checkpoints_entry", "balance_checkpoints", ["ledger_entry_id"])
+
+
+def downgrade():
+    op.drop_index("ix_balance_checkpoints_entry", table_name="balance_checkpoints")
@@ -0,0 +1,46 @@
+"""
+CineStox Internal Router
+Per-worker operational metrics, for admins only
+"""
+
+from fastapi import APIRouter, Depends
+
+from app.core.scheduler import scheduler
+from app.core.security import require_admin
+from app.services.memes import meme_renderer
+from app.services.nft_minting import minting_pipeline
+from app.services.price_board_updater import price_board_updater
+from app.services.settlement import settlement_pipeline
+
+# Every route here requires an admin
+internal_router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@internal_router.get("/jobs")
+async def job_metrics():
+    """Per-job runtime metrics of the in-app scheduler on this replica"""
+    return {"instance": scheduler.instance, "jobs": scheduler.metrics()}
+
+
+@internal_router.get("/settlement")
+async def settlement_metrics():
+    """Group-commit settlement counters for this worker"""
+    return settlement_pipeline.stats()
+
+
+@internal_router.get("/nft-minting")
+async def nft_minting_metrics():
+    """Batched minting counters for this worker"""
+    return minting_pipeline.stats()
+
+
+@internal_router.get("/memes")
+async def meme_metrics():
+    """Meme cache and render counters for this worker"""
+    return meme_renderer.stats()
+
+
+@internal_router.get("/price-board")
+async def price_board_metrics():
+    """Price board updater role and last publish for this worker"""
+    return price_board_updater.stats()
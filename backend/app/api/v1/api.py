@@ -2,87 +2,61 @@
 CineStox Main API Router
 """
 
-from fastapi import APIRouter
-from app.api.v1.endpoints import (
-    auth,
-    users,
-    movies,
-    trading,
-    portfolio,
-    predictions,
-    clans,
-    reddit,
-    telugu,
-    nft,
-    analytics
-)
+from fastapi import APIRouter, Depends
+from importlib import import_module
+
+from app.core.config import settings
+from app.core.rate_limit import admission_control
+from app.core.startup import LazyRouterApp
+
+# Endpoint modules with their prefixes and tags
+ENDPOINTS = [
+    ("auth", "/auth", ["Authentication"]),
+    ("users", "/users", ["Users"]),
+    ("movies", "/movies", ["Movies"]),
+    ("trading", "/trading", ["Trading"]),
+    ("portfolio", "/portfolio", ["Portfolio"]),
+    ("predictions", "/predictions", ["Predictions"]),
+    ("clans", "/clans", ["Clans"]),
+    ("reddit", "/reddit", ["Reddit Integration"]),
+    ("telugu", "/telugu", ["Telugu Features"]),
+    ("fdfs", "/fdfs", ["FDFS Hype Zones"]),
+    ("tournaments", "/tournaments", ["Tournaments"]),
+    ("nft", "/nft", ["NFT Marketplace"]),
+    ("memes", "/memes", ["Stonk Memes"]),
+    ("analytics", "/analytics", ["Analytics"]),
+    ("backtest", "/backtest", ["Backtesting"]),
+]
+
+# Extra dependencies applied to every route of an endpoint module
+ENDPOINT_DEPENDENCIES = {
+    "trading": [Depends(admission_control)],
+    "predictions": [Depends(admission_control)],
+}
 
 # Main API router
 api_router = APIRouter()
 
-# Include all endpoint routers
-api_router.include_router(
-    auth.router,
-    prefix="/auth",
-    tags=["Authentication"]
-)
-
-api_router.include_router(
-    users.router,
-    prefix="/users",
-    tags=["Users"]
-)
-
-api_router.include_router(
-    movies.router,
-    prefix="/movies",
-    tags=["Movies"]
-)
-
-api_router.include_router(
-    trading.router,
-    prefix="/trading",
-    tags=["Trading"]
-)
-
-api_router.include_router(
-    portfolio.router,
-    prefix="/portfolio",
-    tags=["Portfolio"]
-)
-
-api_router.include_router(
-    predictions.router,
-    prefix="/predictions",
-    tags=["Predictions"]
-)
+# Endpoint modules deferred until first request (fast-startup mode only)
+lazy_endpoints = []
 
-api_router.include_router(
-    clans.router,
-    prefix="/clans",
-    tags=["Clans"]
-)
-
-api_router.include_router(
-    reddit.router,
-    prefix="/reddit",
-    tags=["Reddit Integration"]
-)
-
-api_router.include_router(
-    telugu.router,
-    prefix="/telugu",
-    tags=["Telugu Features"]
-)
-
-api_router.include_router(
-    nft.router,
-    prefix="/nft",
-    tags=["NFT Marketplace"]
-)
-
-api_router.include_router(
-    analytics.router,
-    prefix="/analytics",
-    tags=["Analytics"]
-) 
\ No newline at end of file
+# Include all endpoint routers
+for name, prefix, tags in ENDPOINTS:
+    dependencies = ENDPOINT_DEPENDENCIES.get(name, [])
+    if settings.FAST_STARTUP and name in settings.LAZY_ROUTERS:
+        lazy_endpoints.append((prefix, LazyRouterApp(f"app.api.v1.endpoints.{name}", dependencies)))
+        continue
+
+    module = import_module(f"app.api.v1.endpoints.{name}")
+    api_router.include_router(
+        module.router,
+        prefix=prefix,
+        tags=tags,
+        dependencies=dependencies
+    )
+
+
+def mount_lazy_endpoints(app, prefix: str = ""):
+    """Mount lazily-loaded endpoint modules on the application"""
+    for endpoint_prefix, lazy_app in lazy_endpoints:
+        app.mount(f"{prefix}{endpoint_prefix}", lazy_app)
@@ -0,0 +1,70 @@
+"""
+CineStox Backtesting API Endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+import asyncio
+import logging
+
+from app.core.database import get_read_db
+from app.core.security import get_current_user_id
+from app.schemas.backtest import BacktestRequest, BacktestResult, BacktestSweepRequest, BacktestWindow
+from app.services.backtest import BacktestTooLarge, HistoryArrays, load_history, run_backtest, run_sweep
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def _load_window(db: AsyncSession, window: BacktestWindow) -> HistoryArrays:
+    if window.end <= window.start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    try:
+        return await load_history(db, window.start, window.end, window.interval_minutes, window.movie_ids)
+    except BacktestTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+@router.post("/run", response_model=BacktestResult)
+async def backtest_strategy(
+    request: BacktestRequest,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Backtest one strategy rule over historical price, hype and sentiment
+    """
+    data = await _load_window(db, request)
+    try:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, run_backtest, data, request.rule.model_dump(mode="json"))
+        return BacktestResult(**result)
+
+    except Exception as e:
+        logger.error(f"Error running backtest: {e}")
+        raise HTTPException(status_code=500, detail="Failed to run backtest")
+
+
+@router.post("/sweep", response_model=List[BacktestResult])
+async def backtest_sweep(
+    request: BacktestSweepRequest,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Backtest many rule variants over the same history (parameter sweep)
+    """
+    data = await _load_window(db, request)
+    try:
+        rules = [rule.model_dump(mode="json") for rule in request.rules]
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(None, run_sweep, data, rules)
+        return [BacktestResult(**result) for result in results]
+
+    except Exception as e:
+        logger.error(f"Error running backtest sweep: {e}")
+        raise HTTPException(status_code=500, detail="Failed to run backtest sweep")
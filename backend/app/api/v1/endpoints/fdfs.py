@@ -0,0 +1,114 @@
+"""
+CineStox FDFS Hype Zone API Endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+import logging
+
+from app.core.security import get_current_user_id
+from app.schemas.fdfs import (
+    GEO_MAX_LATITUDE, CheckInRequest, CheckInResponse, HypeZone, NearbyCheckIn, NearbyCheckInList,
+    RadiusHype
+)
+from app.services import fdfs_zones
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.post("/{movie_id}/checkins", response_model=CheckInResponse)
+async def check_in(
+    movie_id: str,
+    request: CheckInRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Check in for a movie's FDFS show; counts towards the nearest theatre's zone
+    """
+    try:
+        theatre_id = await fdfs_zones.check_in(
+            movie_id, user_id, request.latitude, request.longitude, request.excitement
+        )
+        return CheckInResponse(movie_id=movie_id, theatre_id=theatre_id)
+
+    except Exception as e:
+        logger.error(f"Error recording FDFS check-in for movie {movie_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to record check-in")
+
+
+@router.get("/{movie_id}/checkins/nearby", response_model=NearbyCheckInList)
+async def get_nearby_check_ins(
+    movie_id: str,
+    latitude: float = Query(..., ge=-GEO_MAX_LATITUDE, le=GEO_MAX_LATITUDE),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, le=500, description="Defaults to FDFS_HYPE_RADIUS_KM"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Check-ins within a radius of a point, nearest first
+    """
+    try:
+        results = await fdfs_zones.nearby_check_ins(movie_id, latitude, longitude, radius_km, limit)
+        return NearbyCheckInList(check_ins=[NearbyCheckIn(**item) for item in results])
+
+    except Exception as e:
+        logger.error(f"Error fetching nearby check-ins for movie {movie_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch nearby check-ins")
+
+
+@router.get("/{movie_id}/hype", response_model=RadiusHype)
+async def get_radius_hype(
+    movie_id: str,
+    latitude: float = Query(..., ge=-GEO_MAX_LATITUDE, le=GEO_MAX_LATITUDE),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, le=500, description="Defaults to FDFS_HYPE_RADIUS_KM")
+):
+    """
+    Aggregated FDFS hype of every theatre zone within a radius
+    """
+    try:
+        return RadiusHype(**await fdfs_zones.radius_hype(movie_id, latitude, longitude, radius_km))
+
+    except Exception as e:
+        logger.error(f"Error fetching FDFS hype for movie {movie_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch FDFS hype")
+
+
+@router.get("/{movie_id}/theatres/{theatre_id}/hype", response_model=RadiusHype)
+async def get_theatre_hype(
+    movie_id: str,
+    theatre_id: str,
+    radius_km: Optional[float] = Query(None, gt=0, le=500, description="Defaults to FDFS_HYPE_RADIUS_KM")
+):
+    """
+    FDFS hype within a radius of a theatre
+    """
+    try:
+        data = await fdfs_zones.theatre_hype(movie_id, theatre_id, radius_km)
+    except Exception as e:
+        logger.error(f"Error fetching hype for theatre {theatre_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch theatre hype")
+
+    if data is None:
+        raise HTTPException(status_code=404, detail="Theatre not found")
+    return RadiusHype(**data)
+
+
+@router.get("/{movie_id}/zones", response_model=List[HypeZone])
+async def get_top_zones(
+    movie_id: str,
+    limit: int = Query(10, ge=1, le=100)
+):
+    """
+    Hottest theatre zones for a movie's FDFS night
+    """
+    try:
+        return [HypeZone(**zone) for zone in await fdfs_zones.top_zones(movie_id, limit)]
+
+    except Exception as e:
+        logger.error(f"Error fetching FDFS zones for movie {movie_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch FDFS zones")
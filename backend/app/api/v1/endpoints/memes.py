@@ -0,0 +1,86 @@
+"""
+CineStox Stonk Meme API Endpoints
+"""
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from typing import List
+import logging
+import os
+import re
+
+from app.core.cache import trading_cache
+from app.core.config import settings
+from app.services.catalog_snapshot import catalog_snapshot
+from app.services.memes import build_spec, meme_path, meme_renderer, template_names, touch
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+_KEY = re.compile(r"^[0-9a-f]{32}$")
+
+
+@router.get("/templates", response_model=List[str])
+async def list_templates():
+    """
+    Available meme templates
+    """
+    return template_names()
+
+
+@router.get("/files/{key}.png")
+async def get_meme_file(key: str):
+    """
+    A rendered meme by content address (never changes: cache forever)
+    """
+    path = meme_path(key) if _KEY.match(key) else None
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Meme not found")
+    return FileResponse(
+        path, media_type="image/png",
+        headers={"ETag": f'"{key}"', "Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+
+@router.get("/{movie_id}")
+async def get_movie_meme(
+    movie_id: str,
+    request: Request,
+    template: str = Query("stonks", description="Meme template (see /memes/templates)")
+):
+    """
+    Stonk meme of a movie at its current price and Reddit mood
+    """
+    await catalog_snapshot.ensure_loaded()
+    entry = catalog_snapshot.entries.get(movie_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    try:
+        prices = await trading_cache.get_movie_prices([movie_id])
+        spec = build_spec(
+            template, entry.contract_symbol, entry.title, entry.telugu_title,
+            prices.get(movie_id, entry.current_price), entry.sentiment_emoji
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # The key is known before rendering: repeat viewers cost no disk or CPU
+    etag = f'"{spec.key}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.MEME_HTTP_MAX_AGE}",
+        "Content-Location": f"{settings.API_V1_STR}/memes/files/{spec.key}.png",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        path = await meme_renderer.get(spec)
+    except Exception as e:
+        logger.error(f"Error rendering {template} meme for movie {movie_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to render meme")
+    touch(path)
+    return FileResponse(path, media_type="image/png", headers=headers)
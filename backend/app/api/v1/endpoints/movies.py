@@ -2,16 +2,22 @@
 CineStox Movies API Endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List, Optional
 import logging
 
-from app.core.database import get_db
+from app.core.database import get_read_db, replica_router
 from app.models.movie import Movie, MovieStatus, MovieLanguage
-from app.schemas.movie import MovieResponse, MovieListResponse, MovieSearchParams
-from app.core.cache import trading_cache
+from app.schemas.movie import (
+    MovieResponse, MovieListResponse, MovieSearchParams,
+    MovieQuote, MovieQuoteRequest, TradeSide, TrendingMovie
+)
+from app.core.cache import cache_manager, trading_cache
+from app.services import amm, trending
+from app.services.catalog_snapshot import CatalogEntry, catalog_snapshot
+from app.services.market_snapshot import market_snapshot, MEDIA_TYPE as SNAPSHOT_MEDIA_TYPE
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +26,12 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+async def _snapshot_responses(entries: List[CatalogEntry]) -> List[dict]:
+    """Snapshot entries as MovieResponse dicts at cached live prices"""
+    prices = await trading_cache.get_movie_prices([entry.id for entry in entries])
+    return [entry.to_response(prices.get(entry.id)) for entry in entries]
+
+
 @router.get("/", response_model=MovieListResponse)
 async def list_movies(
     skip: int = Query(0, ge=0, description="Number of movies to skip"),
@@ -30,7 +42,7 @@ async def list_movies(
     search: Optional[str] = Query(None, description="Search by title"),
     sort_by: str = Query("hype_score", description="Sort by: hype_score, price_change_24h, volume_24h"),
     sort_order: str = Query("desc", description="Sort order: asc, desc"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     List movies with filtering and sorting options
@@ -97,14 +109,11 @@ async def list_movies(
         total_result = await db.execute(count_query)
         total = total_result.scalar()
         
-        # Convert to response models
+        # Convert to response models, with cached prices in one round trip
+        prices = await trading_cache.get_movie_prices([movie.id for movie in movies])
         movie_responses = []
         for movie in movies:
-            # Try to get cached price data
-            cached_price = await trading_cache.get_movie_price(movie.id)
-            if cached_price:
-                movie.current_price = cached_price.get("price", movie.current_price)
-            
+            movie.current_price = prices.get(movie.id, movie.current_price)
             movie_responses.append(MovieResponse.from_orm(movie))
         
         return MovieListResponse(
@@ -122,68 +131,61 @@ async def list_movies(
 
 @router.get("/trending", response_model=List[MovieResponse])
 async def get_trending_movies(
-    limit: int = Query(10, ge=1, le=50, description="Number of trending movies to return"),
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(10, ge=1, le=50, description="Number of trending movies to return")
 ):
     """
-    Get trending movies based on hype score and volume
+    Get trending movies by time-decayed trading, hype and sentiment activity
     """
     try:
-        query = select(Movie).where(
-            Movie.is_trading_active == True
-        ).order_by(
-            Movie.hype_score.desc(),
-            Movie.volume_24h.desc()
-        ).limit(limit)
-        
-        result = await db.execute(query)
-        movies = result.scalars().all()
-        
-        # Update with cached data
-        movie_responses = []
-        for movie in movies:
-            cached_price = await trading_cache.get_movie_price(movie.id)
-            if cached_price:
-                movie.current_price = cached_price.get("price", movie.current_price)
-            
-            movie_responses.append(MovieResponse.from_orm(movie))
-        
-        return movie_responses
+        # Ranked in Redis, served from the in-process catalog snapshot; prices are overlaid live
+        ranked = await trending.trending_entries(limit)
+        return await _snapshot_responses([entry for entry, _ in ranked])
         
     except Exception as e:
         logger.error(f"Error fetching trending movies: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch trending movies")
 
 
+@router.get("/trending/scores", response_model=List[TrendingMovie])
+async def get_trending_scores(
+    limit: int = Query(10, ge=1, le=50, description="Number of trending movies to return"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Trending movies with their decayed trend score, main reason and 24h changes
+    """
+    try:
+        ranked = await trending.trending_entries(limit)
+        entries = [entry for entry, _ in ranked]
+        movies = await _snapshot_responses(entries)
+        reasons = await trending.trend_reasons([entry.id for entry in entries])
+        changes = await trending.changes_24h(db, entries)
+        return [
+            TrendingMovie(
+                movie=movie,
+                trend_score=round(score, 4),
+                trend_reason=reasons[entry.id],
+                volume_change_24h=changes[entry.id][0],
+                hype_change_24h=changes[entry.id][1]
+            )
+            for (entry, score), movie in zip(ranked, movies)
+        ]
+        
+    except Exception as e:
+        logger.error(f"Error fetching trending scores: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch trending scores")
+
+
 @router.get("/telugu", response_model=List[MovieResponse])
 async def get_telugu_movies(
-    limit: int = Query(20, ge=1, le=100, description="Number of Telugu movies to return"),
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(20, ge=1, le=100, description="Number of Telugu movies to return")
 ):
     """
     Get Telugu movies specifically
     """
     try:
-        query = select(Movie).where(
-            Movie.language == MovieLanguage.TELUGU,
-            Movie.is_trading_active == True
-        ).order_by(
-            Movie.hype_score.desc(),
-            Movie.created_at.desc()
-        ).limit(limit)
-        
-        result = await db.execute(query)
-        movies = result.scalars().all()
-        
-        movie_responses = []
-        for movie in movies:
-            cached_price = await trading_cache.get_movie_price(movie.id)
-            if cached_price:
-                movie.current_price = cached_price.get("price", movie.current_price)
-            
-            movie_responses.append(MovieResponse.from_orm(movie))
-        
-        return movie_responses
+        await catalog_snapshot.ensure_loaded()
+        return await _snapshot_responses(catalog_snapshot.by_language_active(MovieLanguage.TELUGU, limit))
         
     except Exception as e:
         logger.error(f"Error fetching Telugu movies: {e}")
@@ -191,43 +193,85 @@ async def get_telugu_movies(
 
 
 @router.get("/fdfs", response_model=List[MovieResponse])
-async def get_fdfs_movies(
-    db: AsyncSession = Depends(get_db)
-):
+async def get_fdfs_movies():
     """
     Get movies with FDFS (First Day First Show) events
     """
     try:
-        query = select(Movie).where(
-            Movie.is_fdfs_event == True,
-            Movie.is_trading_active == True
-        ).order_by(
-            Movie.release_date.asc(),
-            Movie.hype_score.desc()
-        )
-        
-        result = await db.execute(query)
-        movies = result.scalars().all()
-        
-        movie_responses = []
-        for movie in movies:
-            cached_price = await trading_cache.get_movie_price(movie.id)
-            if cached_price:
-                movie.current_price = cached_price.get("price", movie.current_price)
-            
-            movie_responses.append(MovieResponse.from_orm(movie))
-        
-        return movie_responses
+        await catalog_snapshot.ensure_loaded()
+        return await _snapshot_responses(catalog_snapshot.fdfs_events())
         
     except Exception as e:
         logger.error(f"Error fetching FDFS movies: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch FDFS movies")
 
 
+@router.get("/snapshot")
+async def get_market_snapshot(
+    since: Optional[int] = Query(None, ge=0, description="Client's last snapshot version for a delta")
+):
+    """
+    Compact binary board of every active symbol (see app.services.market_snapshot)
+    """
+    try:
+        payload = market_snapshot.payload(since)
+    except LookupError:
+        raise HTTPException(status_code=503, detail="Market snapshot not ready")
+    
+    return Response(
+        content=payload,
+        media_type=SNAPSHOT_MEDIA_TYPE,
+        headers={
+            "X-Snapshot-Version": str(market_snapshot.current.version),
+            "Cache-Control": "no-cache"
+        }
+    )
+
+
+@router.post("/quotes", response_model=List[MovieQuote])
+async def get_movie_quotes(
+    requests: List[MovieQuoteRequest],
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Batch AMM quotes (price, impact, slippage) for many movies in one call
+    """
+    if len(requests) > 200:
+        raise HTTPException(status_code=400, detail="At most 200 quotes per request")
+    try:
+        quotes = await amm.quote_many(
+            db, [(r.movie_id, r.side.value, r.shares) for r in requests]
+        )
+        return [MovieQuote(**quote) for quote in quotes]
+        
+    except Exception as e:
+        logger.error(f"Error quoting movies: {e}")
+        raise HTTPException(status_code=500, detail="Failed to quote movies")
+
+
+@router.get("/{movie_id}/quote", response_model=MovieQuote)
+async def get_movie_quote(
+    movie_id: str,
+    side: TradeSide = Query(TradeSide.BUY, description="buy or sell"),
+    shares: int = Query(1, gt=0, description="Number of shares"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Live AMM quote for a movie contract
+    """
+    try:
+        quotes = await amm.quote_many(db, [(movie_id, side.value, shares)])
+        return MovieQuote(**quotes[0])
+        
+    except Exception as e:
+        logger.error(f"Error quoting movie {movie_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to quote movie")
+
+
 @router.get("/{movie_id}", response_model=MovieResponse)
 async def get_movie(
     movie_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get detailed information about a specific movie
@@ -240,16 +284,17 @@ async def get_movie(
         if not movie:
             raise HTTPException(status_code=404, detail="Movie not found")
         
-        # Get cached data
-        cached_price = await trading_cache.get_movie_price(movie.id)
+        # Get cached data (one market state read)
+        state = await trading_cache.get_market_state(movie.id)
+        cached_price = state["price"]
         if cached_price:
             movie.current_price = cached_price.get("price", movie.current_price)
         
-        cached_hype = await trading_cache.get_hype_score(movie.id)
+        cached_hype = state["hype"]
         if cached_hype:
             movie.hype_score = cached_hype.get("score", movie.hype_score)
         
-        cached_sentiment = await trading_cache.get_reddit_sentiment(movie.id)
+        cached_sentiment = state["sentiment"]
         if cached_sentiment:
             movie.reddit_sentiment = cached_sentiment.get("sentiment", movie.reddit_sentiment)
         
@@ -265,7 +310,7 @@ async def get_movie(
 @router.get("/{movie_id}/market-data")
 async def get_movie_market_data(
     movie_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get detailed market data for a movie
@@ -278,11 +323,12 @@ async def get_movie_market_data(
         if not movie:
             raise HTTPException(status_code=404, detail="Movie not found")
         
-        # Get cached data
-        cached_price = await trading_cache.get_movie_price(movie.id)
-        cached_volume = await trading_cache.get_trading_volume(movie.id)
-        cached_hype = await trading_cache.get_hype_score(movie.id)
-        cached_sentiment = await trading_cache.get_reddit_sentiment(movie.id)
+        # Get cached data (one market state read)
+        state = await trading_cache.get_market_state(movie.id)
+        cached_price = state["price"]
+        cached_volume = state["volume"]
+        cached_hype = state["hype"]
+        cached_sentiment = state["sentiment"]
         
         market_data = {
             "movie_id": movie.id,
@@ -293,6 +339,9 @@ async def get_movie_market_data(
             "high_24h": movie.high_24h,
             "low_24h": movie.low_24h,
             "volume_24h": cached_volume.get("volume", movie.volume_24h) if cached_volume else movie.volume_24h,
+            "trades_24h": cached_volume.get("trades", 0) if cached_volume else 0,
+            "vwap_24h": cached_volume.get("vwap") if cached_volume else None,
+            "order_imbalance_24h": cached_volume.get("imbalance", 0.0) if cached_volume else 0.0,
             "market_cap": movie.market_cap_current,
             "hype_score": cached_hype.get("score", movie.hype_score) if cached_hype else movie.hype_score,
             "reddit_sentiment": cached_sentiment.get("sentiment", movie.reddit_sentiment) if cached_sentiment else movie.reddit_sentiment,
@@ -314,36 +363,44 @@ async def get_movie_market_data(
 
 
 @router.get("/{movie_id}/telugu-info")
-async def get_movie_telugu_info(
-    movie_id: str,
-    db: AsyncSession = Depends(get_db)
-):
+async def get_movie_telugu_info(movie_id: str):
     """
     Get Telugu-specific information about a movie
     """
+    async def compute_telugu_info():
+        # Its own session: an early refresh runs after the request has finished
+        session_factory = await replica_router.pick()
+        async with session_factory() as db:
+            query = select(Movie).where(Movie.id == movie_id)
+            result = await db.execute(query)
+            movie = result.scalar_one_or_none()
+            
+            if not movie:
+                return None
+            
+            return {
+                "movie_id": movie.id,
+                "telugu_title": movie.telugu_title,
+                "display_title": movie.display_title,
+                "telugu_description": movie.get_telugu_description(),
+                "star_actor": movie.star_actor,
+                "heroine": movie.heroine,
+                "music_director": movie.music_director,
+                "cinematographer": movie.cinematographer,
+                "is_telugu_movie": movie.is_telugu_movie,
+                "language": movie.language.value,
+                "hype_level": movie.hype_level,
+                "sentiment_emoji": movie.sentiment_emoji
+            }
+    
     try:
-        query = select(Movie).where(Movie.id == movie_id)
-        result = await db.execute(query)
-        movie = result.scalar_one_or_none()
-        
-        if not movie:
+        # Reads the full row but barely changes: cached with stampede protection
+        telugu_info = await cache_manager.get_or_compute(
+            f"movie:telugu-info:{movie_id}", compute_telugu_info, ttl=300
+        )
+        if telugu_info is None:
             raise HTTPException(status_code=404, detail="Movie not found")
         
-        telugu_info = {
-            "movie_id": movie.id,
-            "telugu_title": movie.telugu_title,
-            "display_title": movie.display_title,
-            "telugu_description": movie.get_telugu_description(),
-            "star_actor": movie.star_actor,
-            "heroine": movie.heroine,
-            "music_director": movie.music_director,
-            "cinematographer": movie.cinematographer,
-            "is_telugu_movie": movie.is_telugu_movie,
-            "language": movie.language.value,
-            "hype_level": movie.hype_level,
-            "sentiment_emoji": movie.sentiment_emoji
-        }
-        
         return telugu_info
         
     except HTTPException:
@@ -0,0 +1,69 @@
+"""
+CineStox NFT Marketplace API Endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+import logging
+
+from app.core.database import get_db, get_read_db
+from app.core.security import get_current_user_id, require_can_trade
+from app.models.nft import NFT
+from app.schemas.nft import MintRequest, NFTList, NFTResponse
+from app.services import nft_minting
+from app.services.ledger import InsufficientFunds
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.post("/mint", response_model=NFTResponse, status_code=202)
+async def mint_nft(
+    request: MintRequest,
+    user_id: str = Depends(require_can_trade),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Reserve and pay for an NFT; minting completes in the background
+    """
+    try:
+        row = await nft_minting.request_mint(db, user_id, request.movie_id, request.prediction_id)
+        return NFTResponse(**row)
+
+    except nft_minting.MintingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InsufficientFunds:
+        raise HTTPException(status_code=400, detail="Insufficient balance for the minting fee")
+    except Exception as e:
+        logger.error(f"Error minting NFT for {user_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to mint NFT")
+
+
+@router.get("/mine", response_model=NFTList)
+async def get_my_nfts(
+    limit: int = Query(50, ge=1, le=200),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Your NFTs with their minting status, newest first
+    """
+    result = await db.execute(
+        select(NFT).where(NFT.owner_id == user_id).order_by(NFT.created_at.desc()).limit(limit)
+    )
+    return NFTList(nfts=result.scalars().all())
+
+
+@router.get("/{nft_id}", response_model=NFTResponse)
+async def get_nft(nft_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    One NFT; poll this for minting status
+    """
+    nft = await db.get(NFT, nft_id)
+    if nft is None:
+        raise HTTPException(status_code=404, detail="NFT not found")
+    return nft
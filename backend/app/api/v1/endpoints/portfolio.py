@@ -0,0 +1,29 @@
+"""
+CineStox Portfolio API Endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+import logging
+
+from app.core.security import get_current_user_id
+from app.schemas.portfolio import PortfolioSnapshot
+from app.services.portfolio import get_portfolio_snapshot
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/snapshot", response_model=PortfolioSnapshot)
+async def get_my_portfolio(user_id: str = Depends(get_current_user_id)):
+    """
+    Your positions at live prices, from the incrementally maintained positions cache
+    """
+    try:
+        return await get_portfolio_snapshot(user_id)
+
+    except Exception as e:
+        logger.error(f"Error fetching portfolio snapshot for {user_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch portfolio")
@@ -0,0 +1,118 @@
+"""
+CineStox Tournament API Endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+import logging
+
+from app.core.database import get_db, get_read_db
+from app.core.security import get_current_user_id, require_can_trade
+from app.models.tournament import Tournament, TournamentStatus
+from app.schemas.tournament import (
+    Leaderboard, LeaderboardRow, TournamentEntryResponse, TournamentResponse, TournamentStandingResponse
+)
+from app.services import tournaments
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def _get_tournament(db: AsyncSession, tournament_id: str) -> Tournament:
+    tournament = await db.get(Tournament, tournament_id)
+    if tournament is None:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    return tournament
+
+
+@router.get("/", response_model=List[TournamentResponse])
+async def list_tournaments(
+    status: Optional[TournamentStatus] = Query(None, description="Filter by status"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Upcoming, running and finished tournaments, newest first
+    """
+    try:
+        query = select(Tournament).order_by(Tournament.starts_at.desc())
+        if status:
+            query = query.where(Tournament.status == status)
+        result = await db.execute(query.limit(100))
+        return result.scalars().all()
+
+    except Exception as e:
+        logger.error(f"Error listing tournaments: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch tournaments")
+
+
+@router.get("/{tournament_id}", response_model=TournamentResponse)
+async def get_tournament(tournament_id: str, db: AsyncSession = Depends(get_read_db)):
+    """
+    One tournament
+    """
+    return await _get_tournament(db, tournament_id)
+
+
+@router.post("/{tournament_id}/entries", response_model=TournamentEntryResponse)
+async def enroll(
+    tournament_id: str,
+    user_id: str = Depends(require_can_trade),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Enter a tournament; only trades inside its window count
+    """
+    try:
+        return await tournaments.enroll(db, tournament_id, user_id)
+
+    except tournaments.TournamentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error enrolling {user_id} in tournament {tournament_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to enroll")
+
+
+@router.get("/{tournament_id}/leaderboard", response_model=Leaderboard)
+async def get_leaderboard(
+    tournament_id: str,
+    skip: int = Query(0, ge=0, description="Ranks to skip"),
+    limit: int = Query(50, ge=1, le=500, description="Ranks to return"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    The latest round's table (refreshed every round)
+    """
+    tournament = await _get_tournament(db, tournament_id)
+    try:
+        rows = await tournaments.leaderboard(db, tournament, skip, limit)
+        return Leaderboard(
+            tournament_id=tournament.id,
+            round=tournament.rounds_taken or 0,
+            taken_at=tournament.last_round_at,
+            rows=[LeaderboardRow(**row) for row in rows]
+        )
+
+    except Exception as e:
+        logger.error(f"Error fetching leaderboard for tournament {tournament_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch leaderboard")
+
+
+@router.get("/{tournament_id}/standing", response_model=TournamentStandingResponse)
+async def get_my_standing(
+    tournament_id: str,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Your rank and in-window P&L as of the latest round
+    """
+    tournament = await _get_tournament(db, tournament_id)
+    result = await tournaments.standing(db, tournament, user_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Not enrolled in this tournament")
+    return result
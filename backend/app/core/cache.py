@@ -3,10 +3,17 @@ CineStox Redis Cache Configuration
 """
 
 import redis.asyncio as redis
+from app.core import codec
 from app.core.config import settings
+from app.core.price_board import price_board
+import asyncio
 import logging
 import json
-from typing import Optional, Any, Dict, List
+import math
+import random
+import time
+import uuid
+from typing import Optional, Any, Awaitable, Callable, Dict, List
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,21 +29,46 @@ redis_client = redis.from_url(
     retry_on_timeout=True
 )
 
+# Byte-level client for codec-encoded values (CacheManager.get/set)
+redis_binary_client = redis.from_url(
+    settings.REDIS_URL,
+    decode_responses=False,
+    socket_keepalive=True,
+    socket_keepalive_options={},
+    retry_on_timeout=True
+)
+
+# Release a recompute lock only if we still own it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Envelope written by get_or_compute: value plus what early refresh needs
+_ENVELOPE = "__cached__"
+
 
 class CacheManager:
     """Redis cache manager for CineStox"""
     
-    def __init__(self):
-        self.client = redis_client
+    def __init__(self, client=None, binary_client=None):
+        self.client = client or redis_client
+        self.binary_client = binary_client or redis_binary_client
         self.default_ttl = 3600  # 1 hour default TTL
+        self.lock_ttl_ms = settings.CACHE_LOCK_TTL_MS
+        self.beta = settings.CACHE_EARLY_REFRESH_BETA
+        self.poll_interval = 0.05
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._refreshes = set()
+        self._release_lock = self.client.register_script(_RELEASE_LOCK_SCRIPT)
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set a key-value pair in cache"""
         try:
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
             ttl = ttl or self.default_ttl
-            return await self.client.set(key, value, ex=ttl)
+            return await self.binary_client.set(key, codec.encode(value), ex=ttl)
         except Exception as e:
             logger.error(f"Cache set error for key {key}: {e}")
             return False
@@ -44,12 +76,12 @@ class CacheManager:
     async def get(self, key: str) -> Optional[Any]:
         """Get a value from cache"""
         try:
-            value = await self.client.get(key)
-            if value:
-                try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    return value
+            raw = await self.binary_client.get(key)
+            if raw:
+                value = codec.decode(raw)
+                if isinstance(value, dict) and _ENVELOPE in value:
+                    return value[_ENVELOPE]
+                return value
             return None
         except Exception as e:
             logger.error(f"Cache get error for key {key}: {e}")
@@ -78,6 +110,269 @@ class CacheManager:
         except Exception as e:
             logger.error(f"Cache expire error for key {key}: {e}")
             return False
+    
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]],
+                             ttl: Optional[int] = None) -> Any:
+        """Get a cached value, computing it on a miss without stampeding.
+        
+        Concurrent misses in this process share one computation, and a short
+        Redis lock lets only one process recompute while the others wait for
+        its result. Hits close to expiry are refreshed early in the
+        background with a probability that grows as expiry nears (XFetch),
+        so popular keys rarely expire at all. ``compute`` must return a
+        JSON-serializable value; None is not cached.
+        """
+        ttl = ttl or self.default_ttl
+        try:
+            raw = await self.binary_client.get(key)
+        except Exception as e:
+            logger.error(f"Cache get error for key {key}: {e}")
+            return await compute()
+        
+        envelope = self._unwrap(raw)
+        if envelope is not None:
+            value, delta, expires_at = envelope
+            # XFetch: refresh when now - delta * beta * ln(rand) passes expiry
+            if time.time() - delta * self.beta * math.log(1.0 - random.random()) >= expires_at:
+                if ("refresh", key) not in self._inflight:
+                    task = asyncio.create_task(self._refresh(key, compute, ttl))
+                    self._refreshes.add(task)
+                    task.add_done_callback(self._refreshes.discard)
+            return value
+        
+        return await self._single_flight(("miss", key), key, compute, ttl, wait=True)
+    
+    async def _refresh(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: int):
+        try:
+            await self._single_flight(("refresh", key), key, compute, ttl, wait=False)
+        except Exception as e:
+            logger.error(f"Cache early refresh error for key {key}: {e}")
+    
+    def _unwrap(self, raw: Optional[bytes]) -> Optional[tuple]:
+        if not raw:
+            return None
+        try:
+            record = codec.decode(raw)
+            return record[_ENVELOPE], record["delta"], record["expires_at"]
+        except (ValueError, KeyError, TypeError):
+            return None
+    
+    async def _single_flight(self, flight: tuple, key: str, compute: Callable[[], Awaitable[Any]],
+                             ttl: int, wait: bool) -> Any:
+        """One computation per key per process; callers share its result"""
+        future = self._inflight.get(flight)
+        if future is not None:
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight] = future
+        try:
+            value = await self._recompute(key, compute, ttl, wait)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited is not reported
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(flight, None)
+    
+    async def _recompute(self, key: str, compute: Callable[[], Awaitable[Any]],
+                         ttl: int, wait: bool) -> Any:
+        """Compute under a cross-process lock, or wait for the lock holder's result"""
+        lock_key = f"lock:{key}"
+        token = str(uuid.uuid4())
+        try:
+            locked = await self.client.set(lock_key, token, nx=True, px=self.lock_ttl_ms)
+        except Exception as e:
+            logger.error(f"Cache lock error for key {key}: {e}")
+            locked = None
+        
+        if not locked:
+            if not wait:
+                # Another process is already refreshing; keep serving the current value
+                return None
+            deadline = time.monotonic() + self.lock_ttl_ms / 1000
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                try:
+                    envelope = self._unwrap(await self.binary_client.get(key))
+                    if envelope is not None:
+                        return envelope[0]
+                    if not await self.client.exists(lock_key):
+                        break
+                except Exception as e:
+                    logger.error(f"Cache get error for key {key}: {e}")
+                    break
+            # Holder failed or is too slow: compute without the lock
+        
+        try:
+            started = time.monotonic()
+            value = await compute()
+            delta = time.monotonic() - started
+            if value is not None:
+                # Jitter keeps keys written together from expiring together
+                jittered = max(1, int(ttl * random.uniform(1 - settings.CACHE_TTL_JITTER, 1)))
+                envelope = {_ENVELOPE: value, "delta": delta, "expires_at": time.time() + jittered}
+                await self.binary_client.set(key, codec.encode(envelope), ex=jittered)
+            return value
+        finally:
+            if locked:
+                try:
+                    await self._release_lock(keys=[lock_key], args=[token])
+                except Exception as e:
+                    logger.error(f"Cache unlock error for key {key}: {e}")
+
+
+# Positions hash layout: "<metric>:<movie_id>" fields, with metrics
+# owned, shorted, cost (owned * avg buy), proceeds (shorted * avg short),
+# realized, invested and last (last traded price). Mirrors Portfolio.update_holdings.
+# "_version" is the user's position version the seed read the database at:
+# trades settled at or below it are already in the hash.
+#
+# KEYS: positions hash, dirty marker
+# ARGV: movie_id, trade_type, shares, price, ttl, trade's position version
+_APPLY_POSITION_DELTA_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    -- Not seeded: block any seed that read the database before this trade
+    redis.call('SET', KEYS[2], 1, 'EX', 60)
+    return 0
+end
+local seeded_at = tonumber(redis.call('HGET', KEYS[1], '_version') or '0')
+if tonumber(ARGV[6]) <= seeded_at then
+    -- The seed read the database after this trade committed
+    return 0
+end
+local m = ARGV[1]
+local trade_type = ARGV[2]
+local shares = tonumber(ARGV[3])
+local price = tonumber(ARGV[4])
+
+local function get(metric)
+    return tonumber(redis.call('HGET', KEYS[1], metric .. ':' .. m) or '0')
+end
+
+if trade_type == 'buy' then
+    redis.call('HINCRBYFLOAT', KEYS[1], 'owned:' .. m, shares)
+    redis.call('HINCRBYFLOAT', KEYS[1], 'cost:' .. m, shares * price)
+    redis.call('HINCRBYFLOAT', KEYS[1], 'invested:' .. m, shares * price)
+elseif trade_type == 'sell' then
+    local owned = get('owned')
+    if owned >= shares and owned > 0 then
+        local avg = get('cost') / owned
+        redis.call('HINCRBYFLOAT', KEYS[1], 'realized:' .. m, (price - avg) * shares)
+        redis.call('HINCRBYFLOAT', KEYS[1], 'owned:' .. m, -shares)
+        redis.call('HINCRBYFLOAT', KEYS[1], 'cost:' .. m, -avg * shares)
+    end
+elseif trade_type == 'short' then
+    redis.call('HINCRBYFLOAT', KEYS[1], 'shorted:' .. m, shares)
+    redis.call('HINCRBYFLOAT', KEYS[1], 'proceeds:' .. m, shares * price)
+elseif trade_type == 'cover' then
+    local shorted = get('shorted')
+    if shorted >= shares and shorted > 0 then
+        local avg = get('proceeds') / shorted
+        redis.call('HINCRBYFLOAT', KEYS[1], 'realized:' .. m, (avg - price) * shares)
+        redis.call('HINCRBYFLOAT', KEYS[1], 'shorted:' .. m, -shares)
+        redis.call('HINCRBYFLOAT', KEYS[1], 'proceeds:' .. m, -avg * shares)
+    end
+end
+redis.call('HSET', KEYS[1], 'last:' .. m, price)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[5]))
+return 1
+"""
+
+# KEYS: positions hash, dirty marker
+# ARGV: ttl, version, field1, value1, field2, value2, ...
+_SEED_POSITIONS_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], '_seeded', 1, '_version', ARGV[2], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[1]))
+return 1
+"""
+
+
+# Per-movie market state lives in one hash, "movie:market:{id}", with one
+# field group per source. Each group carries "<group>:at" (written, unix
+# seconds) and "<group>:exp" (fresh until), so groups age independently
+# inside a single key. Values are the default freshness in seconds.
+MARKET_GROUPS = {
+    "price": 300,
+    "volume": 1800,
+    "hype": 900,
+    "sentiment": 3600,
+}
+
+# String keys the hash replaces; read as a fallback while migrating
+LEGACY_MARKET_KEYS = {
+    "price": "movie:price:{}",
+    "volume": "movie:volume:{}",
+    "hype": "movie:hype:{}",
+    "sentiment": "reddit:sentiment:{}",
+}
+
+VOLUME_FIELDS = (
+    "volume", "shares", "trades", "vwap", "buy_volume", "sell_volume", "imbalance",
+    "open", "high", "low", "close", "price_change_24h",
+)
+
+# Nudge a fresh hype score, clamped to 0..100.
+#
+# KEYS: market hash
+# ARGV: delta, now, ttl, key_ttl
+# Returns: new score, or false if there is no fresh score to adjust
+_ADJUST_HYPE_SCRIPT = """
+local exp = redis.call('HGET', KEYS[1], 'hype:exp')
+if not exp or tonumber(exp) < tonumber(ARGV[2]) then
+    return false
+end
+local value = tonumber(redis.call('HINCRBYFLOAT', KEYS[1], 'hype', ARGV[1]))
+if value < 0 or value > 100 then
+    value = math.min(100, math.max(0, value))
+    redis.call('HSET', KEYS[1], 'hype', value)
+end
+redis.call('HSET', KEYS[1], 'hype:at', ARGV[2], 'hype:exp', tonumber(ARGV[2]) + tonumber(ARGV[3]))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+return string.format('%.17g', value)
+"""
+
+
+def _market_key(movie_id: str) -> str:
+    return f"movie:market:{movie_id}"
+
+
+def _group_fields(group: str, value: Dict) -> Dict[str, Any]:
+    """Hash fields for one group, from the dict shape its getter returns"""
+    if group == "price":
+        return {"price": value["price"]}
+    if group == "hype":
+        return {"hype": value["score"]}
+    if group == "volume":
+        return {f"v:{k}": "" if value.get(k) is None else value[k] for k in VOLUME_FIELDS if k in value}
+    return {"sentiment": json.dumps(value)}
+
+
+def _decode_group(group: str, data: Dict[str, str], now: float) -> Optional[Dict]:
+    """One group from a market hash, or None if missing or stale"""
+    if float(data.get(f"{group}:exp") or 0) < now:
+        return None
+    timestamp = int(float(data[f"{group}:at"]))
+    if group == "price":
+        return {"price": float(data["price"]), "timestamp": timestamp}
+    if group == "hype":
+        return {"score": float(data["hype"]), "timestamp": timestamp}
+    if group == "volume":
+        value = {k: float(data[f"v:{k}"]) if data[f"v:{k}"] else None for k in VOLUME_FIELDS if f"v:{k}" in data}
+        if value.get("trades") is not None:
+            value["trades"] = int(value["trades"])
+        return {**value, "timestamp": timestamp}
+    return {**json.loads(data["sentiment"]), "timestamp": timestamp}
 
 
 # Trading-specific cache methods
@@ -86,56 +381,313 @@ class TradingCache:
     
     def __init__(self):
         self.cache = CacheManager()
+        self._apply_position_delta = self.cache.client.register_script(_APPLY_POSITION_DELTA_SCRIPT)
+        self._seed_positions = self.cache.client.register_script(_SEED_POSITIONS_SCRIPT)
+        self._adjust_hype = self.cache.client.register_script(_ADJUST_HYPE_SCRIPT)
+    
+    def _queue_market_group(self, pipe, movie_id: str, group: str, value: Dict, ttl: int,
+                            written_at: Optional[float] = None):
+        """Queue a field-level update of one market group on a pipeline"""
+        now = time.time()
+        written_at = written_at or now
+        key = _market_key(movie_id)
+        pipe.hset(key, mapping={
+            **_group_fields(group, value),
+            f"{group}:at": int(written_at),
+            f"{group}:exp": written_at + ttl,
+        })
+        pipe.expire(key, settings.MARKET_STATE_TTL)
+        if settings.MARKET_STATE_LEGACY_WRITES:
+            legacy = {**value, "timestamp": int(written_at)}
+            pipe.set(LEGACY_MARKET_KEYS[group].format(movie_id), json.dumps(legacy), ex=ttl)
+    
+    async def _set_market_group(self, movie_id: str, group: str, value: Dict, ttl: int):
+        try:
+            async with self.cache.client.pipeline(transaction=True) as pipe:
+                self._queue_market_group(pipe, movie_id, group, value, ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Market state write error for movie {movie_id} ({group}): {e}")
+    
+    async def get_market_state(self, movie_id: str) -> Dict[str, Optional[Dict]]:
+        """All fresh market groups for a movie in one HGETALL (None when stale)"""
+        try:
+            data = await self.cache.client.hgetall(_market_key(movie_id))
+        except Exception as e:
+            logger.error(f"Market state read error for movie {movie_id}: {e}")
+            data = {}
+        now = time.time()
+        state = {group: _decode_group(group, data, now) for group in MARKET_GROUPS}
+        
+        missing = [group for group, value in state.items() if value is None]
+        if missing and settings.MARKET_STATE_LEGACY_READS:
+            keys = [LEGACY_MARKET_KEYS[group].format(movie_id) for group in missing]
+            try:
+                values = await self.cache.client.mget(keys)
+            except Exception as e:
+                logger.error(f"Legacy market key read error for movie {movie_id}: {e}")
+                values = [None] * len(keys)
+            for group, value in zip(missing, values):
+                if value:
+                    state[group] = json.loads(value)
+        return state
     
     async def cache_movie_price(self, movie_id: str, price: float, ttl: int = 300):
-        """Cache current movie price (5 minutes TTL)"""
-        key = f"movie:price:{movie_id}"
-        await self.cache.set(key, {"price": price, "timestamp": self._get_timestamp()}, ttl)
+        """Cache current movie price (5 minutes freshness)"""
+        await self._set_market_group(movie_id, "price", {"price": price}, ttl)
     
     async def get_movie_price(self, movie_id: str) -> Optional[Dict]:
         """Get cached movie price"""
-        key = f"movie:price:{movie_id}"
-        return await self.cache.get(key)
+        return (await self.get_market_state(movie_id))["price"]
     
-    async def cache_user_portfolio(self, user_id: str, portfolio: Dict, ttl: int = 600):
-        """Cache user portfolio (10 minutes TTL)"""
-        key = f"user:portfolio:{user_id}"
-        await self.cache.set(key, portfolio, ttl)
+    async def bump_position_versions(self, user_ids: List[str], ttl: int = 86400) -> Optional[Dict[str, int]]:
+        """Advance the position version of users whose trades are about to commit.
+        
+        Call while holding their settlement locks. The versions outlive any
+        positions hash seeded against them (twice the hash TTL).
+        """
+        try:
+            async with self.cache.client.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.incr(f"user:positions:{user_id}:version")
+                    pipe.expire(f"user:positions:{user_id}:version", ttl * 2)
+                results = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Position version error for users {user_ids}: {e}")
+            return None
+        return dict(zip(user_ids, results[::2]))
     
-    async def get_user_portfolio(self, user_id: str) -> Optional[Dict]:
-        """Get cached user portfolio"""
-        key = f"user:portfolio:{user_id}"
-        return await self.cache.get(key)
+    async def get_position_version(self, user_id: str, ttl: int = 86400) -> Optional[int]:
+        """A user's current position version (call while holding their settlement lock, shared)"""
+        key = f"user:positions:{user_id}:version"
+        try:
+            async with self.cache.client.pipeline(transaction=False) as pipe:
+                pipe.incrby(key, 0)
+                pipe.expire(key, ttl * 2)
+                version, _ = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Position version read error for user {user_id}: {e}")
+            return None
+        return version
+    
+    async def seed_user_positions(self, user_id: str, fields: Dict[str, float], version: int,
+                                  ttl: int = 86400) -> bool:
+        """Seed a user's positions hash from the database (24 hours TTL).
+        
+        ``version`` is the user's position version at the database read;
+        later deltas at or below it are skipped. Refused while a trade delta
+        was skipped for the user, so a seed read before that trade committed
+        never overwrites it.
+        """
+        key = f"user:positions:{user_id}"
+        try:
+            return bool(await self._seed_positions(
+                keys=[key, f"{key}:dirty"],
+                args=[ttl, version] + [item for pair in fields.items() for item in pair]
+            ))
+        except Exception as e:
+            logger.error(f"Positions seed error for user {user_id}: {e}")
+            return False
+    
+    async def apply_position_delta(self, user_id: str, movie_id: str, trade_type: str,
+                                   shares: int, price: float, version: int, ttl: int = 86400) -> bool:
+        """Apply one executed trade, settled at position ``version``, to a user's positions hash"""
+        key = f"user:positions:{user_id}"
+        try:
+            return bool(await self._apply_position_delta(
+                keys=[key, f"{key}:dirty"],
+                args=[movie_id, trade_type, shares, price, ttl, version]
+            ))
+        except Exception as e:
+            logger.error(f"Position delta error for user {user_id}: {e}")
+            # Next read rebuilds from the database
+            await self.cache.delete(key)
+            return False
+    
+    async def invalidate_user_positions(self, user_id: str):
+        """Drop a user's positions hash and hold off seeds that may predate the change"""
+        key = f"user:positions:{user_id}"
+        try:
+            async with self.cache.client.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.set(f"{key}:dirty", 1, ex=60)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Positions invalidation error for user {user_id}: {e}")
+    
+    async def get_user_positions(self, user_id: str) -> Optional[Dict[str, float]]:
+        """Get a user's positions hash (None if not seeded)"""
+        key = f"user:positions:{user_id}"
+        try:
+            data = await self.cache.client.hgetall(key)
+        except Exception as e:
+            logger.error(f"Positions read error for user {user_id}: {e}")
+            return None
+        if not data:
+            return None
+        return {field: float(value) for field, value in data.items()}
+    
+    async def get_movie_prices(self, movie_ids: List[str]) -> Dict[str, float]:
+        """Get fresh prices for many movies: shared price board first, then one Redis round trip"""
+        if not movie_ids:
+            return {}
+        board_prices = price_board.get_prices(movie_ids)
+        if len(board_prices) == len(movie_ids):
+            return board_prices
+        if board_prices:
+            movie_ids = [movie_id for movie_id in movie_ids if movie_id not in board_prices]
+        try:
+            async with self.cache.client.pipeline(transaction=False) as pipe:
+                for movie_id in movie_ids:
+                    pipe.hmget(_market_key(movie_id), "price", "price:exp")
+                results = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Price batch read error: {e}")
+            return board_prices
+        
+        now = time.time()
+        prices = {
+            movie_id: float(price)
+            for movie_id, (price, expires) in zip(movie_ids, results)
+            if price is not None and float(expires or 0) >= now
+        }
+        prices.update(board_prices)
+        
+        missing = [movie_id for movie_id in movie_ids if movie_id not in prices]
+        if missing and settings.MARKET_STATE_LEGACY_READS:
+            try:
+                values = await self.cache.client.mget([f"movie:price:{movie_id}" for movie_id in missing])
+            except Exception as e:
+                logger.error(f"Legacy price batch read error: {e}")
+                values = []
+            prices.update({
+                movie_id: json.loads(value)["price"]
+                for movie_id, value in zip(missing, values)
+                if value
+            })
+        return prices
+    
+    async def get_board_rows(self, movie_ids: List[str]) -> List[tuple]:
+        """Price board rows (id, price, 24h high, 24h low, 24h volume, price expiry) in one round trip"""
+        async with self.cache.client.pipeline(transaction=False) as pipe:
+            for movie_id in movie_ids:
+                pipe.hmget(_market_key(movie_id), "price", "price:exp", "v:high", "v:low", "v:volume", "volume:exp")
+            results = await pipe.execute()
+        
+        now = time.time()
+        rows = []
+        for movie_id, (price, expires, high, low, volume, volume_expires) in zip(movie_ids, results):
+            if price is None:
+                continue
+            # Stale or unknown 24h stats go out as NaN ("no value")
+            if float(volume_expires or 0) < now:
+                high = low = volume = None
+            rows.append((
+                movie_id, float(price),
+                *(float(v) if v else math.nan for v in (high, low, volume)),
+                float(expires or 0)
+            ))
+        return rows
     
     async def cache_trading_volume(self, movie_id: str, volume: Dict, ttl: int = 1800):
-        """Cache trading volume (30 minutes TTL)"""
-        key = f"movie:volume:{movie_id}"
-        await self.cache.set(key, volume, ttl)
+        """Cache trading volume statistics (30 minutes freshness)"""
+        await self._set_market_group(movie_id, "volume", volume, ttl)
+    
+    async def cache_market_group_many(self, group: str, values: Dict[str, Dict], ttl: int):
+        """Write one market group for many movies in one round trip"""
+        if not values:
+            return
+        try:
+            async with self.cache.client.pipeline(transaction=False) as pipe:
+                for movie_id, value in values.items():
+                    self._queue_market_group(pipe, movie_id, group, value, ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Market state batch write error ({group}): {e}")
+    
+    async def cache_trading_volumes(self, volumes: Dict[str, Dict], ttl: int = 1800):
+        """Cache trading volume statistics for many movies in one round trip"""
+        await self.cache_market_group_many("volume", volumes, ttl)
     
     async def get_trading_volume(self, movie_id: str) -> Optional[Dict]:
         """Get cached trading volume"""
-        key = f"movie:volume:{movie_id}"
-        return await self.cache.get(key)
+        return (await self.get_market_state(movie_id))["volume"]
     
     async def cache_hype_score(self, movie_id: str, score: float, ttl: int = 900):
-        """Cache hype score (15 minutes TTL)"""
-        key = f"movie:hype:{movie_id}"
-        await self.cache.set(key, {"score": score, "timestamp": self._get_timestamp()}, ttl)
+        """Cache hype score (15 minutes freshness)"""
+        await self._set_market_group(movie_id, "hype", {"score": score}, ttl)
+    
+    async def adjust_hype_score(self, movie_id: str, delta: float, ttl: int = 900) -> Optional[float]:
+        """Add ``delta`` to a fresh cached hype score in place (HINCRBYFLOAT)"""
+        try:
+            value = await self._adjust_hype(
+                keys=[_market_key(movie_id)],
+                args=[delta, time.time(), ttl, settings.MARKET_STATE_TTL]
+            )
+        except Exception as e:
+            logger.error(f"Hype adjust error for movie {movie_id}: {e}")
+            return None
+        return float(value) if value else None
     
     async def get_hype_score(self, movie_id: str) -> Optional[Dict]:
         """Get cached hype score"""
-        key = f"movie:hype:{movie_id}"
-        return await self.cache.get(key)
+        return (await self.get_market_state(movie_id))["hype"]
     
     async def cache_reddit_sentiment(self, movie_id: str, sentiment: Dict, ttl: int = 3600):
-        """Cache Reddit sentiment (1 hour TTL)"""
-        key = f"reddit:sentiment:{movie_id}"
-        await self.cache.set(key, sentiment, ttl)
+        """Cache Reddit sentiment (1 hour freshness)"""
+        await self._set_market_group(movie_id, "sentiment", sentiment, ttl)
     
     async def get_reddit_sentiment(self, movie_id: str) -> Optional[Dict]:
         """Get cached Reddit sentiment"""
-        key = f"reddit:sentiment:{movie_id}"
-        return await self.cache.get(key)
+        return (await self.get_market_state(movie_id))["sentiment"]
+    
+    async def migrate_legacy_market_keys(self, batch: int = 500) -> int:
+        """Fold the old per-source string keys into market hashes, then drop them.
+        
+        Keeps each key's remaining TTL as the group's freshness; groups already
+        written to the hash more recently are left alone.
+        """
+        client = self.cache.client
+        migrated = 0
+        for group, pattern in LEGACY_MARKET_KEYS.items():
+            prefix = pattern.format("")
+            keys = []
+            async for key in client.scan_iter(match=f"{prefix}*", count=batch):
+                keys.append(key)
+                if len(keys) >= batch:
+                    migrated += await self._migrate_keys(group, prefix, keys)
+                    keys = []
+            if keys:
+                migrated += await self._migrate_keys(group, prefix, keys)
+        return migrated
+    
+    async def _migrate_keys(self, group: str, prefix: str, keys: List[str]) -> int:
+        client = self.cache.client
+        async with client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(key)
+                pipe.ttl(key)
+                pipe.hget(_market_key(key[len(prefix):]), f"{group}:at")
+            results = await pipe.execute()
+        
+        migrated = 0
+        async with client.pipeline(transaction=False) as pipe:
+            for i, key in enumerate(keys):
+                raw, ttl, current_at = results[3 * i:3 * i + 3]
+                if not raw:
+                    continue
+                value = json.loads(raw)
+                written_at = value.get("timestamp") if isinstance(value, dict) else None
+                if not isinstance(value, dict) or (current_at and float(current_at) >= (written_at or 0)):
+                    pipe.delete(key)
+                    continue
+                remaining = ttl if ttl and ttl > 0 else MARKET_GROUPS[group]
+                # Freshness counts from now with the key's remaining lifetime
+                self._queue_market_group(pipe, key[len(prefix):], group, value, remaining)
+                pipe.delete(key)
+                migrated += 1
+            await pipe.execute()
+        return migrated
     
     async def cache_fdfs_hype_zone(self, location: str, hype_data: Dict, ttl: int = 1800):
         """Cache FDFS hype zone data (30 minutes TTL)"""
@@ -171,9 +723,53 @@ class SessionCache:
         return await self.cache.get(key)
     
     async def invalidate_user_session(self, user_id: str) -> bool:
-        """Invalidate user session"""
+        """Invalidate user session and revoke its tokens on every worker.
+        
+        Tokens issued before now are rejected; the revocation is published on
+        SESSION_REVOCATION_CHANNEL and kept for the lifetime of a token so
+        workers started later still see it.
+        """
         key = f"session:{user_id}"
-        return await self.cache.delete(key)
+        deleted = await self.cache.delete(key)
+        revoked_at = int(time.time() * 1000)
+        try:
+            await self.cache.client.set(
+                f"session:revoked:{user_id}", revoked_at,
+                ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+            )
+            await self.cache.client.publish(
+                settings.SESSION_REVOCATION_CHANNEL,
+                json.dumps({"user_id": user_id, "revoked_at": revoked_at})
+            )
+        except Exception as e:
+            logger.error(f"Session revocation publish error for user {user_id}: {e}")
+            return False
+        return deleted
+    
+    async def publish_user_flags(self, user_id: str, flags: Dict) -> bool:
+        """Push changed authorization flags (can_trade, is_premium) to every worker.
+        
+        The flags override those of tokens issued before now. They are kept
+        for the lifetime of a token so workers started later still see them.
+        """
+        set_at = int(time.time() * 1000)
+        key = f"session:flags:{user_id}"
+        try:
+            async with self.cache.client.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={
+                    **{name: json.dumps(value) for name, value in flags.items()},
+                    "set_at": set_at,
+                })
+                pipe.expire(key, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+                await pipe.execute()
+            await self.cache.client.publish(
+                settings.SESSION_REVOCATION_CHANNEL,
+                json.dumps({"user_id": user_id, "flags": flags, "set_at": set_at})
+            )
+            return True
+        except Exception as e:
+            logger.error(f"User flags publish error for user {user_id}: {e}")
+            return False
     
     async def cache_verification_code(self, email: str, code: str, ttl: int = 600):
         """Cache verification code (10 minutes TTL)"""
@@ -0,0 +1,108 @@
+"""
+CineStox Cache Codecs
+Type-tagged binary encoding for cached values
+
+Encoded values start with a two-byte header: the marker 0xFE, then one byte
+holding the codec id (low nibble) and flags (high nibble; 0x80 = zlib).
+0xFE never starts valid UTF-8, so values written before codecs existed
+(plain JSON or strings) are recognised and decoded the old way.
+"""
+
+from app.core.config import settings
+import json
+import msgpack
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+
+MARKER = 0xFE
+FLAG_ZLIB = 0x80
+
+
+class Codec(ABC):
+    """Serializer registered under a one-nibble id"""
+
+    id = 0
+    name = ""
+
+    @abstractmethod
+    def encode(self, value: Any) -> bytes:
+        """Serialize a value (without the header)"""
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """Deserialize a payload produced by ``encode``"""
+
+
+class MsgpackCodec(Codec):
+    """Compact binary; preserves ints, floats, strings, bytes, lists and dicts"""
+
+    id = 1
+    name = "msgpack"
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class JsonCodec(Codec):
+    """UTF-8 JSON, for values other tools need to read"""
+
+    id = 2
+    name = "json"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+CODECS: Dict[int, Codec] = {}
+CODECS_BY_NAME: Dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec):
+    """Make a codec available for encoding by name and decoding by id"""
+    if not 0 < codec.id < 16:
+        raise ValueError("codec id must fit in the low nibble (1-15)")
+    CODECS[codec.id] = codec
+    CODECS_BY_NAME[codec.name] = codec
+
+
+register_codec(MsgpackCodec())
+register_codec(JsonCodec())
+
+
+def encode(value: Any, codec: str = None) -> bytes:
+    """Encode with a header, compressing payloads above the threshold"""
+    if settings.CACHE_WRITE_LEGACY_JSON:
+        # Readable by workers that predate the header (rollout only)
+        return value.encode() if isinstance(value, str) else json.dumps(value).encode()
+
+    chosen = CODECS_BY_NAME[codec or settings.CACHE_CODEC]
+    payload = chosen.encode(value)
+    flags = 0
+    if settings.CACHE_COMPRESS_THRESHOLD and len(payload) > settings.CACHE_COMPRESS_THRESHOLD:
+        compressed = zlib.compress(payload, settings.CACHE_COMPRESS_LEVEL)
+        if len(compressed) < len(payload):
+            payload, flags = compressed, FLAG_ZLIB
+    return bytes((MARKER, flags | chosen.id)) + payload
+
+
+def decode(data: bytes) -> Any:
+    """Decode a tagged value, or a legacy JSON/plain string value"""
+    if len(data) >= 2 and data[0] == MARKER:
+        tag = data[1]
+        payload = data[2:]
+        if tag & FLAG_ZLIB:
+            payload = zlib.decompress(payload)
+        return CODECS[tag & 0x0F].decode(payload)
+
+    text = data.decode("utf-8")
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
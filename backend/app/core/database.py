@@ -5,18 +5,28 @@ CineStox Database Configuration
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, text
+from fastapi import Request
 from app.core.config import settings
+from app.core.cache import redis_client
+from collections import deque
+from typing import List, Optional
+import itertools
 import logging
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _async_url(url: str) -> str:
+    """Convert a postgresql:// URL to its asyncpg form"""
+    return url.replace("postgresql://", "postgresql+asyncpg://")
+
+
 # Database URL conversion for async
-ASYNC_DATABASE_URL = settings.DATABASE_URL.replace(
-    "postgresql://", "postgresql+asyncpg://"
-)
+ASYNC_DATABASE_URL = _async_url(settings.DATABASE_URL)
 
 # Create async engine
 engine = create_async_engine(
@@ -35,6 +45,135 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+
+class PrimaryWal:
+    """Recent WAL positions of the primary, each with when it was first seen.
+    
+    A replica's lag is the age of the oldest position it has not replayed
+    yet, so an idle primary (no new WAL) never makes its replicas look stale.
+    """
+    
+    def __init__(self):
+        self.samples = deque()  # (monotonic time, lsn), lsn strictly increasing
+        self.checked_at = 0.0
+    
+    async def sample(self):
+        """Record the primary's current LSN, at most once per REPLICA_LAG_CHECK_INTERVAL"""
+        if time.monotonic() - self.checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+            return
+        self.checked_at = time.monotonic()
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT pg_current_wal_lsn() - '0/0'::pg_lsn"))
+            lsn = int(result.scalar())
+        now = time.monotonic()
+        if not self.samples or lsn > self.samples[-1][1]:
+            self.samples.append((now, lsn))
+        # Older samples only matter for replicas already past the lag limit
+        horizon = now - 2 * (settings.REPLICA_MAX_LAG_SECONDS + settings.REPLICA_LAG_CHECK_INTERVAL)
+        while len(self.samples) > 1 and self.samples[0][0] < horizon:
+            self.samples.popleft()
+    
+    def lag(self, replayed_lsn: int) -> float:
+        """Seconds since the primary wrote WAL the replica has not replayed"""
+        now = time.monotonic()
+        for seen_at, lsn in self.samples:
+            if lsn > replayed_lsn:
+                return now - seen_at
+        return 0.0
+
+
+class Replica:
+    """A read replica with its own pool and cached replication lag"""
+    
+    def __init__(self, url: str, primary_wal: PrimaryWal):
+        self.engine = create_async_engine(
+            _async_url(url),
+            echo=settings.DEBUG,
+            pool_pre_ping=True,
+            pool_recycle=300,
+            max_overflow=settings.READ_MAX_OVERFLOW,
+            pool_size=settings.READ_POOL_SIZE
+        )
+        self.session_factory = async_sessionmaker(
+            self.engine,
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+        self.primary_wal = primary_wal
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+    
+    async def refresh_lag(self):
+        """Probe replication lag by comparing the replayed LSN with the primary's"""
+        try:
+            # Primary first: a position sampled after the replay probe could look unreplayed
+            await self.primary_wal.sample()
+            async with self.engine.connect() as conn:
+                result = await conn.execute(text("SELECT pg_last_wal_replay_lsn() - '0/0'::pg_lsn"))
+                replayed = result.scalar()
+            # NULL when the server is not in recovery (e.g. a promoted replica)
+            self.lag = 0.0 if replayed is None else self.primary_wal.lag(int(replayed))
+        except Exception as e:
+            logger.error(f"Replica lag check failed: {e}")
+            self.lag = None
+    
+    async def is_healthy(self) -> bool:
+        """Check lag, probing at most once per REPLICA_LAG_CHECK_INTERVAL"""
+        if time.monotonic() - self.checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL:
+            # Claim the probe first so concurrent requests reuse the last reading
+            self.checked_at = time.monotonic()
+            await self.refresh_lag()
+        return self.lag is not None and self.lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+
+class ReplicaRouter:
+    """Round-robin router over healthy read replicas with primary fallback"""
+    
+    def __init__(self, urls: List[str]):
+        self.primary_wal = PrimaryWal()
+        self.replicas = [Replica(url, self.primary_wal) for url in urls]
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+    
+    async def pick(self) -> async_sessionmaker:
+        """Return the session factory of a healthy replica, or the primary's"""
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if await replica.is_healthy():
+                return replica.session_factory
+        return AsyncSessionLocal
+    
+    async def dispose(self):
+        """Close all replica connection pools"""
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replica_router = ReplicaRouter(settings.DATABASE_READ_URLS)
+
+
+# Read-your-writes stickiness
+def _sticky_key(user_id: str) -> str:
+    return f"db:sticky:{user_id}"
+
+
+async def mark_user_wrote(user_id: str):
+    """Pin a user's reads to the primary after they write (e.g. trade)"""
+    try:
+        await redis_client.set(_sticky_key(user_id), 1, ex=settings.READ_YOUR_WRITES_SECONDS)
+    except Exception as e:
+        logger.error(f"Failed to mark read-your-writes for user {user_id}: {e}")
+
+
+async def _is_sticky(user_id: Optional[str]) -> bool:
+    if not user_id:
+        return False
+    try:
+        return bool(await redis_client.exists(_sticky_key(user_id)))
+    except Exception:
+        # Unknown freshness: be safe and read from the primary
+        return True
+
+
 # Base class for models
 Base = declarative_base()
 
@@ -55,6 +194,28 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+async def get_read_db(request: Request) -> AsyncSession:
+    """Dependency to get a read-only database session.
+    
+    Served from a read replica when one is healthy and the requesting user
+    (``request.state.user_id``) has not written recently; otherwise from the primary.
+    """
+    if not replica_router.replicas or await _is_sticky(getattr(request.state, "user_id", None)):
+        session_factory = AsyncSessionLocal
+    else:
+        session_factory = await replica_router.pick()
+    
+    async with session_factory() as session:
+        try:
+            yield session
+        except Exception as e:
+            logger.error(f"Read session error: {e}")
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+
 async def init_db():
     """Initialize database tables"""
     try:
@@ -69,6 +230,7 @@ async def init_db():
 async def close_db():
     """Close database connections"""
     await engine.dispose()
+    await replica_router.dispose()
     logger.info("🔌 Database connections closed")
 
 
@@ -0,0 +1,154 @@
+"""
+CineStox Idempotency Keys
+Redis-backed deduplication for order submission retries
+"""
+
+from fastapi import Header, HTTPException
+from app.core.cache import redis_client
+from app.core.config import settings
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Release the lock only if we still own it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class IdempotencyConflict(Exception):
+    """Raised when a key is reused with a different request payload"""
+
+
+class IdempotencyInProgress(Exception):
+    """Raised when a duplicate is still executing after the wait budget"""
+
+
+def request_fingerprint(payload: Dict[str, Any]) -> str:
+    """Stable hash of the request body, used to detect key reuse"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """Stores the result of the first execution of each (user, key) pair.
+
+    Retries with the same key get the stored result back without touching
+    Postgres; concurrent duplicates are collapsed behind a short Redis lock.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or redis_client
+        self.ttl = settings.IDEMPOTENCY_KEY_TTL
+        self.lock_ttl_ms = settings.IDEMPOTENCY_LOCK_TTL_MS
+        self.poll_interval = 0.05
+        self._release_lock = self.client.register_script(_RELEASE_LOCK_SCRIPT)
+
+    def _result_key(self, user_id: str, key: str) -> str:
+        return f"idem:{user_id}:{key}"
+
+    def _lock_key(self, user_id: str, key: str) -> str:
+        return f"idem:lock:{user_id}:{key}"
+
+    async def get(self, user_id: str, key: str, fingerprint: str) -> Optional[Dict]:
+        """Return the stored result for a key, if the original request completed"""
+        raw = await self.client.get(self._result_key(user_id, key))
+        if not raw:
+            return None
+        record = json.loads(raw)
+        if record["fingerprint"] != fingerprint:
+            raise IdempotencyConflict(f"Idempotency key {key} was used with a different request")
+        return record["result"]
+
+    async def _wait_for_result(self, user_id: str, key: str, fingerprint: str) -> Optional[Dict]:
+        """Poll for the in-flight duplicate's result until its lock expires"""
+        deadline = asyncio.get_running_loop().time() + self.lock_ttl_ms / 1000
+        while asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            result = await self.get(user_id, key, fingerprint)
+            if result is not None:
+                return result
+            if not await self.client.exists(self._lock_key(user_id, key)):
+                return None
+        return None
+
+    async def run(
+        self,
+        user_id: str,
+        key: str,
+        payload: Dict[str, Any],
+        execute: Callable[[], Awaitable[Dict]]
+    ) -> Dict:
+        """Execute ``execute`` at most once per (user, key) and return its result"""
+        fingerprint = request_fingerprint(payload)
+
+        result = await self.get(user_id, key, fingerprint)
+        if result is not None:
+            return result
+
+        token = str(uuid.uuid4())
+        lock_key = self._lock_key(user_id, key)
+        while not await self.client.set(lock_key, token, nx=True, px=self.lock_ttl_ms):
+            # Another request with this key is executing: wait for its result
+            result = await self._wait_for_result(user_id, key, fingerprint)
+            if result is not None:
+                return result
+            if await self.client.exists(lock_key):
+                raise IdempotencyInProgress(f"Request with idempotency key {key} is still processing")
+
+        try:
+            # Re-check under the lock: the holder may have finished just before we got it
+            result = await self.get(user_id, key, fingerprint)
+            if result is not None:
+                return result
+
+            result = await execute()
+            record = json.dumps({"fingerprint": fingerprint, "result": result}, default=str)
+            await self.client.set(self._result_key(user_id, key), record, ex=self.ttl)
+            return result
+        finally:
+            try:
+                await self._release_lock(keys=[lock_key], args=[token])
+            except Exception as e:
+                logger.error(f"Failed to release idempotency lock {lock_key}: {e}")
+
+
+async def get_idempotency_key(
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+) -> Optional[str]:
+    """Dependency reading the Idempotency-Key header.
+
+    Keys are also stored in ``Trade.order_id``, so they must fit in 36 characters.
+    """
+    if idempotency_key is not None and not 1 <= len(idempotency_key) <= 36:
+        raise HTTPException(status_code=400, detail="Idempotency-Key must be 1-36 characters")
+    return idempotency_key
+
+
+async def submit_idempotent(
+    user_id: str,
+    idempotency_key: Optional[str],
+    payload: Dict[str, Any],
+    execute: Callable[[], Awaitable[Dict]]
+) -> Dict:
+    """Run an order submission, deduplicated when an idempotency key is given"""
+    if not idempotency_key:
+        return await execute()
+    try:
+        return await idempotency_store.run(user_id, idempotency_key, payload, execute)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+idempotency_store = IdempotencyStore()
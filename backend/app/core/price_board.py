@@ -0,0 +1,236 @@
+"""
+CineStox Price Board
+Fixed-layout shared-memory board of live prices, shared by every worker on a host
+
+Layout (little-endian):
+
+    header   64 bytes: 8s magic b"CSXPRICE", I layout, I capacity, I count,
+             I reserved, Q generation, d heartbeat (unix seconds of last publish)
+    slots    capacity x 88 bytes: Q seq, 40s movie id, d price, d high_24h,
+             d low_24h, d volume_24h, d expires_at
+
+One updater process writes (see app.services.price_board_updater); every
+worker maps the same segment and reads it without a Redis round trip. Each
+slot is guarded by a seqlock: the writer makes ``seq`` odd, writes the
+fields, then makes it even again, and readers retry if ``seq`` was odd or
+changed while they read. Ordinals are assigned once and never reused until
+the board is re-created (which bumps ``generation``), so readers index new
+movies incrementally. A stale heartbeat means no updater is alive and
+readers fall back to Redis.
+"""
+
+from app.core.config import settings
+import logging
+import math
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CSXPRICE"
+LAYOUT_VERSION = 1
+HEADER = struct.Struct("<8sIIIIQd")
+HEADER_SIZE = 64
+SLOT = struct.Struct("<Q40sddddd")
+SEQ = struct.Struct("<Q")
+COUNT = struct.Struct("<I")
+GENERATION = struct.Struct("<Q")
+HEARTBEAT = struct.Struct("<d")
+COUNT_OFFSET = 16
+GENERATION_OFFSET = 24
+HEARTBEAT_OFFSET = 32
+READ_RETRIES = 8
+ATTACH_RETRY_SECONDS = 5.0
+
+# (movie_id, price, high_24h, low_24h, volume_24h, expires_at)
+BoardRow = Tuple[str, float, float, float, float, float]
+
+
+def _untrack(shm: shared_memory.SharedMemory):
+    # The segment outlives any one worker: stop this process's resource
+    # tracker from unlinking it at exit (Python < 3.13 tracks attachers too)
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+class PriceBoard:
+    """A writer or reader handle on the shared price board"""
+
+    def __init__(self, name: str = None, capacity: int = None):
+        self.name = name or settings.PRICE_BOARD_NAME
+        self.capacity = capacity or settings.PRICE_BOARD_CAPACITY
+        self.size = HEADER_SIZE + SLOT.size * self.capacity
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._buf: Optional[memoryview] = None
+        self._ordinals: Dict[str, int] = {}
+        self._generation = 0
+        self._indexed = 0
+        self._writer = False
+        self._next_attach = 0.0
+
+    # Writer side
+
+    def create(self):
+        """(Re)initialise the board for writing; call only from the elected updater"""
+        self.close()
+        try:
+            shm = shared_memory.SharedMemory(self.name, create=True, size=self.size)
+        except FileExistsError:
+            # Left behind by a previous updater: reuse if the size fits, else replace
+            shm = shared_memory.SharedMemory(self.name)
+            if shm.size < self.size:
+                shm.close()
+                shm.unlink()
+                shm = shared_memory.SharedMemory(self.name, create=True, size=self.size)
+        _untrack(shm)
+        self._shm = shm
+        self._buf = shm.buf
+        self._writer = True
+        self._ordinals = {}
+        self._indexed = 0
+        # A previous updater killed mid-write leaves a slot's seq odd: round
+        # every seq up to even (never back, so readers still see a change)
+        for ordinal in range(self.capacity):
+            offset = HEADER_SIZE + ordinal * SLOT.size
+            seq = SEQ.unpack_from(self._buf, offset)[0]
+            if seq & 1:
+                SEQ.pack_into(self._buf, offset, seq + 1)
+        # A new generation tells readers their ordinal index is void
+        previous = GENERATION.unpack_from(self._buf, GENERATION_OFFSET)[0] if self._valid_header() else 0
+        self._generation = max(previous + 1, time.time_ns())
+        HEADER.pack_into(self._buf, 0, MAGIC, LAYOUT_VERSION, self.capacity, 0, 0, self._generation, 0.0)
+
+    def publish(self, rows: Iterable[BoardRow]) -> int:
+        """Write rows into their slots (assigning ordinals to new movies)"""
+        buf = self._buf
+        written = 0
+        added = False
+        for movie_id, price, high, low, volume, expires_at in rows:
+            ordinal = self._ordinals.get(movie_id)
+            if ordinal is None:
+                if len(self._ordinals) >= self.capacity:
+                    logger.error(f"Price board full ({self.capacity} slots); {movie_id} not published")
+                    continue
+                ordinal = self._ordinals[movie_id] = len(self._ordinals)
+                added = True
+            offset = HEADER_SIZE + ordinal * SLOT.size
+            seq = SEQ.unpack_from(buf, offset)[0]
+            SEQ.pack_into(buf, offset, seq + 1)
+            SLOT.pack_into(buf, offset, seq + 1, movie_id.encode(), price, high, low, volume, expires_at)
+            SEQ.pack_into(buf, offset, seq + 2)
+            written += 1
+        if added:
+            # Count last: readers only index slots whose id is already written
+            COUNT.pack_into(buf, COUNT_OFFSET, len(self._ordinals))
+        HEARTBEAT.pack_into(buf, HEARTBEAT_OFFSET, time.time())
+        return written
+
+    # Reader side
+
+    def _valid_header(self) -> bool:
+        magic, layout, capacity = HEADER.unpack_from(self._buf, 0)[:3]
+        return magic == MAGIC and layout == LAYOUT_VERSION and capacity > 0
+
+    def _attach(self) -> bool:
+        now = time.monotonic()
+        if now < self._next_attach:
+            return False
+        self._next_attach = now + ATTACH_RETRY_SECONDS
+        try:
+            shm = shared_memory.SharedMemory(self.name)
+        except (FileNotFoundError, OSError):
+            return False
+        _untrack(shm)
+        self._shm, self._buf = shm, shm.buf
+        if not self._valid_header():
+            self.close()
+            return False
+        self.capacity = HEADER.unpack_from(self._buf, 0)[2]
+        self._ordinals, self._generation, self._indexed = {}, 0, 0
+        return True
+
+    def _heartbeat_fresh(self) -> bool:
+        heartbeat = HEARTBEAT.unpack_from(self._buf, HEARTBEAT_OFFSET)[0]
+        return time.time() - heartbeat <= settings.PRICE_BOARD_MAX_AGE_SECONDS
+
+    @property
+    def available(self) -> bool:
+        """True while a board is mapped and its updater is alive"""
+        if not settings.PRICE_BOARD_ENABLED:
+            return False
+        if self._buf is None and not self._attach():
+            return False
+        if self._heartbeat_fresh():
+            return True
+        if not self._writer:
+            # The updater may have moved to a new segment: re-attach later
+            self.close()
+        return False
+
+    def _sync_index(self):
+        """Index ordinals published since the last read"""
+        generation = GENERATION.unpack_from(self._buf, GENERATION_OFFSET)[0]
+        if generation != self._generation:
+            self._ordinals, self._generation, self._indexed = {}, generation, 0
+        count = COUNT.unpack_from(self._buf, COUNT_OFFSET)[0]
+        for ordinal in range(self._indexed, min(count, self.capacity)):
+            movie_id = SLOT.unpack_from(self._buf, HEADER_SIZE + ordinal * SLOT.size)[1].rstrip(b"\0")
+            self._ordinals[movie_id.decode()] = ordinal
+        self._indexed = count
+
+    def read(self, movie_id: str) -> Optional[Tuple[float, float, float, float, float]]:
+        """Consistent (price, high, low, volume, expires_at) for one movie, if on the board"""
+        ordinal = self._ordinals.get(movie_id)
+        if ordinal is None:
+            return None
+        buf = self._buf
+        offset = HEADER_SIZE + ordinal * SLOT.size
+        for _ in range(READ_RETRIES):
+            before = SEQ.unpack_from(buf, offset)[0]
+            if before & 1:
+                continue
+            values = SLOT.unpack_from(buf, offset)
+            if SEQ.unpack_from(buf, offset)[0] == before:
+                # The board may have been re-created since this index was built
+                if values[1].rstrip(b"\0") != movie_id.encode():
+                    return None
+                return values[2:]
+        return None
+
+    def get_quotes(self, movie_ids: List[str]) -> Dict[str, Dict[str, float]]:
+        """Fresh price, 24h high/low and volume per movie ({} when unavailable; None for unknown stats)"""
+        if not self.available:
+            return {}
+        self._sync_index()
+        now = time.time()
+        quotes = {}
+        for movie_id in movie_ids:
+            values = self.read(movie_id)
+            if values is not None and values[4] >= now:
+                price, high, low, volume = (None if math.isnan(v) else v for v in values[:4])
+                quotes[movie_id] = {"price": price, "high_24h": high, "low_24h": low, "volume_24h": volume}
+        return quotes
+
+    def get_prices(self, movie_ids: List[str]) -> Dict[str, float]:
+        """Fresh prices for the movies on the board ({} when unavailable)"""
+        return {movie_id: quote["price"] for movie_id, quote in self.get_quotes(movie_ids).items()}
+
+    def close(self):
+        """Unmap the board (the segment itself stays for other workers)"""
+        if self._shm is not None:
+            self._buf = None
+            try:
+                self._shm.close()
+            except BufferError:
+                pass
+            self._shm = None
+        self._writer = False
+
+
+price_board = PriceBoard()
@@ -0,0 +1,156 @@
+"""
+CineStox Admission Control
+Per-user/per-IP token buckets and a global in-flight cap for trading
+"""
+
+from fastapi import HTTPException, Request
+from app.core.cache import redis_client
+from app.core.config import settings
+import logging
+import uuid
+from typing import Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# One round trip per check: refill and test both buckets, test the global
+# in-flight set, and only then consume a token from each bucket.
+#
+# KEYS: user bucket, ip bucket, in-flight zset
+# ARGV: has_user, user_rate, user_burst, ip_rate, ip_burst, inflight_cap, inflight_ttl_ms, request_token
+# Returns: {allowed, reason, retry_after_ms}
+_ADMISSION_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local function refill(key, rate, burst)
+    local b = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(b[1])
+    local ts = tonumber(b[2])
+    if tokens == nil then
+        return burst
+    end
+    return math.min(burst, tokens + (now - ts) * rate / 1000)
+end
+
+local function store(key, tokens, rate, burst)
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000) + 1000)
+end
+
+local has_user = ARGV[1] == '1'
+local user_rate, user_burst = tonumber(ARGV[2]), tonumber(ARGV[3])
+local ip_rate, ip_burst = tonumber(ARGV[4]), tonumber(ARGV[5])
+
+local user_tokens = 0
+if has_user then
+    user_tokens = refill(KEYS[1], user_rate, user_burst)
+    if user_tokens < 1 then
+        return {0, 'user', math.ceil((1 - user_tokens) / user_rate * 1000)}
+    end
+end
+
+local ip_tokens = refill(KEYS[2], ip_rate, ip_burst)
+if ip_tokens < 1 then
+    return {0, 'ip', math.ceil((1 - ip_tokens) / ip_rate * 1000)}
+end
+
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+if redis.call('ZCARD', KEYS[3]) >= tonumber(ARGV[6]) then
+    return {0, 'inflight', 0}
+end
+redis.call('ZADD', KEYS[3], now + tonumber(ARGV[7]), ARGV[8])
+
+if has_user then
+    store(KEYS[1], user_tokens - 1, user_rate, user_burst)
+end
+store(KEYS[2], ip_tokens - 1, ip_rate, ip_burst)
+return {1, '', 0}
+"""
+
+INFLIGHT_KEY = "admission:inflight"
+
+
+class AdmissionController:
+    """Token-bucket rate limiting and load shedding for trading routes.
+
+    Over-limit callers get 429 with Retry-After; when the cluster-wide
+    in-flight cap (``MAX_CONCURRENT_TRADES``) is reached requests are shed
+    with 503. A per-process counter sheds locally before touching Redis.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or redis_client
+        self.inflight_cap = settings.MAX_CONCURRENT_TRADES
+        self.local_inflight = 0
+        self._script = self.client.register_script(_ADMISSION_SCRIPT)
+
+    def _limits(self, is_premium: bool):
+        if is_premium:
+            return settings.RATE_LIMIT_PREMIUM_PER_SECOND, settings.RATE_LIMIT_PREMIUM_BURST
+        return settings.RATE_LIMIT_USER_PER_SECOND, settings.RATE_LIMIT_USER_BURST
+
+    async def admit(self, user_id: Optional[str], ip: str, is_premium: bool = False) -> str:
+        """Admit a request or raise 429/503. Returns a token for ``release``."""
+        if self.local_inflight >= self.inflight_cap:
+            raise HTTPException(status_code=503, detail="Trading is busy, please retry", headers={"Retry-After": "1"})
+
+        token = str(uuid.uuid4())
+        user_rate, user_burst = self._limits(is_premium)
+        try:
+            allowed, reason, retry_after_ms = await self._script(
+                keys=[f"ratelimit:user:{user_id}", f"ratelimit:ip:{ip}", INFLIGHT_KEY],
+                args=[
+                    1 if user_id else 0,
+                    user_rate, user_burst,
+                    settings.RATE_LIMIT_IP_PER_SECOND, settings.RATE_LIMIT_IP_BURST,
+                    self.inflight_cap, settings.ADMISSION_INFLIGHT_TTL_MS,
+                    token
+                ]
+            )
+        except Exception as e:
+            # Fail open on Redis errors; the local cap still applies
+            logger.error(f"Admission check failed, admitting request: {e}")
+            allowed, reason, retry_after_ms = 1, "", 0
+            token = None
+
+        if not int(allowed):
+            if reason == "inflight":
+                raise HTTPException(status_code=503, detail="Trading is busy, please retry", headers={"Retry-After": "1"})
+            retry_after = max(1, -(-int(retry_after_ms) // 1000))
+            raise HTTPException(status_code=429, detail="Too many requests", headers={"Retry-After": str(retry_after)})
+
+        self.local_inflight += 1
+        return token
+
+    async def release(self, token: Optional[str]):
+        """Release an admitted request's in-flight slot"""
+        self.local_inflight -= 1
+        if token is None:
+            return
+        try:
+            await self.client.zrem(INFLIGHT_KEY, token)
+        except Exception as e:
+            # The slot expires after ADMISSION_INFLIGHT_TTL_MS anyway
+            logger.error(f"Failed to release in-flight slot: {e}")
+
+
+admission_controller = AdmissionController()
+
+
+async def admission_control(request: Request):
+    """Router dependency enforcing rate limits and the in-flight cap.
+
+    Identity comes from ``request.state`` (``user_id``, ``is_premium``) as set
+    by authentication; anonymous requests are limited by IP only.
+    """
+    user_id = getattr(request.state, "user_id", None)
+    is_premium = getattr(request.state, "is_premium", False)
+    ip = request.client.host if request.client else "unknown"
+
+    token = await admission_controller.admit(user_id, ip, is_premium)
+    try:
+        yield
+    finally:
+        await admission_controller.release(token)
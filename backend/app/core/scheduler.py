@@ -0,0 +1,284 @@
+"""
+CineStox Job Scheduler
+In-process periodic jobs, run by exactly one replica per occurrence
+
+Every replica runs the same scheduler. When a job comes due, each replica
+tries to claim that occurrence with ``SET NX`` on a key derived from the
+scheduled time, so one replica wins and the rest skip it. A second, renewed
+lease is held while the job runs, so a slow run is never overlapped by the
+next occurrence on another replica.
+"""
+
+from app.core.cache import redis_client
+from app.core.config import settings
+import asyncio
+import logging
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Extend or release the running lease only while we still own it
+_RENEW_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> Set[int]:
+    """Values matched by one cron field: *, a-b, */n, a-b/n and comma lists"""
+    values = set()
+    for part in field.split(","):
+        expr, _, step = part.partition("/")
+        if expr == "*":
+            start, end = low, high
+        elif "-" in expr:
+            start, end = (int(x) for x in expr.split("-", 1))
+        else:
+            start = end = int(expr)
+        if step:
+            end = high if expr != "*" and "-" not in expr else end
+        if start < low or end > high or start > end:
+            raise ValueError(f"cron field {field!r} out of range {low}-{high}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+
+class CronSchedule:
+    """Standard 5-field cron expression (minute hour day month weekday), in UTC"""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes = _parse_cron_field(fields[0], 0, 59)
+        self.hours = _parse_cron_field(fields[1], 0, 23)
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        # 0 and 7 are both Sunday
+        self.weekdays = {d % 7 for d in _parse_cron_field(fields[4], 0, 7)}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.isoweekday() % 7) in self.weekdays
+        # Cron semantics: when both are restricted, either may match
+        if not self.any_day and not self.any_weekday:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """First matching minute strictly after ``after``"""
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                month = moment.month + 1
+                moment = moment.replace(year=moment.year + (month > 12), month=(month - 1) % 12 + 1,
+                                        day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"cron expression never matches: {self.expression!r}")
+
+
+class Job:
+    """A scheduled coroutine with its schedule and runtime metrics"""
+
+    def __init__(self, name: str, func: Callable[[], Awaitable], interval: Optional[float] = None,
+                 cron: Optional[str] = None, jitter: float = 0.0, timeout: Optional[float] = None):
+        if (interval is None) == (cron is None):
+            raise ValueError("a job needs exactly one of interval or cron")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cron = CronSchedule(cron) if cron else None
+        self.jitter = jitter
+        self.timeout = timeout
+        self.running = False
+        self.metrics = {
+            "runs": 0,
+            "failures": 0,
+            "skipped": 0,
+            "last_started_at": None,
+            "last_duration": None,
+            "max_duration": 0.0,
+            "total_duration": 0.0,
+            "last_error": None,
+            "next_run_at": None,
+        }
+
+    def next_occurrence(self, now: float) -> float:
+        """Next scheduled time (unix seconds) after ``now``.
+
+        Interval jobs are aligned to multiples of the interval so every
+        replica computes the same occurrence.
+        """
+        if self.interval:
+            return (now // self.interval + 1) * self.interval
+        moment = datetime.fromtimestamp(now, tz=timezone.utc)
+        return self.cron.next_after(moment).timestamp()
+
+    @property
+    def period(self) -> float:
+        """Rough spacing between occurrences, used to size leases"""
+        if self.interval:
+            return self.interval
+        now = time.time()
+        first = self.next_occurrence(now)
+        return self.next_occurrence(first) - first
+
+
+class Scheduler:
+    """Runs registered jobs on every replica; Redis decides who executes"""
+
+    def __init__(self, client=None):
+        self.client = client or redis_client
+        self.jobs: Dict[str, Job] = {}
+        self.instance = str(uuid.uuid4())
+        self._tasks: List[asyncio.Task] = []
+        self._runs: Set[asyncio.Task] = set()
+        self._renew_lease = self.client.register_script(_RENEW_LEASE_SCRIPT)
+        self._release_lease = self.client.register_script(_RELEASE_LEASE_SCRIPT)
+
+    def add_interval(self, name: str, seconds: float, func: Callable[[], Awaitable],
+                     jitter: float = 0.0, timeout: Optional[float] = None) -> Job:
+        """Run ``func`` every ``seconds`` (aligned to the epoch)"""
+        return self._add(Job(name, func, interval=seconds, jitter=jitter, timeout=timeout))
+
+    def add_cron(self, name: str, expression: str, func: Callable[[], Awaitable],
+                 jitter: float = 0.0, timeout: Optional[float] = None) -> Job:
+        """Run ``func`` on a 5-field cron schedule (UTC)"""
+        return self._add(Job(name, func, cron=expression, jitter=jitter, timeout=timeout))
+
+    def _add(self, job: Job) -> Job:
+        if job.name in self.jobs:
+            raise ValueError(f"job {job.name} already registered")
+        self.jobs[job.name] = job
+        return job
+
+    async def _claim(self, job: Job, occurrence: float) -> bool:
+        """Claim one occurrence for this replica (first SET NX wins)"""
+        key = f"scheduler:claim:{job.name}:{int(occurrence)}"
+        ttl_ms = int(max(job.period, 1) * 2000)
+        return bool(await self.client.set(key, self.instance, nx=True, px=ttl_ms))
+
+    async def _keep_lease(self, key: str, token: str, ttl_ms: int):
+        while True:
+            await asyncio.sleep(ttl_ms / 3000)
+            await self._renew_lease(keys=[key], args=[token, ttl_ms])
+
+    async def run_job(self, job: Job) -> bool:
+        """Run a job now if no replica is already running it"""
+        if job.running:
+            job.metrics["skipped"] += 1
+            return False
+
+        lease_key = f"scheduler:running:{job.name}"
+        token = f"{self.instance}:{uuid.uuid4()}"
+        ttl_ms = settings.SCHEDULER_LEASE_MS
+        if not await self.client.set(lease_key, token, nx=True, px=ttl_ms):
+            job.metrics["skipped"] += 1
+            return False
+
+        job.running = True
+        keeper = asyncio.create_task(self._keep_lease(lease_key, token, ttl_ms))
+        started = time.monotonic()
+        job.metrics["last_started_at"] = time.time()
+        status = "ok"
+        try:
+            await asyncio.wait_for(job.func(), timeout=job.timeout)
+            job.metrics["last_error"] = None
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            status = "failed"
+            job.metrics["failures"] += 1
+            job.metrics["last_error"] = repr(e)
+            logger.error(f"Scheduled job {job.name} failed: {e}")
+        finally:
+            duration = time.monotonic() - started
+            job.running = False
+            job.metrics["runs"] += 1
+            job.metrics["last_duration"] = duration
+            job.metrics["total_duration"] += duration
+            job.metrics["max_duration"] = max(job.metrics["max_duration"], duration)
+            keeper.cancel()
+            try:
+                await self._release_lease(keys=[lease_key], args=[token])
+                # Cluster-wide view: last run of each job, whichever replica ran it
+                await self.client.hset(f"scheduler:metrics:{job.name}", mapping={
+                    "last_started_at": job.metrics["last_started_at"],
+                    "last_duration": duration,
+                    "last_status": status,
+                    "last_runner": self.instance,
+                })
+            except Exception as e:
+                logger.error(f"Scheduler lease release failed for {job.name}: {e}")
+        return status == "ok"
+
+    async def _loop(self, job: Job):
+        while True:
+            occurrence = job.next_occurrence(time.time())
+            job.metrics["next_run_at"] = occurrence
+            await asyncio.sleep(max(0.0, occurrence - time.time()) + random.uniform(0, job.jitter))
+            try:
+                if await self._claim(job, occurrence):
+                    # Run in the background so a slow run never delays the schedule
+                    run = asyncio.create_task(self.run_job(job))
+                    self._runs.add(run)
+                    run.add_done_callback(self._runs.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Scheduler claim failed for {job.name}: {e}")
+
+    def metrics(self) -> Dict[str, Dict]:
+        """Per-job runtime metrics for this replica"""
+        return {
+            name: {**job.metrics, "running": job.running,
+                   "schedule": job.cron.expression if job.cron else f"every {job.interval:g}s"}
+            for name, job in self.jobs.items()
+        }
+
+    def start(self):
+        """Start one loop per job (call from the app lifespan)"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._loop(job)) for job in self.jobs.values()]
+
+    async def stop(self):
+        """Stop scheduling and cancel runs in progress (their leases are released)"""
+        tasks = self._tasks + list(self._runs)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+
+scheduler = Scheduler()
@@ -0,0 +1,224 @@
+"""
+CineStox Security
+Signed access tokens verified locally, with an in-process claims cache
+"""
+
+from fastapi import HTTPException, Request
+from jose import JWTError, jwt
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.cache import redis_client
+from app.core.config import settings
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def create_access_token(user, expires_delta: Optional[timedelta] = None) -> str:
+    """Issue a signed access token carrying the flags authorization needs"""
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+    claims = {
+        "sub": user.id,
+        "exp": expire,
+        "iat_ms": int(time.time() * 1000),
+        "can_trade": user.can_trade,
+        "is_premium": user.is_premium,
+    }
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+class TokenVerifier:
+    """Verifies access tokens without I/O.
+
+    Decoded claims are kept in a bounded LRU with a short TTL, so a hot token
+    costs a dict lookup. Revocations and flag changes arrive over Redis
+    pub/sub (see ``SessionCache.invalidate_user_session`` and
+    ``SessionCache.publish_user_flags``), are persisted in Redis for workers
+    started later, and are applied to every worker's local state. Both are
+    kept for the lifetime of an access token: after that, every token they
+    could apply to has expired.
+    """
+
+    def __init__(self):
+        self.max_size = settings.SESSION_CLAIMS_CACHE_SIZE
+        self.ttl = settings.SESSION_CLAIMS_CACHE_TTL
+        self.token_lifetime_ms = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 * 1000
+        self._claims: "OrderedDict[str, tuple]" = OrderedDict()
+        # Oldest change first, so expired entries are dropped from the front
+        self._revoked_at: "OrderedDict[str, int]" = OrderedDict()
+        self._flags: "OrderedDict[str, tuple]" = OrderedDict()  # user_id -> (flags, set_at ms)
+        self._listener: Optional[asyncio.Task] = None
+
+    def verify(self, token: str) -> Optional[Dict]:
+        """Return the claims of a valid, unrevoked token, or None"""
+        now = time.monotonic()
+        cached = self._claims.get(token)
+        if cached and cached[1] > now:
+            self._claims.move_to_end(token)
+            claims = cached[0]
+        else:
+            try:
+                claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            except JWTError:
+                self._claims.pop(token, None)
+                return None
+            self._claims[token] = (claims, now + self.ttl)
+            self._claims.move_to_end(token)
+            if len(self._claims) > self.max_size:
+                self._claims.popitem(last=False)
+
+        # exp is checked on decode; re-check for cached entries
+        if claims["exp"] <= time.time():
+            self._claims.pop(token, None)
+            return None
+
+        user_id = claims["sub"]
+        if claims.get("iat_ms", 0) <= self._revoked_at.get(user_id, -1):
+            return None
+
+        # Tokens issued after a flag change already carry the new flags
+        flags = self._flags.get(user_id)
+        if flags and claims.get("iat_ms", 0) <= flags[1]:
+            claims = {**claims, **flags[0]}
+        return claims
+
+    def _expire(self, entries: OrderedDict, changed_at):
+        """Drop changes older than a token's lifetime from the front of ``entries``"""
+        horizon = int(time.time() * 1000) - self.token_lifetime_ms
+        while entries and changed_at(next(iter(entries.values()))) < horizon:
+            entries.popitem(last=False)
+
+    def revoke(self, user_id: str, revoked_at: int):
+        """Reject tokens for a user issued at or before ``revoked_at`` (ms)"""
+        revoked_at = max(revoked_at, self._revoked_at.pop(user_id, 0))
+        self._revoked_at[user_id] = revoked_at
+        self._expire(self._revoked_at, lambda value: value)
+
+    def set_flags(self, user_id: str, flags: Dict, set_at: int):
+        """Override token flags (can_trade, is_premium) of tokens issued at or before ``set_at`` (ms)"""
+        current = self._flags.pop(user_id, None)
+        if current and current[1] > set_at:
+            # An older change arriving late (catch-up after a newer message)
+            flags, set_at = {**flags, **current[0]}, current[1]
+        elif current:
+            flags = {**current[0], **flags}
+        self._flags[user_id] = (flags, set_at)
+        self._expire(self._flags, lambda value: value[1])
+
+    def _handle_message(self, data: str):
+        message = json.loads(data)
+        if "revoked_at" in message:
+            self.revoke(message["user_id"], int(message["revoked_at"]))
+        if "flags" in message:
+            self.set_flags(message["user_id"], message["flags"], int(message["set_at"]))
+
+    async def _load_revocations(self):
+        """Catch up on revocations and flag changes published before this worker started"""
+        async for key in redis_client.scan_iter(match="session:revoked:*", count=1000):
+            value = await redis_client.get(key)
+            if value:
+                self.revoke(key.split(":", 2)[2], int(value))
+        async for key in redis_client.scan_iter(match="session:flags:*", count=1000):
+            stored = await redis_client.hgetall(key)
+            if stored:
+                set_at = int(stored.pop("set_at", 0))
+                flags = {name: json.loads(value) for name, value in stored.items()}
+                self.set_flags(key.split(":", 2)[2], flags, set_at)
+
+    async def _listen(self):
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                # Subscribe before catching up so nothing falls between the two
+                await pubsub.subscribe(settings.SESSION_REVOCATION_CHANNEL)
+                await self._load_revocations()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Session revocation listener error, reconnecting: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+    def start(self):
+        """Start the revocation listener (call from the app lifespan)"""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        """Stop the revocation listener"""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+token_verifier = TokenVerifier()
+
+
+class AuthContextMiddleware:
+    """Populates ``request.state`` from a Bearer token without any I/O.
+
+    Sets ``user_id``, ``can_trade`` and ``is_premium`` for valid tokens so
+    dependencies such as admission control and read-replica routing can use
+    them; requests without a valid token pass through anonymously.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    scheme, _, token = value.decode("latin-1").partition(" ")
+                    claims = token_verifier.verify(token) if scheme.lower() == "bearer" else None
+                    if claims:
+                        state = scope.setdefault("state", {})
+                        state["user_id"] = claims["sub"]
+                        state["can_trade"] = claims.get("can_trade", False)
+                        state["is_premium"] = claims.get("is_premium", False)
+                    break
+        await self.app(scope, receive, send)
+
+
+async def get_current_user_id(request: Request) -> str:
+    """Dependency requiring an authenticated user"""
+    user_id = getattr(request.state, "user_id", None)
+    if not user_id:
+        raise HTTPException(
+            status_code=401,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return user_id
+
+
+async def require_can_trade(request: Request) -> str:
+    """Dependency requiring an authenticated user who is allowed to trade"""
+    user_id = await get_current_user_id(request)
+    if not getattr(request.state, "can_trade", False):
+        raise HTTPException(status_code=403, detail="Trading is not enabled for this account")
+    return user_id
+
+
+async def require_admin(request: Request) -> str:
+    """Dependency requiring an authenticated operator (listed in ADMIN_USER_IDS)"""
+    user_id = await get_current_user_id(request)
+    if user_id not in settings.ADMIN_USER_IDS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user_id
@@ -0,0 +1,141 @@
+"""
+CineStox Startup Helpers
+Fast cold start: lazy routers, Alembic revision check, pool pre-warming
+"""
+
+from fastapi import APIRouter, FastAPI
+from sqlalchemy import text
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.core.database import engine
+from app.core.cache import redis_binary_client, redis_client
+import asyncio
+import importlib
+import logging
+from typing import List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LazyRouterApp:
+    """ASGI app that imports an endpoint module on its first request.
+
+    Heavy endpoint modules (pandas, scikit-learn, web3, google-cloud-speech)
+    are mounted behind this wrapper so the process can accept traffic before
+    they are imported. Routes of lazy modules are not listed in /docs.
+    """
+
+    def __init__(self, module_path: str, dependencies: Optional[list] = None):
+        self.module_path = module_path
+        self.dependencies = dependencies or []
+        self._router: Optional[ASGIApp] = None
+        self._lock = asyncio.Lock()
+
+    async def _load(self) -> ASGIApp:
+        async with self._lock:
+            if self._router is None:
+                # Import in a thread so the event loop keeps serving other requests
+                module = await asyncio.to_thread(importlib.import_module, self.module_path)
+                router = APIRouter(dependencies=self.dependencies)
+                router.include_router(module.router)
+                self._router = router
+                logger.info(f"📦 Loaded lazy router {self.module_path}")
+        return self._router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        router = self._router or await self._load()
+        await router(scope, receive, send)
+
+
+async def check_schema_revision() -> bool:
+    """Check that the database is at the Alembic head revision.
+
+    Replaces ``Base.metadata.create_all`` on boot: a single indexed read
+    instead of reflecting every table.
+    """
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(Config(settings.ALEMBIC_CONFIG))
+    heads = set(script.get_heads())
+
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            current = {row[0] for row in result}
+    except Exception as e:
+        logger.error(f"❌ Could not read alembic_version: {e}")
+        return False
+
+    if current != heads:
+        logger.error(
+            f"❌ Database revision {sorted(current)} does not match head {sorted(heads)}. "
+            f"Run 'alembic upgrade head'."
+        )
+        return False
+
+    logger.info(f"✅ Database schema at revision {', '.join(sorted(heads))}")
+    return True
+
+
+async def warm_db_pool(connections: int = None) -> int:
+    """Open pooled database connections ahead of the first request"""
+    connections = min(connections or settings.DB_POOL_WARM_CONNECTIONS, engine.pool.size())
+
+    async def _checkout():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Held concurrently so the pool really grows to `connections`
+    results = await asyncio.gather(*[_checkout() for _ in range(connections)], return_exceptions=True)
+    warmed = sum(1 for r in results if not isinstance(r, Exception))
+    logger.info(f"🔥 Warmed {warmed}/{connections} database connections")
+    return warmed
+
+
+async def warm_redis_pool(connections: int = None) -> int:
+    """Open pooled Redis connections (text and binary clients) ahead of the first request"""
+    connections = connections or settings.REDIS_POOL_WARM_CONNECTIONS
+    results = await asyncio.gather(
+        *[client.ping() for client in (redis_client, redis_binary_client) for _ in range(connections)],
+        return_exceptions=True
+    )
+    warmed = sum(1 for r in results if not isinstance(r, Exception)) // 2
+    logger.info(f"🔥 Warmed {warmed}/{connections} Redis connections")
+    return warmed
+
+
+async def fast_startup() -> List[str]:
+    """Run fast-startup checks, returning a list of problems (empty when ready)"""
+    problems = []
+    schema_ok, db_warmed, redis_warmed = await asyncio.gather(
+        check_schema_revision(),
+        warm_db_pool(),
+        warm_redis_pool(),
+    )
+    if not schema_ok:
+        problems.append("database schema is not at Alembic head")
+    if not db_warmed:
+        problems.append("database unreachable")
+    if not redis_warmed:
+        problems.append("redis unreachable")
+    return problems
+
+
+async def recheck_until_ready(app: FastAPI, interval: float = None):
+    """Re-run fast-startup checks until they pass, then mark the app ready.
+
+    Started when the checks fail at boot, so a database or Redis blip
+    during startup does not keep /ready at 503 for the process lifetime.
+    """
+    interval = interval or settings.STARTUP_RECHECK_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        problems = await fast_startup()
+        if not problems:
+            app.state.ready = True
+            logger.info("🎬 Fast-startup checks passed, CineStox is ready")
+            return
+        logger.error(f"❌ Still not ready: {', '.join(problems)}")
@@ -0,0 +1,47 @@
+"""
+CineStox Balance Ledger Models
+"""
+
+from sqlalchemy import Column, String, BigInteger, Float, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class LedgerEntry(Base):
+    """Append-only record of one change to a user's cash balance"""
+
+    __tablename__ = "balance_ledger"
+    __table_args__ = (
+        Index("ix_balance_ledger_user_id_id", "user_id", "id"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    amount = Column(Float, nullable=False)  # Signed change
+    balance_after = Column(Float, nullable=False)  # users.current_balance once applied
+    entry_type = Column(String(20), nullable=False)  # trade, deposit, fee, adjustment
+    reference_id = Column(String(36), nullable=True)  # e.g. the trade id
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<LedgerEntry(user={self.user_id}, amount={self.amount}, type={self.entry_type})>"
+
+
+class BalanceCheckpoint(Base):
+    """Verified balance of a user as of a ledger entry"""
+
+    __tablename__ = "balance_checkpoints"
+    __table_args__ = (
+        Index("ix_balance_checkpoints_user_entry", "user_id", "ledger_entry_id"),
+        Index("ix_balance_checkpoints_entry", "ledger_entry_id"),  # Where the next run starts
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    ledger_entry_id = Column(BigInteger, nullable=False)  # Last entry folded into this balance
+    balance = Column(Float, nullable=False)
+    drift = Column(Float, default=0.0)  # Ledger replay minus recorded balance (should be 0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<BalanceCheckpoint(user={self.user_id}, entry={self.ledger_entry_id}, balance={self.balance})>"
@@ -0,0 +1,29 @@
+"""
+CineStox Market History Model
+"""
+
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class MarketHistory(Base):
+    """Point-in-time market state of a movie, recorded periodically"""
+    
+    __tablename__ = "market_history"
+    __table_args__ = (
+        Index("ix_market_history_movie_recorded", "movie_id", "recorded_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    movie_id = Column(String(36), ForeignKey("movies.id"), nullable=False)
+    recorded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    
+    # Market state at recorded_at
+    price = Column(Float, nullable=False)
+    hype_score = Column(Float, nullable=False)
+    reddit_sentiment = Column(Float, nullable=False)
+    volume_24h = Column(Float, default=0.0)
+    
+    def __repr__(self):
+        return f"<MarketHistory(movie={self.movie_id}, at={self.recorded_at}, price={self.price})>"
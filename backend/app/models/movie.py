@@ -76,6 +76,11 @@ class Movie(Base):
     current_price = Column(Float, default=100.0)
     total_shares = Column(Integer, default=1000000)  # Total shares available
     available_shares = Column(Integer, default=1000000)  # Shares available for trading
+    pricing_mode = Column(String(20), default="order_book")  # "order_book" or "amm"
+    amm_liquidity = Column(Float, nullable=True)  # AMM share depth override (None = settings default)
+    amm_shares_reserve = Column(Float, nullable=True)  # AMM pool reserves (None = not yet traded)
+    amm_cash_reserve = Column(Float, nullable=True)
+    amm_version = Column(Integer, default=0, nullable=False)  # Bumped on every AMM fill
     
     # Market data
     market_cap = Column(Float, default=100000000.0)  # Total market value
@@ -101,6 +106,9 @@ class Movie(Base):
     is_festival_release = Column(Boolean, default=False)  # Sankranthi, Diwali, etc.
     is_clan_boosted = Column(Boolean, default=False)  # Boosted by fan clans
     
+    # Prediction NFTs reserved so far (capped at MAX_NFT_SUPPLY; also the last serial issued)
+    nft_supply_used = Column(Integer, default=0, nullable=False, server_default="0")
+    
     # Metadata
     poster_url = Column(String(500), nullable=True)
     backdrop_url = Column(String(500), nullable=True)
@@ -154,6 +162,11 @@ class Movie(Base):
             return 0.0
         return ((self.current_price - self.initial_price) / self.initial_price) * 100
     
+    @property
+    def is_amm_priced(self) -> bool:
+        """Check if movie is quoted by the automated market maker"""
+        return self.pricing_mode == "amm"
+    
     @property
     def market_cap_current(self) -> float:
         """Calculate current market cap"""
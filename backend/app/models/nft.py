@@ -0,0 +1,56 @@
+"""
+CineStox Prediction NFT Model
+"""
+
+from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime, Text, JSON, Enum, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+import uuid
+import enum
+
+
+class NFTStatus(enum.Enum):
+    """Minting lifecycle"""
+    QUEUED = "queued"  # Supply reserved, waiting for a batch
+    SUBMITTED = "submitted"  # In a batch transaction awaiting confirmation
+    MINTED = "minted"  # Confirmed on chain
+    FAILED = "failed"  # Gave up after NFT_MINT_MAX_ATTEMPTS
+
+
+class NFT(Base):
+    """Prediction NFT: one numbered edition of a movie's capped supply"""
+
+    __tablename__ = "nfts"
+    __table_args__ = (
+        Index("uq_nfts_movie_serial", "movie_id", "serial", unique=True),
+        Index("ix_nfts_status_created", "status", "created_at"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    movie_id = Column(String(36), ForeignKey("movies.id"), nullable=False)
+    owner_id = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)
+    prediction_id = Column(String(36), ForeignKey("predictions.id"), nullable=True, unique=True)
+    serial = Column(Integer, nullable=False)  # Edition number within the movie, 1..MAX_NFT_SUPPLY
+
+    # Minting
+    status = Column(Enum(NFTStatus), default=NFTStatus.QUEUED, nullable=False)
+    fee_paid = Column(Float, default=0.0)  # Charged on request; refunded if minting fails
+    attempts = Column(Integer, default=0)
+    batch_id = Column(String(36), nullable=True, index=True)
+    tx_hash = Column(String(100), nullable=True)
+    token_id = Column(BigInteger, nullable=True)
+    error = Column(Text, nullable=True)
+    token_metadata = Column(JSON, default={})
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    submitted_at = Column(DateTime(timezone=True), nullable=True)
+    minted_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    movie = relationship("Movie", back_populates="nfts")
+    owner = relationship("User", back_populates="nfts")
+
+    def __repr__(self):
+        return f"<NFT(movie={self.movie_id}, serial={self.serial}, status={self.status.value})>"
@@ -0,0 +1,112 @@
+"""
+CineStox Tournament Models
+"""
+
+from sqlalchemy import Column, String, Integer, Float, DateTime, JSON, Enum, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+import uuid
+import enum
+
+
+class TournamentKind(enum.Enum):
+    """Tournament format"""
+    SANKRANTHI_BATTLE = "sankranthi_battle"  # Festival releases only, hourly standings
+    BATTLE_ROYALE = "battle_royale"  # Whole market, bottom of the table eliminated each round
+
+
+class TournamentStatus(enum.Enum):
+    """Tournament lifecycle"""
+    UPCOMING = "upcoming"
+    ACTIVE = "active"
+    FINISHED = "finished"
+
+
+class Tournament(Base):
+    """Time-boxed trading competition scored on trades inside its window"""
+
+    __tablename__ = "tournaments"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    name = Column(String(200), nullable=False)
+    kind = Column(Enum(TournamentKind), nullable=False)
+    status = Column(Enum(TournamentStatus), default=TournamentStatus.UPCOMING, index=True)
+    movie_ids = Column(JSON, default=[])  # Movies whose trades count (empty: all)
+    starts_at = Column(DateTime(timezone=True), nullable=False)
+    ends_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Elimination rounds
+    round_minutes = Column(Integer, default=60)  # Time between standings snapshots
+    elimination_fraction = Column(Float, default=0.0)  # Share of survivors knocked out per round
+    rounds_taken = Column(Integer, default=0)
+    last_round_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Trades before this instant are folded into tournament_positions
+    folded_until = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<Tournament(name={self.name}, kind={self.kind}, status={self.status})>"
+
+
+class TournamentEntry(Base):
+    """A user's enrolment in a tournament"""
+
+    __tablename__ = "tournament_entries"
+
+    tournament_id = Column(String(36), ForeignKey("tournaments.id"), primary_key=True)
+    user_id = Column(String(36), ForeignKey("users.id"), primary_key=True)
+    enrolled_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    eliminated_at = Column(DateTime(timezone=True), nullable=True)  # Trades after this no longer count
+    eliminated_round = Column(Integer, nullable=True)
+    final_rank = Column(Integer, nullable=True)
+
+    def __repr__(self):
+        return f"<TournamentEntry(tournament={self.tournament_id}, user={self.user_id})>"
+
+
+class TournamentPosition(Base):
+    """Running totals of a participant's in-window trades in one movie"""
+
+    __tablename__ = "tournament_positions"
+
+    tournament_id = Column(String(36), ForeignKey("tournaments.id"), primary_key=True)
+    user_id = Column(String(36), primary_key=True)
+    movie_id = Column(String(36), primary_key=True)
+    cash = Column(Float, default=0.0, nullable=False)  # Sale and short proceeds minus purchase and cover costs
+    net_shares = Column(Integer, default=0, nullable=False)  # Bought and covered minus sold and shorted
+
+    def __repr__(self):
+        return f"<TournamentPosition(user={self.user_id}, movie={self.movie_id}, net_shares={self.net_shares})>"
+
+
+class TournamentFoldedTrade(Base):
+    """A trade already added to tournament_positions, so re-scanned windows skip it"""
+
+    __tablename__ = "tournament_folded_trades"
+
+    tournament_id = Column(String(36), ForeignKey("tournaments.id"), primary_key=True)
+    trade_id = Column(String(36), primary_key=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)  # The trade's, for pruning
+
+    def __repr__(self):
+        return f"<TournamentFoldedTrade(tournament={self.tournament_id}, trade={self.trade_id})>"
+
+
+class TournamentStanding(Base):
+    """A participant's P&L and rank as of one round's snapshot"""
+
+    __tablename__ = "tournament_standings"
+    __table_args__ = (
+        Index("ix_tournament_standings_round_rank", "tournament_id", "round", "rank"),
+    )
+
+    tournament_id = Column(String(36), ForeignKey("tournaments.id"), primary_key=True)
+    round = Column(Integer, primary_key=True)
+    user_id = Column(String(36), primary_key=True)
+    pnl = Column(Float, nullable=False)
+    rank = Column(Integer, nullable=False)
+    taken_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<TournamentStanding(round={self.round}, user={self.user_id}, rank={self.rank})>"
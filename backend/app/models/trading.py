@@ -2,7 +2,7 @@
 CineStox Trading Models
 """
 
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, JSON, Enum, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, JSON, Enum, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -41,11 +41,19 @@ class Trade(Base):
     """Trade model for CineStox"""
     
     __tablename__ = "trades"
+    __table_args__ = (
+        # Range-partitioned by created_at (see app.services.trade_partitions);
+        # every index is per partition, so the hot one stays small
+        Index("ix_trades_user_created", "user_id", "created_at"),
+        Index("ix_trades_movie_created", "movie_id", "created_at"),
+        Index("ix_trades_created_brin", "created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     # Core trade fields
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)
-    movie_id = Column(String(36), ForeignKey("movies.id"), nullable=False, index=True)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    movie_id = Column(String(36), ForeignKey("movies.id"), nullable=False)
     
     # Trade details
     trade_type = Column(Enum(TradeType), nullable=False)
@@ -69,12 +77,12 @@ class Trade(Base):
     profit_loss_percentage = Column(Float, default=0.0)  # P&L percentage
     
     # Metadata
-    order_id = Column(String(36), nullable=True)  # External order ID
+    order_id = Column(String(36), nullable=True)  # Client idempotency key / external order ID
     notes = Column(Text, nullable=True)  # User notes
     tags = Column(JSON, default=[])  # Trade tags
     
-    # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Timestamps (created_at is the partition key, so part of the primary key)
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
@@ -124,6 +132,24 @@ class Trade(Base):
         self.updated_at = datetime.utcnow()
 
 
+class TradeOrderKey(Base):
+    """Durable backstop for idempotent order submission.
+
+    Unique indexes on the partitioned trades table must include created_at,
+    so (user_id, order_id) uniqueness is enforced here instead.
+    """
+    
+    __tablename__ = "trade_order_keys"
+    
+    user_id = Column(String(36), primary_key=True)
+    order_id = Column(String(36), primary_key=True)
+    trade_id = Column(String(36), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<TradeOrderKey(user={self.user_id}, order={self.order_id}, trade={self.trade_id})>"
+
+
 class Portfolio(Base):
     """Portfolio model for user holdings"""
     
@@ -115,7 +115,7 @@ class User(Base):
             return "Beginner Trader"
     
     def update_balance(self, amount: float, trade_type: str = "trade"):
-        """Update user balance after trade"""
+        """Update the in-memory balance (persisted changes go through app.services.ledger)"""
         self.current_balance += amount
         if trade_type == "trade":
             self.total_profit_loss += amount
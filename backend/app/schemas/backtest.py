@@ -0,0 +1,94 @@
+"""
+CineStox Backtest Pydantic Schemas
+"""
+
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+from datetime import datetime, timezone
+from enum import Enum
+
+
+class SignalField(str, Enum):
+    """Market series a signal condition reads"""
+    PRICE = "price"
+    HYPE_SCORE = "hype_score"
+    REDDIT_SENTIMENT = "reddit_sentiment"
+    VOLUME = "volume_24h"
+
+
+class SignalOperator(str, Enum):
+    """Signal condition operator"""
+    GT = "gt"
+    GTE = "gte"
+    LT = "lt"
+    LTE = "lte"
+    CROSSES_ABOVE = "crosses_above"
+    CROSSES_BELOW = "crosses_below"
+
+
+class StrategySide(str, Enum):
+    """Position opened on a signal"""
+    BUY = "buy"
+    SHORT = "short"
+
+
+class BeforeEvent(str, Enum):
+    """Only take signals before a movie milestone"""
+    TRAILER_RELEASE = "trailer_release"
+    TEASER_RELEASE = "teaser_release"
+    RELEASE = "release"
+
+
+class SignalCondition(BaseModel):
+    """One condition, e.g. hype_score crosses_above 80"""
+    field: SignalField
+    op: SignalOperator
+    threshold: float
+
+
+class StrategyRule(BaseModel):
+    """Entry conditions (all must hold) and exit rules"""
+    conditions: List[SignalCondition] = Field(..., min_length=1, max_length=10)
+    side: StrategySide = StrategySide.BUY
+    hold_steps: int = Field(24, ge=1, le=10000)  # Exit after this many time steps
+    take_profit_pct: Optional[float] = Field(None, gt=0)
+    stop_loss_pct: Optional[float] = Field(None, gt=0)
+    before_event: Optional[BeforeEvent] = None
+    position_size: int = Field(10, ge=1)  # Shares per trade
+
+
+class BacktestWindow(BaseModel):
+    """History window and resolution"""
+    movie_ids: Optional[List[str]] = None  # None = all movies with history
+    start: datetime
+    end: datetime
+    interval_minutes: int = Field(60, ge=1, le=10080)
+
+    @field_validator("start", "end")
+    @classmethod
+    def as_utc(cls, value: datetime) -> datetime:
+        """History timestamps are aware: read naive input as UTC"""
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+
+class BacktestRequest(BacktestWindow):
+    """Single strategy backtest"""
+    rule: StrategyRule
+
+
+class BacktestSweepRequest(BacktestWindow):
+    """Parameter sweep: many rules over the same history"""
+    rules: List[StrategyRule] = Field(..., min_length=1, max_length=5000)
+
+
+class BacktestResult(BaseModel):
+    """Backtest performance summary"""
+    trades: int
+    total_pnl: float
+    average_return_pct: float
+    hit_rate: float  # % of trades with positive P&L
+    max_drawdown: float  # Largest peak-to-trough fall of cumulative P&L
+    best_trade: float
+    worst_trade: float
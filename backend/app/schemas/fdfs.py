@@ -0,0 +1,55 @@
+"""
+CineStox FDFS Hype Zone Pydantic Schemas
+"""
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+# Redis GEO (Web Mercator) rejects latitudes beyond this
+GEO_MAX_LATITUDE = 85.05112878
+
+
+class CheckInRequest(BaseModel):
+    """Fan check-in at (or on the way to) an FDFS show"""
+    latitude: float = Field(..., ge=-GEO_MAX_LATITUDE, le=GEO_MAX_LATITUDE)
+    longitude: float = Field(..., ge=-180, le=180)
+    excitement: float = Field(5.0, ge=0, le=10)
+
+
+class CheckInResponse(BaseModel):
+    """Zone the check-in counts towards"""
+    movie_id: str
+    theatre_id: Optional[str] = None  # None when no theatre is close enough
+
+
+class NearbyCheckIn(BaseModel):
+    """Check-in within a radius"""
+    user_id: str
+    distance_km: float
+
+
+class RadiusHype(BaseModel):
+    """Aggregated hype of all zones within a radius"""
+    movie_id: str
+    radius_km: float
+    theatre_id: Optional[str] = None
+    theatres: int
+    active_zones: int
+    check_ins: int
+    hype: float
+    average_excitement: float
+
+
+class HypeZone(BaseModel):
+    """One theatre zone's hype"""
+    theatre_id: str
+    name: Optional[str] = None
+    city: Optional[str] = None
+    hype: float
+    check_ins: int
+    average_excitement: float
+
+
+class NearbyCheckInList(BaseModel):
+    """Check-ins near a point, nearest first"""
+    check_ins: List[NearbyCheckIn]
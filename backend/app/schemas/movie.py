@@ -188,6 +188,33 @@ class MovieSentimentUpdate(BaseModel):
     timestamp: Optional[datetime] = None
 
 
+class TradeSide(str, Enum):
+    """AMM trade side"""
+    BUY = "buy"
+    SELL = "sell"
+
+
+class MovieQuoteRequest(BaseModel):
+    """AMM quote request for one movie"""
+    movie_id: str
+    side: TradeSide = TradeSide.BUY
+    shares: int = Field(..., gt=0)
+
+
+class MovieQuote(BaseModel):
+    """AMM quote with price impact and slippage estimate"""
+    movie_id: str
+    side: Optional[TradeSide] = None
+    shares: Optional[int] = None
+    spot_price: Optional[float] = None
+    average_price: Optional[float] = None
+    total: Optional[float] = None
+    new_price: Optional[float] = None
+    price_impact: Optional[float] = None  # % move of the spot price
+    slippage: Optional[float] = None  # % of average price vs spot
+    error: Optional[str] = None
+
+
 class TrendingMovie(BaseModel):
     """Trending movie schema"""
     movie: MovieResponse
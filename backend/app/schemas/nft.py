@@ -0,0 +1,47 @@
+"""
+CineStox Prediction NFT Pydantic Schemas
+"""
+
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from enum import Enum
+
+
+class NFTStatus(str, Enum):
+    """Minting lifecycle"""
+    QUEUED = "queued"
+    SUBMITTED = "submitted"
+    MINTED = "minted"
+    FAILED = "failed"
+
+
+class MintRequest(BaseModel):
+    """Mint a movie NFT (optionally for one of your predictions) for NFT_MINTING_FEE"""
+    movie_id: str
+    prediction_id: Optional[str] = None
+
+
+class NFTResponse(BaseModel):
+    """NFT schema; poll until status is minted or failed"""
+    id: str
+    movie_id: str
+    owner_id: str
+    prediction_id: Optional[str] = None
+    serial: int
+    status: NFTStatus
+    fee_paid: float = 0.0
+    tx_hash: Optional[str] = None
+    token_id: Optional[int] = None
+    error: Optional[str] = None
+    token_metadata: Dict[str, Any] = {}
+    created_at: Optional[datetime] = None
+    minted_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class NFTList(BaseModel):
+    """A user's NFTs, newest first"""
+    nfts: List[NFTResponse]
@@ -0,0 +1,32 @@
+"""
+CineStox Portfolio Pydantic Schemas
+"""
+
+from pydantic import BaseModel
+from typing import List
+
+
+class PositionSnapshot(BaseModel):
+    """One movie position valued at the live price"""
+    movie_id: str
+    shares_owned: int
+    shares_shorted: int
+    net_position: int
+    average_buy_price: float
+    average_sell_price: float
+    current_price: float
+    current_value: float
+    unrealized_pnl: float
+    realized_pnl: float
+    total_invested: float
+    total_return: float
+
+
+class PortfolioSnapshot(BaseModel):
+    """A user's positions and totals at live prices"""
+    user_id: str
+    positions: List[PositionSnapshot] = []
+    current_value: float
+    unrealized_pnl: float
+    realized_pnl: float
+    total_invested: float
@@ -0,0 +1,79 @@
+"""
+CineStox Tournament Pydantic Schemas
+"""
+
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from enum import Enum
+
+
+class TournamentKind(str, Enum):
+    """Tournament format"""
+    SANKRANTHI_BATTLE = "sankranthi_battle"
+    BATTLE_ROYALE = "battle_royale"
+
+
+class TournamentStatus(str, Enum):
+    """Tournament lifecycle"""
+    UPCOMING = "upcoming"
+    ACTIVE = "active"
+    FINISHED = "finished"
+
+
+class TournamentResponse(BaseModel):
+    """Tournament schema"""
+    id: str
+    name: str
+    kind: TournamentKind
+    status: TournamentStatus
+    movie_ids: List[str] = []
+    starts_at: datetime
+    ends_at: datetime
+    round_minutes: int
+    elimination_fraction: float
+    rounds_taken: int
+    last_round_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TournamentEntryResponse(BaseModel):
+    """Enrolment schema"""
+    tournament_id: str
+    user_id: str
+    enrolled_at: datetime
+    eliminated_at: Optional[datetime] = None
+    eliminated_round: Optional[int] = None
+    final_rank: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class LeaderboardRow(BaseModel):
+    """One participant in a round's table"""
+    user_id: str
+    rank: int
+    pnl: float
+
+
+class Leaderboard(BaseModel):
+    """A page of the latest round's table"""
+    tournament_id: str
+    round: int
+    taken_at: Optional[datetime] = None
+    rows: List[LeaderboardRow]
+
+
+class TournamentStandingResponse(BaseModel):
+    """A participant's latest rank and in-window P&L"""
+    user_id: str
+    round: int
+    rank: Optional[int] = None
+    pnl: float
+    participants: int
+    eliminated: bool
+    eliminated_round: Optional[int] = None
+    final_rank: Optional[int] = None
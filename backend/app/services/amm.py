@@ -0,0 +1,215 @@
+"""
+CineStox Automated Market Maker
+Constant-product quoting for illiquid movie contracts
+"""
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import redis_client, trading_cache
+from app.core.config import settings
+from app.models.movie import Movie
+import logging
+from typing import Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BUY = "buy"
+SELL = "sell"
+
+
+class QuoteError(ValueError):
+    """Raised when a quote cannot be served (size beyond pool bounds)"""
+
+
+class ConstantProductPool:
+    """x * y = k pool: ``shares`` reserve x, ``cash`` reserve y, spot price y / x"""
+
+    __slots__ = ("shares", "cash", "fee")
+
+    def __init__(self, shares: float, cash: float, fee: float):
+        self.shares = shares
+        self.cash = cash
+        self.fee = fee
+
+    @classmethod
+    def seed(cls, movie: Movie) -> "ConstantProductPool":
+        """The movie's persisted reserves, or bounded liquidity seeded from its shares and price"""
+        fee = settings.AMM_FEE_BPS / 10000
+        if movie.amm_shares_reserve and movie.amm_cash_reserve:
+            return cls(movie.amm_shares_reserve, movie.amm_cash_reserve, fee)
+        depth = movie.amm_liquidity or max(1.0, movie.available_shares * settings.AMM_LIQUIDITY_FRACTION)
+        return cls(depth, depth * movie.current_price, fee)
+
+    @property
+    def price(self) -> float:
+        return self.cash / self.shares
+
+    def trade(self, side: str, shares: float) -> Tuple[float, float, float]:
+        """Cost (or proceeds) of a trade with the fee, and the reserves after it"""
+        if shares <= 0:
+            raise QuoteError("shares must be positive")
+        if shares > self.shares * settings.AMM_MAX_TRADE_FRACTION:
+            raise QuoteError("order exceeds available AMM liquidity")
+
+        if side == BUY:
+            gross = self.cash * shares / (self.shares - shares)
+            return gross * (1 + self.fee), self.shares - shares, self.cash + gross
+        if side == SELL:
+            gross = self.cash * shares / (self.shares + shares)
+            return gross * (1 - self.fee), self.shares + shares, self.cash - gross
+        raise QuoteError(f"unknown side {side}")
+
+    def quote(self, side: str, shares: float) -> Dict:
+        """Quote a trade in O(1): total cost/proceeds, average price and impact"""
+        spot = self.price
+        total, new_shares, new_cash = self.trade(side, shares)
+        average_price = total / shares
+        new_price = new_cash / new_shares
+        return {
+            "side": side,
+            "shares": shares,
+            "spot_price": spot,
+            "average_price": average_price,
+            "total": total,
+            "new_price": new_price,
+            "price_impact": (new_price - spot) / spot * 100,
+            "slippage": abs(average_price - spot) / spot * 100
+        }
+
+
+# Cache the pool unless a newer version is already there. The movies row is
+# the source of truth; every fill bumps its amm_version. The TTL bounds how
+# long a pool stays stale when a fill commits but its publish fails.
+#
+# KEYS: pool hash
+# ARGV: shares, cash, fee, version, ttl
+# Returns: 1 if stored, 0 if the cached pool is as new or newer
+_STORE_POOL_SCRIPT = """
+local cached = redis.call('HGET', KEYS[1], 'version')
+if cached and tonumber(cached) >= tonumber(ARGV[4]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'shares', ARGV[1], 'cash', ARGV[2], 'fee', ARGV[3], 'version', ARGV[4])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[5]))
+return 1
+"""
+
+_store_pool_script = redis_client.register_script(_STORE_POOL_SCRIPT)
+
+
+def _pool_key(movie_id: str) -> str:
+    return f"amm:pool:{movie_id}"
+
+
+def _pool_from_hash(data: List[Optional[str]]) -> Optional[ConstantProductPool]:
+    if not data or data[0] is None:
+        return None
+    return ConstantProductPool(float(data[0]), float(data[1]), float(data[2]))
+
+
+async def _store_pool(movie_id: str, pool: ConstantProductPool, version: int) -> bool:
+    stored = await _store_pool_script(
+        keys=[_pool_key(movie_id)],
+        args=[repr(pool.shares), repr(pool.cash), repr(pool.fee), version, settings.AMM_POOL_CACHE_TTL]
+    )
+    return int(stored) == 1
+
+
+async def get_pools(db: AsyncSession, movie_ids: List[str]) -> Dict[str, ConstantProductPool]:
+    """Load pools for many movies in one Redis round trip, seeding missing ones"""
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for movie_id in movie_ids:
+            pipe.hmget(_pool_key(movie_id), "shares", "cash", "fee")
+        results = await pipe.execute()
+
+    pools = {}
+    missing = []
+    for movie_id, data in zip(movie_ids, results):
+        pool = _pool_from_hash(data)
+        if pool:
+            pools[movie_id] = pool
+        else:
+            missing.append(movie_id)
+
+    if missing:
+        result = await db.execute(
+            select(Movie).where(Movie.id.in_(missing), Movie.pricing_mode == "amm")
+        )
+        for movie in result.scalars().all():
+            pool = ConstantProductPool.seed(movie)
+            await _store_pool(movie.id, pool, movie.amm_version or 0)
+            pools[movie.id] = pool
+
+    return pools
+
+
+async def quote_many(db: AsyncSession, requests: List[Tuple[str, str, float]]) -> List[Dict]:
+    """Quote many (movie_id, side, shares) requests in one call"""
+    pools = await get_pools(db, list({movie_id for movie_id, _, _ in requests}))
+    quotes = []
+    for movie_id, side, shares in requests:
+        pool = pools.get(movie_id)
+        if pool is None:
+            quotes.append({"movie_id": movie_id, "error": "movie is not AMM priced"})
+            continue
+        try:
+            quotes.append({"movie_id": movie_id, **pool.quote(side, shares)})
+        except QuoteError as e:
+            quotes.append({"movie_id": movie_id, "error": str(e)})
+    return quotes
+
+
+async def fill(db: AsyncSession, movie_id: str, side: str, shares: int, limit_total: float) -> Dict:
+    """Execute against the pool in the caller's transaction.
+
+    ``limit_total`` is the most a buyer will pay (or least a seller accepts).
+    The movie row is locked, the fill is priced from its persisted reserves,
+    and reserves, price and available shares are written back in one UPDATE,
+    so concurrent fills serialize on the row and a rollback undoes all of it.
+    Commit, then pass the result to ``publish_fill``.
+    """
+    result = await db.execute(
+        select(Movie).where(Movie.id == movie_id).with_for_update()
+    )
+    movie = result.scalar_one_or_none()
+    if movie is None or not movie.is_amm_priced:
+        raise QuoteError("movie is not AMM priced")
+
+    pool = ConstantProductPool.seed(movie)
+    total, new_shares, new_cash = pool.trade(side, shares)
+    if (side == BUY and total > limit_total) or (side == SELL and total < limit_total):
+        raise QuoteError("fill rejected: slippage")
+    delta = shares if side == BUY else -shares
+    if movie.available_shares - delta < 0:
+        raise QuoteError("not enough shares available")
+
+    new_price = new_cash / new_shares
+    version = (movie.amm_version or 0) + 1
+    await db.execute(
+        text(
+            "UPDATE movies SET amm_shares_reserve = :reserve_shares, amm_cash_reserve = :reserve_cash, "
+            "amm_version = :version, current_price = :price, "
+            "available_shares = available_shares - :delta, "
+            "high_24h = GREATEST(high_24h, :price), low_24h = LEAST(low_24h, :price), "
+            "last_price_update = now() "
+            "WHERE id = :movie_id"
+        ),
+        {"reserve_shares": new_shares, "reserve_cash": new_cash, "version": version,
+         "price": new_price, "delta": delta, "movie_id": movie_id}
+    )
+    return {
+        "movie_id": movie_id, "side": side, "shares": shares, "total": total, "new_price": new_price,
+        "pool": ConstantProductPool(new_shares, new_cash, pool.fee), "version": version
+    }
+
+
+async def publish_fill(filled: Dict):
+    """Refresh the cached pool and price after the fill's transaction commits"""
+    try:
+        # Refreshes from concurrent fills may land in any order; the newest version wins
+        if await _store_pool(filled["movie_id"], filled["pool"], filled["version"]):
+            await trading_cache.cache_movie_price(filled["movie_id"], filled["new_price"])
+    except Exception as e:
+        logger.error(f"AMM pool refresh error for movie {filled['movie_id']}: {e}")
@@ -0,0 +1,284 @@
+"""
+CineStox Backtesting Engine
+Vectorized strategy evaluation over price/hype/sentiment history
+"""
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+from app.core.config import settings
+from app.models.market import MarketHistory
+from app.models.movie import Movie
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+import logging
+import multiprocessing
+import numpy as np
+import threading
+from typing import Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SERIES = ("price", "hype_score", "reddit_sentiment", "volume_24h")
+
+EVENT_COLUMNS = {
+    "trailer_release": Movie.trailer_release_date,
+    "teaser_release": Movie.teaser_release_date,
+    "release": Movie.release_date,
+}
+
+
+class BacktestTooLarge(ValueError):
+    """Raised when a window has more movies x time steps than BACKTEST_MAX_CELLS"""
+
+
+class HistoryArrays:
+    """Market history on a regular time grid: one (movies x steps) array per series.
+
+    Gaps are forward-filled; steps before a movie's first observation are NaN.
+    ``event_steps`` maps a milestone name to the first step at or after it per
+    movie (``steps`` when unknown or beyond the window).
+    """
+
+    __slots__ = ("movie_ids", "start", "interval", "steps", "series", "event_steps")
+
+    def __init__(self, movie_ids: List[str], start: datetime, interval: float, steps: int,
+                 series: Dict[str, np.ndarray], event_steps: Dict[str, np.ndarray]):
+        self.movie_ids = movie_ids
+        self.start = start
+        self.interval = interval
+        self.steps = steps
+        self.series = series
+        self.event_steps = event_steps
+
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs along the time axis"""
+    mask = np.isnan(values)
+    idx = np.where(mask, 0, np.arange(values.shape[1]))
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    # Leading gaps stay NaN: they point at column 0, which is NaN itself
+    return values[np.arange(values.shape[0])[:, None], idx]
+
+
+async def record_market_history(db: AsyncSession) -> int:
+    """Append the current market state of every movie to market_history"""
+    result = await db.execute(text(
+        "INSERT INTO market_history (movie_id, recorded_at, price, hype_score, reddit_sentiment, volume_24h) "
+        "SELECT id, now(), current_price, hype_score, reddit_sentiment, volume_24h FROM movies"
+    ))
+    await db.commit()
+    return result.rowcount
+
+
+async def load_history(db: AsyncSession, start: datetime, end: datetime, interval_minutes: int,
+                       movie_ids: Optional[List[str]] = None) -> HistoryArrays:
+    """Load market history into NumPy arrays on a regular grid"""
+    interval = interval_minutes * 60.0
+    steps = max(1, int((end - start).total_seconds() // interval) + 1)
+
+    # Checked before loading: every series is a dense (movies x steps) array
+    if movie_ids:
+        movies = len(set(movie_ids))
+    else:
+        movies = (await db.execute(
+            select(func.count(func.distinct(MarketHistory.movie_id))).where(
+                MarketHistory.recorded_at >= start,
+                MarketHistory.recorded_at <= end
+            )
+        )).scalar()
+    if max(movies, 1) * steps > settings.BACKTEST_MAX_CELLS:
+        raise BacktestTooLarge(
+            f"{movies} movies x {steps} steps exceeds {settings.BACKTEST_MAX_CELLS}; "
+            "narrow the window, pick movies or increase interval_minutes"
+        )
+
+    query = select(
+        MarketHistory.movie_id, MarketHistory.recorded_at, MarketHistory.price,
+        MarketHistory.hype_score, MarketHistory.reddit_sentiment, MarketHistory.volume_24h
+    ).where(
+        MarketHistory.recorded_at >= start,
+        MarketHistory.recorded_at <= end
+    ).order_by(MarketHistory.recorded_at)
+    if movie_ids:
+        query = query.where(MarketHistory.movie_id.in_(movie_ids))
+    rows = (await db.execute(query)).all()
+
+    ids = sorted({row.movie_id for row in rows})
+    index = {movie_id: i for i, movie_id in enumerate(ids)}
+    rows_idx = np.fromiter((index[row.movie_id] for row in rows), dtype=np.int64, count=len(rows))
+    step_idx = np.fromiter(
+        ((row.recorded_at - start).total_seconds() // interval for row in rows),
+        dtype=np.int64, count=len(rows)
+    )
+
+    series = {}
+    for position, name in enumerate(SERIES, start=2):
+        values = np.full((len(ids), steps), np.nan)
+        column = np.fromiter((row[position] if row[position] is not None else np.nan for row in rows),
+                             dtype=np.float64, count=len(rows))
+        # Rows are time-ordered, so the last observation in a step wins
+        values[rows_idx, step_idx] = column
+        series[name] = _forward_fill(values)
+
+    event_steps = {name: np.full(len(ids), steps, dtype=np.int64) for name in EVENT_COLUMNS}
+    if ids:
+        event_rows = (await db.execute(
+            select(Movie.id, *EVENT_COLUMNS.values()).where(Movie.id.in_(ids))
+        )).all()
+        for row in event_rows:
+            for position, name in enumerate(EVENT_COLUMNS, start=1):
+                when = row[position]
+                if when is not None:
+                    step = int(np.ceil((when - start).total_seconds() / interval))
+                    event_steps[name][index[row.id]] = min(max(step, 0), steps)
+
+    return HistoryArrays(ids, start, interval, steps, series, event_steps)
+
+
+def signal_mask(data: HistoryArrays, rule: Dict) -> np.ndarray:
+    """Boolean (movies x steps) mask of entry signals for a rule"""
+    mask = np.ones((len(data.movie_ids), data.steps), dtype=bool)
+    with np.errstate(invalid="ignore"):
+        for condition in rule["conditions"]:
+            x = data.series[condition["field"]]
+            threshold = condition["threshold"]
+            op = condition["op"]
+            if op == "gt":
+                mask &= x > threshold
+            elif op == "gte":
+                mask &= x >= threshold
+            elif op == "lt":
+                mask &= x < threshold
+            elif op == "lte":
+                mask &= x <= threshold
+            elif op in ("crosses_above", "crosses_below"):
+                crossed = np.zeros_like(mask)
+                if op == "crosses_above":
+                    crossed[:, 1:] = (x[:, 1:] >= threshold) & (x[:, :-1] < threshold)
+                else:
+                    crossed[:, 1:] = (x[:, 1:] <= threshold) & (x[:, :-1] > threshold)
+                mask &= crossed
+            else:
+                raise ValueError(f"unknown operator {op}")
+
+    if rule.get("before_event"):
+        mask &= np.arange(data.steps)[None, :] < data.event_steps[rule["before_event"]][:, None]
+    return mask
+
+
+def run_backtest(data: HistoryArrays, rule: Dict) -> Dict:
+    """Evaluate one rule across all movies and time steps.
+
+    Every signal opens a position of ``position_size`` shares, closed after
+    ``hold_steps`` or earlier on take-profit/stop-loss. P&L follows
+    ``Trade.calculate_pnl``: BUY earns (exit - entry), SHORT earns (entry - exit).
+    """
+    price = data.series["price"]
+    mask = signal_mask(data, rule) & ~np.isnan(price)
+    movie_idx, entry_step = np.nonzero(mask)
+    if movie_idx.size == 0:
+        return {"trades": 0, "total_pnl": 0.0, "average_return_pct": 0.0, "hit_rate": 0.0,
+                "max_drawdown": 0.0, "best_trade": 0.0, "worst_trade": 0.0}
+
+    last_step = data.steps - 1
+    sign = 1.0 if rule.get("side", "buy") == "buy" else -1.0
+    shares = rule.get("position_size", 10)
+    hold = rule.get("hold_steps", 24)
+    entry_price = price[movie_idx, entry_step]
+    exit_step = np.minimum(entry_step + hold, last_step)
+
+    take_profit = rule.get("take_profit_pct")
+    stop_loss = rule.get("stop_loss_pct")
+    if take_profit or stop_loss:
+        exited = np.zeros(movie_idx.size, dtype=bool)
+        for k in range(1, hold + 1):
+            step = np.minimum(entry_step + k, last_step)
+            ret = sign * (price[movie_idx, step] - entry_price) / entry_price * 100
+            trigger = np.zeros_like(exited)
+            if take_profit:
+                trigger |= ret >= take_profit
+            if stop_loss:
+                trigger |= ret <= -stop_loss
+            hit = trigger & ~exited
+            exit_step = np.where(hit, step, exit_step)
+            exited |= hit
+            if exited.all():
+                break
+
+    exit_price = price[movie_idx, exit_step]
+    pnl = sign * (exit_price - entry_price) * shares
+    returns = pnl / (entry_price * shares) * 100
+
+    # Realized P&L booked at exit, cumulated over time
+    equity = np.cumsum(np.bincount(exit_step, weights=pnl, minlength=data.steps))
+    peaks = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:]
+
+    return {
+        "trades": int(pnl.size),
+        "total_pnl": float(pnl.sum()),
+        "average_return_pct": float(returns.mean()),
+        "hit_rate": float((pnl > 0).mean() * 100),
+        "max_drawdown": float((peaks - equity).max()),
+        "best_trade": float(pnl.max()),
+        "worst_trade": float(pnl.min())
+    }
+
+
+def _run_chunk(data: HistoryArrays, rules: List[Dict]) -> List[Dict]:
+    return [run_backtest(data, rule) for rule in rules]
+
+
+class SweepPool:
+    """Long-lived process pool for parameter sweeps, shared by every request"""
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned, not forked: the app process has a running loop and open connections
+                self._pool = ProcessPoolExecutor(
+                    max_workers=settings.BACKTEST_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def run(self, data: HistoryArrays, rules: List[Dict]) -> List[Dict]:
+        """Evaluate rules in one chunk per worker, so the history is sent once per worker"""
+        pool = self._executor()
+        chunks = min(settings.BACKTEST_WORKERS, len(rules))
+        size = -(-len(rules) // chunks)
+        futures = [pool.submit(_run_chunk, data, rules[i:i + size]) for i in range(0, len(rules), size)]
+        try:
+            return [result for future in futures for result in future.result()]
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory): start a fresh pool next time
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def stop(self):
+        """Shut the sweep pool down (call from the app lifespan)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+sweep_pool = SweepPool()
+
+
+def run_sweep(data: HistoryArrays, rules: List[Dict], workers: Optional[int] = None) -> List[Dict]:
+    """Evaluate many rules over the same history, in the sweep pool when it pays off"""
+    workers = workers or settings.BACKTEST_WORKERS
+    if workers <= 1 or len(rules) < 2:
+        return _run_chunk(data, rules)
+    return sweep_pool.run(data, rules)
@@ -0,0 +1,256 @@
+"""
+CineStox Catalog Import
+Streams TMDB export files into the movies table through Postgres COPY
+
+Usage:
+    python -m app.services.catalog_import fixtures/tmdb_sample.jsonl [--dry-run]
+"""
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.movie import MovieLanguage, MovieStatus
+from app.services.catalog_snapshot import notify_catalog_changed
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TMDB_IMAGE_BASE = "https://image.tmdb.org/t/p/original"
+MAX_CAST = 10
+
+LANGUAGE_MAP = {
+    "te": MovieLanguage.TELUGU,
+    "hi": MovieLanguage.HINDI,
+    "ta": MovieLanguage.TAMIL,
+    "kn": MovieLanguage.KANNADA,
+    "ml": MovieLanguage.MALAYALAM,
+    "en": MovieLanguage.ENGLISH,
+}
+
+STATUS_MAP = {
+    "Rumored": MovieStatus.ANNOUNCED,
+    "Planned": MovieStatus.ANNOUNCED,
+    "In Production": MovieStatus.IN_PRODUCTION,
+    "Post Production": MovieStatus.POST_PRODUCTION,
+    "Released": MovieStatus.RELEASED,
+    "Canceled": MovieStatus.CANCELLED,
+}
+
+# Staging columns, in COPY order
+COLUMNS = [
+    "id", "tmdb_id", "title", "original_title", "language", "status", "genre",
+    "director", "cast", "runtime", "budget", "release_date", "synopsis",
+    "poster_url", "backdrop_url", "contract_symbol",
+]
+
+# Columns refreshed on re-import; prices, shares and contract_symbol are kept
+UPDATE_COLUMNS = [
+    "title", "original_title", "language", "status", "genre", "director", "cast",
+    "runtime", "budget", "release_date", "synopsis", "poster_url", "backdrop_url",
+]
+
+_STAGING_DDL = """
+CREATE TEMP TABLE movies_import (
+    id varchar(36), tmdb_id integer, title varchar(255), original_title varchar(255),
+    language text, status text, genre text, director text, "cast" text,
+    runtime integer, budget double precision, release_date timestamptz, synopsis text,
+    poster_url varchar(500), backdrop_url varchar(500), contract_symbol varchar(10)
+) ON COMMIT DROP
+"""
+
+_UPSERT_SQL = """
+INSERT INTO movies (
+    id, tmdb_id, title, original_title, language, status, genre, director, "cast",
+    runtime, budget, release_date, synopsis, poster_url, backdrop_url, contract_symbol,
+    initial_price, current_price, total_shares, available_shares, market_cap,
+    volume_24h, price_change_24h, high_24h, low_24h, hype_score, reddit_sentiment,
+    twitter_sentiment, trailer_reaction_score, is_fdfs_event, is_festival_release,
+    is_clan_boosted, producer
+)
+SELECT
+    id, tmdb_id, title, original_title, language::movielanguage, status::moviestatus,
+    genre::json, director::json, "cast"::json, runtime, budget, release_date, synopsis,
+    poster_url, backdrop_url, contract_symbol,
+    100.0, 100.0, 1000000, 1000000, 100000000.0,
+    0.0, 0.0, 100.0, 100.0, 50.0, 0.0,
+    0.0, 0.0, false, false,
+    false, '[]'::json
+FROM movies_import
+ON CONFLICT (tmdb_id) DO UPDATE SET
+    {updates}, updated_at = now()
+""".format(updates=", ".join(f'"{c}" = EXCLUDED."{c}"' for c in UPDATE_COLUMNS))
+
+
+def iter_tmdb_records(path: str) -> Iterator[Dict]:
+    """Yield records from a TMDB JSONL export (optionally gzipped), one line at a time"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"Skipping malformed line {line_no} in {path}: {e}")
+
+
+def _encode_id(tmdb_id: int, width: int = 5) -> str:
+    """Fixed-width base-26 letters for a TMDB id (AAAAA..ZZZZZ covers 11.8M ids)"""
+    letters = []
+    for _ in range(width):
+        tmdb_id, rem = divmod(tmdb_id, 26)
+        letters.append(chr(ord("A") + rem))
+    return "".join(reversed(letters))
+
+
+def generate_contract_symbol(title: str, tmdb_id: int) -> str:
+    """Deterministic, unique symbol: up to 5 title letters + 5-letter TMDB id code"""
+    base = re.sub(r"[^A-Z]", "", (title or "").upper())[:5] or "M"
+    return base + _encode_id(tmdb_id)
+
+
+def _names(items: Optional[Iterable], limit: Optional[int] = None) -> List[str]:
+    """Normalize TMDB name lists ([{"name": ...}] or [str]) to a list of names"""
+    names = []
+    for item in items or []:
+        name = item.get("name") if isinstance(item, dict) else item
+        if name:
+            names.append(name)
+        if limit and len(names) >= limit:
+            break
+    return names
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def _image_url(path: Optional[str]) -> Optional[str]:
+    return f"{TMDB_IMAGE_BASE}{path}" if path else None
+
+
+def transform(record: Dict) -> Optional[tuple]:
+    """Map a TMDB movie record to a staging row (in COLUMNS order), or None to skip"""
+    tmdb_id = record.get("id")
+    title = record.get("title") or record.get("original_title")
+    if not tmdb_id or not title:
+        return None
+
+    credits = record.get("credits") or {}
+    directors = record.get("directors") or [
+        member for member in credits.get("crew", []) if member.get("job") == "Director"
+    ]
+    cast = record.get("cast") or credits.get("cast", [])
+
+    language = LANGUAGE_MAP.get(record.get("original_language"), MovieLanguage.MULTILINGUAL)
+    status = STATUS_MAP.get(record.get("status"), MovieStatus.ANNOUNCED)
+
+    return (
+        str(uuid.uuid4()),
+        int(tmdb_id),
+        title[:255],
+        (record.get("original_title") or "")[:255] or None,
+        # SQLAlchemy Enum columns store member names
+        language.name,
+        status.name,
+        json.dumps(_names(record.get("genres"))),
+        json.dumps(_names(directors)),
+        json.dumps(_names(cast, MAX_CAST)),
+        record.get("runtime") or None,
+        float(record["budget"]) if record.get("budget") else None,
+        _parse_date(record.get("release_date")),
+        record.get("overview") or None,
+        _image_url(record.get("poster_path")),
+        _image_url(record.get("backdrop_path")),
+        generate_contract_symbol(title, int(tmdb_id)),
+    )
+
+
+def iter_batches(rows: Iterable[tuple], batch_size: int) -> Iterator[List[tuple]]:
+    """Group rows into lists of at most ``batch_size``, keeping one tmdb_id per batch"""
+    batch, seen = [], set()
+    for row in rows:
+        if row[1] in seen:
+            # ON CONFLICT cannot touch the same row twice in one statement
+            yield batch
+            batch, seen = [], set()
+        batch.append(row)
+        seen.add(row[1])
+        if len(batch) >= batch_size:
+            yield batch
+            batch, seen = [], set()
+    if batch:
+        yield batch
+
+
+async def _load_batch(conn, batch: List[tuple]):
+    """COPY one batch into a staging table and upsert it, in one transaction"""
+    async with conn.transaction():
+        await conn.execute(_STAGING_DDL)
+        await conn.copy_records_to_table("movies_import", records=batch, columns=COLUMNS)
+        await conn.execute(_UPSERT_SQL)
+
+
+async def import_tmdb_file(path: str, batch_size: int = None, dry_run: bool = False) -> Dict[str, int]:
+    """Stream a TMDB export into the movies table. Returns import counters."""
+    batch_size = batch_size or settings.CATALOG_IMPORT_BATCH_SIZE
+    stats = {"read": 0, "skipped": 0, "loaded": 0, "batches": 0}
+
+    def rows():
+        for record in iter_tmdb_records(path):
+            stats["read"] += 1
+            row = transform(record)
+            if row is None:
+                stats["skipped"] += 1
+                continue
+            yield row
+
+    if dry_run:
+        for batch in iter_batches(rows(), batch_size):
+            stats["loaded"] += len(batch)
+            stats["batches"] += 1
+        return stats
+
+    async with engine.connect() as sa_conn:
+        raw = await sa_conn.get_raw_connection()
+        conn = raw.driver_connection  # asyncpg connection, for COPY
+        for batch in iter_batches(rows(), batch_size):
+            await _load_batch(conn, batch)
+            stats["loaded"] += len(batch)
+            stats["batches"] += 1
+            logger.info(f"📥 Imported {stats['loaded']} movies ({stats['batches']} batches)")
+
+    if stats["loaded"]:
+        await notify_catalog_changed()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a TMDB JSONL export into CineStox")
+    parser.add_argument("path", help="TMDB export (.jsonl or .jsonl.gz)")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Parse and transform only")
+    args = parser.parse_args()
+
+    stats = asyncio.run(import_tmdb_file(args.path, args.batch_size, args.dry_run))
+    print(f"✅ Read {stats['read']}, loaded {stats['loaded']}, skipped {stats['skipped']} "
+          f"in {stats['batches']} batches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+CineStox Catalog Snapshot
+Compact, read-only in-process copy of the movie catalog for hot list endpoints
+
+Each movie is a ``__slots__`` entry holding only what list responses need,
+with derived fields (display title, hype level, sentiment emoji, trading
+flags) computed once per change instead of per request. Secondary indexes
+by language, status and FDFS flag are pre-sorted tuples, so /trending,
+/telugu and /fdfs are slices plus a live price overlay.
+
+Writers call ``notify_catalog_changed`` with the movie ids they touched;
+every worker reloads just those rows (debounced), and does a full reload
+every CATALOG_SNAPSHOT_FULL_REFRESH_SECONDS as a safety net.
+"""
+
+from sqlalchemy import select
+from app.core.cache import redis_client
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.movie import Movie, MovieLanguage, MovieStatus
+import asyncio
+import logging
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from itertools import islice
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ALL_MOVIES = "*"
+
+# Only the columns list responses read; synopsis, cast, crew, etc. stay in the database
+SNAPSHOT_COLUMNS = (
+    Movie.id, Movie.title, Movie.original_title, Movie.telugu_title, Movie.contract_symbol,
+    Movie.language, Movie.status, Movie.genre, Movie.initial_price, Movie.current_price,
+    Movie.price_change_24h, Movie.volume_24h, Movie.market_cap, Movie.hype_score,
+    Movie.reddit_sentiment, Movie.available_shares, Movie.is_fdfs_event, Movie.poster_url,
+    Movie.trailer_url, Movie.release_date, Movie.created_at, Movie.last_price_update,
+)
+
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+class CatalogEntry:
+    """One movie as list endpoints see it"""
+
+    __slots__ = (
+        "id", "title", "telugu_title", "display_title", "contract_symbol", "language", "status",
+        "genre", "initial_price", "current_price", "price_change_24h", "volume_24h", "market_cap",
+        "hype_score", "hype_level", "reddit_sentiment", "sentiment_emoji", "poster_url",
+        "trailer_url", "is_trading_active", "is_telugu_movie", "is_fdfs_event", "release_date",
+        "created_at", "created_ts", "last_price_update",
+    )
+
+    @classmethod
+    def from_row(cls, row) -> "CatalogEntry":
+        """Build from a SNAPSHOT_COLUMNS row, reusing the Movie model's derived properties"""
+        entry = cls()
+        entry.id = row.id
+        entry.title = row.title
+        entry.telugu_title = row.telugu_title
+        entry.display_title = Movie.display_title.fget(row)
+        entry.contract_symbol = row.contract_symbol
+        entry.language = row.language
+        entry.status = row.status
+        # Genre names repeat across the catalog: share one string object each
+        entry.genre = tuple(sys.intern(g) for g in row.genre or ())
+        entry.initial_price = row.initial_price
+        entry.current_price = row.current_price
+        entry.price_change_24h = row.price_change_24h or 0.0
+        entry.volume_24h = row.volume_24h or 0.0
+        entry.market_cap = row.market_cap or 0.0
+        entry.hype_score = row.hype_score or 0.0
+        entry.hype_level = Movie.hype_level.fget(entry)
+        entry.reddit_sentiment = row.reddit_sentiment or 0.0
+        entry.sentiment_emoji = Movie.sentiment_emoji.fget(entry)
+        entry.poster_url = row.poster_url
+        entry.trailer_url = row.trailer_url
+        entry.is_trading_active = Movie.is_trading_active.fget(row)
+        entry.is_telugu_movie = row.language == MovieLanguage.TELUGU
+        entry.is_fdfs_event = bool(row.is_fdfs_event)
+        entry.release_date = row.release_date
+        entry.created_at = row.created_at
+        entry.created_ts = row.created_at.timestamp() if row.created_at else 0.0
+        entry.last_price_update = row.last_price_update
+        return entry
+
+    def to_response(self, price: Optional[float] = None) -> Dict:
+        """MovieResponse fields, at a live price when one is given"""
+        current_price = self.current_price if price is None else price
+        return {
+            "id": self.id,
+            "title": self.title,
+            "telugu_title": self.telugu_title,
+            "display_title": self.display_title,
+            "contract_symbol": self.contract_symbol,
+            "language": self.language,
+            "status": self.status,
+            "genre": list(self.genre),
+            "current_price": current_price,
+            "price_change_24h": self.price_change_24h,
+            "price_change_percentage": (
+                (current_price - self.initial_price) / self.initial_price * 100 if self.initial_price else 0.0
+            ),
+            "volume_24h": self.volume_24h,
+            "market_cap": self.market_cap,
+            "hype_score": self.hype_score,
+            "hype_level": self.hype_level,
+            "reddit_sentiment": self.reddit_sentiment,
+            "sentiment_emoji": self.sentiment_emoji,
+            "poster_url": self.poster_url,
+            "trailer_url": self.trailer_url,
+            "is_trading_active": self.is_trading_active,
+            "is_telugu_movie": self.is_telugu_movie,
+            "created_at": self.created_at,
+            "last_price_update": self.last_price_update,
+        }
+
+
+def _sorted_desc(entries: Iterable[CatalogEntry], primary: str, secondary: str) -> List[CatalogEntry]:
+    """Sort by two attributes, both descending (two stable passes on plain keys)"""
+    ordered = sorted(entries, key=attrgetter(secondary), reverse=True)
+    ordered.sort(key=attrgetter(primary), reverse=True)
+    return ordered
+
+
+def _fdfs_order(entry: CatalogEntry) -> Tuple:
+    # release date ascending with undated movies last (Postgres NULLS LAST), then hype desc
+    return (entry.release_date is None, entry.release_date or _EPOCH, -entry.hype_score)
+
+
+async def notify_catalog_changed(movie_ids: Optional[Iterable[str]] = None):
+    """Tell every worker's snapshot to reload these movies (None: the whole catalog)"""
+    payload = ALL_MOVIES if movie_ids is None else ",".join(movie_ids)
+    if not payload:
+        return
+    try:
+        await redis_client.publish(settings.CATALOG_CHANGES_CHANNEL, payload)
+    except Exception as e:
+        logger.error(f"Catalog change notification failed: {e}")
+
+
+class CatalogSnapshot:
+    """Per-worker catalog entries plus pre-sorted secondary indexes"""
+
+    def __init__(self):
+        self.entries: Dict[str, CatalogEntry] = {}
+        self.by_language: Dict[MovieLanguage, Tuple[CatalogEntry, ...]] = {}
+        self.by_status: Dict[MovieStatus, Tuple[CatalogEntry, ...]] = {}
+        self.fdfs: Tuple[CatalogEntry, ...] = ()
+        self.trending_order: Tuple[CatalogEntry, ...] = ()
+        self.loaded_at: Optional[float] = None
+        self._pending: Set[str] = set()
+        self._changed = asyncio.Event()
+        self._load_lock = asyncio.Lock()
+        self._initial_load: Optional[asyncio.Future] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def _index(self):
+        """Rebuild every secondary index from the current entries"""
+        # One global sort (hype desc, newest first); buckets inherit its order
+        ordered = _sorted_desc(self.entries.values(), "hype_score", "created_ts")
+        by_language = defaultdict(list)
+        by_status = defaultdict(list)
+        for entry in ordered:
+            by_language[entry.language].append(entry)
+            by_status[entry.status].append(entry)
+
+        active = [entry for entry in ordered if entry.is_trading_active]
+        self.by_language = {k: tuple(v) for k, v in by_language.items()}
+        self.by_status = {k: tuple(v) for k, v in by_status.items()}
+        self.fdfs = tuple(sorted((e for e in active if e.is_fdfs_event), key=_fdfs_order))
+        self.trending_order = tuple(_sorted_desc(active, "hype_score", "volume_24h"))
+
+    async def _fetch(self, movie_ids: Optional[List[str]] = None) -> List[CatalogEntry]:
+        query = select(*SNAPSHOT_COLUMNS)
+        if movie_ids is not None:
+            query = query.where(Movie.id.in_(movie_ids))
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(query)
+            return [CatalogEntry.from_row(row) for row in result.all()]
+
+    async def load(self):
+        """Full reload of the catalog"""
+        async with self._load_lock:
+            entries = await self._fetch()
+            self.entries = {entry.id: entry for entry in entries}
+            self._index()
+            self.loaded_at = asyncio.get_running_loop().time()
+        logger.info(f"🎞️ Catalog snapshot loaded ({len(self.entries)} movies)")
+
+    async def refresh(self, movie_ids: List[str]):
+        """Reload only the given movies (removed ones drop out)"""
+        async with self._load_lock:
+            fresh = {entry.id: entry for entry in await self._fetch(movie_ids)}
+            entries = dict(self.entries)
+            for movie_id in movie_ids:
+                entries.pop(movie_id, None)
+            entries.update(fresh)
+            self.entries = entries
+            self._index()
+
+    async def ensure_loaded(self):
+        """Load on first use; concurrent first requests share one load"""
+        if self.loaded_at is not None:
+            return
+        if self._initial_load is None or self._initial_load.done():
+            self._initial_load = asyncio.ensure_future(self.load())
+        await asyncio.shield(self._initial_load)
+
+    def trending(self, limit: int) -> List[CatalogEntry]:
+        """Active movies by hype, then 24h volume"""
+        return list(self.trending_order[:limit])
+
+    def by_language_active(self, language: MovieLanguage, limit: int) -> List[CatalogEntry]:
+        """Active movies in a language by hype, newest first on ties"""
+        entries = self.by_language.get(language, ())
+        return list(islice((e for e in entries if e.is_trading_active), limit))
+
+    def fdfs_events(self) -> List[CatalogEntry]:
+        """Active FDFS movies by release date"""
+        return list(self.fdfs)
+
+    def _handle_message(self, data: str):
+        if data == ALL_MOVIES:
+            self._pending.add(ALL_MOVIES)
+        else:
+            self._pending.update(movie_id for movie_id in data.split(",") if movie_id)
+        self._changed.set()
+
+    async def _listen(self):
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                # Subscribe before (re)loading so nothing falls between the two
+                await pubsub.subscribe(settings.CATALOG_CHANGES_CHANNEL)
+                self._handle_message(ALL_MOVIES)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Catalog change listener error, reconnecting: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+    async def _apply_changes(self):
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait(), timeout=settings.CATALOG_SNAPSHOT_FULL_REFRESH_SECONDS
+                )
+                # Debounce: one reload for a burst of notifications
+                await asyncio.sleep(settings.CATALOG_SNAPSHOT_DEBOUNCE_SECONDS)
+            except asyncio.TimeoutError:
+                self._pending.add(ALL_MOVIES)
+            self._changed.clear()
+            pending, self._pending = self._pending, set()
+            try:
+                if ALL_MOVIES in pending or len(pending) > len(self.entries) // 2:
+                    await self.load()
+                elif pending:
+                    await self.refresh(sorted(pending))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Catalog snapshot refresh failed: {e}")
+                # Retry on the next wake-up
+                self._pending |= pending
+
+    def start(self):
+        """Start the change listener and refresher (call from the app lifespan)"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._apply_changes())]
+
+    async def stop(self):
+        """Stop listening for catalog changes"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+
+catalog_snapshot = CatalogSnapshot()
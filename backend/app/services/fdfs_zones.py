@@ -0,0 +1,209 @@
+"""
+CineStox FDFS Hype Zones
+Geo index of theatres and fan check-ins, with incremental per-zone hype
+
+Theatres live in one Redis GEO set; each movie has its own GEO set of user
+check-ins. A check-in is attributed to the nearest theatre within
+``FDFS_ZONE_MATCH_KM`` (its zone) and the zone's hype and check-in count are
+adjusted in the same Lua call, so top-zone queries are a sorted-set range
+and nothing is recounted during a check-in burst.
+
+Usage:
+    python -m app.services.fdfs_zones fixtures/theatres.json
+"""
+
+from app.core.cache import redis_client, trading_cache
+from app.core.config import settings
+import argparse
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+THEATRES_KEY = "fdfs:theatres"
+THEATRE_META_KEY = "fdfs:theatres:meta"
+
+
+def _keys(movie_id: str) -> List[str]:
+    """Check-in GEO set, zone hype zset, zone count zset, user -> zone hash"""
+    return [
+        f"fdfs:checkins:{movie_id}",
+        f"fdfs:zone:hype:{movie_id}",
+        f"fdfs:zone:count:{movie_id}",
+        f"fdfs:checkin:zone:{movie_id}",
+    ]
+
+
+# One check-in per user and movie; a repeat check-in moves the user and
+# their hype to the new zone.
+#
+# KEYS: theatres GEO set, check-ins GEO set, zone hype zset, zone count zset, user zone hash
+# ARGV: user_id, longitude, latitude, excitement, match_km, ttl
+# Returns: theatre id of the zone, or false when no theatre is near enough
+_CHECK_IN_SCRIPT = """
+local user = ARGV[1]
+local previous = redis.call('HGET', KEYS[5], user)
+if previous then
+    local sep = string.find(previous, '|', 1, true)
+    local zone, weight = string.sub(previous, 1, sep - 1), tonumber(string.sub(previous, sep + 1))
+    redis.call('ZINCRBY', KEYS[3], -weight, zone)
+    if tonumber(redis.call('ZINCRBY', KEYS[4], -1, zone)) <= 0 then
+        redis.call('ZREM', KEYS[3], zone)
+        redis.call('ZREM', KEYS[4], zone)
+    end
+end
+
+redis.call('GEOADD', KEYS[2], ARGV[2], ARGV[3], user)
+local nearest = redis.call('GEOSEARCH', KEYS[1], 'FROMLONLAT', ARGV[2], ARGV[3],
+                           'BYRADIUS', ARGV[5], 'km', 'ASC', 'COUNT', 1)
+local zone = nearest[1]
+if zone then
+    redis.call('ZINCRBY', KEYS[3], ARGV[4], zone)
+    redis.call('ZINCRBY', KEYS[4], 1, zone)
+    redis.call('HSET', KEYS[5], user, zone .. '|' .. ARGV[4])
+else
+    redis.call('HDEL', KEYS[5], user)
+end
+
+local ttl = tonumber(ARGV[6])
+for i = 2, 5 do
+    redis.call('EXPIRE', KEYS[i], ttl)
+end
+return zone or false
+"""
+
+_check_in = redis_client.register_script(_CHECK_IN_SCRIPT)
+
+
+async def register_theatres(theatres: List[Dict]) -> int:
+    """Add or move theatres: dicts with id, name, city, latitude, longitude"""
+    if not theatres:
+        return 0
+    async with redis_client.pipeline(transaction=True) as pipe:
+        for theatre in theatres:
+            pipe.geoadd(THEATRES_KEY, (theatre["longitude"], theatre["latitude"], theatre["id"]))
+            pipe.hset(THEATRE_META_KEY, theatre["id"], json.dumps({
+                "name": theatre.get("name"),
+                "city": theatre.get("city"),
+            }))
+        await pipe.execute()
+    return len(theatres)
+
+
+async def _theatre_meta(theatre_ids: List[str]) -> Dict[str, Dict]:
+    if not theatre_ids:
+        return {}
+    values = await redis_client.hmget(THEATRE_META_KEY, theatre_ids)
+    return {tid: json.loads(value) for tid, value in zip(theatre_ids, values) if value}
+
+
+async def check_in(movie_id: str, user_id: str, latitude: float, longitude: float,
+                   excitement: float = 5.0) -> Optional[str]:
+    """Record a user's FDFS check-in; returns the theatre zone it counts towards"""
+    return await _check_in(
+        keys=[THEATRES_KEY] + _keys(movie_id),
+        args=[user_id, longitude, latitude, excitement, settings.FDFS_ZONE_MATCH_KM, settings.FDFS_CHECKIN_TTL]
+    )
+
+
+async def nearby_check_ins(movie_id: str, latitude: float, longitude: float,
+                           radius_km: Optional[float] = None, limit: int = 100) -> List[Dict]:
+    """Closest check-ins within a radius, nearest first"""
+    results = await redis_client.geosearch(
+        _keys(movie_id)[0],
+        longitude=longitude, latitude=latitude,
+        radius=radius_km or settings.FDFS_HYPE_RADIUS_KM, unit="km",
+        sort="ASC", count=limit, withdist=True
+    )
+    return [{"user_id": user_id, "distance_km": distance} for user_id, distance in results]
+
+
+async def radius_hype(movie_id: str, latitude: float, longitude: float,
+                      radius_km: Optional[float] = None) -> Dict:
+    """Hype of every zone whose theatre lies within a radius.
+
+    Sums the per-zone aggregates instead of scanning check-ins, so the cost
+    grows with the number of theatres in range rather than fans.
+    """
+    radius_km = radius_km or settings.FDFS_HYPE_RADIUS_KM
+    theatre_ids = await redis_client.geosearch(
+        THEATRES_KEY, longitude=longitude, latitude=latitude, radius=radius_km, unit="km"
+    )
+    _, hype_key, count_key, _ = _keys(movie_id)
+    hype, counts = [], []
+    if theatre_ids:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.zmscore(hype_key, theatre_ids)
+            pipe.zmscore(count_key, theatre_ids)
+            hype, counts = await pipe.execute()
+
+    total_hype = sum(score or 0.0 for score in hype)
+    check_ins = int(sum(count or 0 for count in counts))
+    return {
+        "movie_id": movie_id,
+        "radius_km": radius_km,
+        "theatres": len(theatre_ids),
+        "active_zones": sum(1 for count in counts if count),
+        "check_ins": check_ins,
+        "hype": total_hype,
+        "average_excitement": total_hype / check_ins if check_ins else 0.0,
+    }
+
+
+async def theatre_hype(movie_id: str, theatre_id: str, radius_km: Optional[float] = None) -> Optional[Dict]:
+    """Hype within a radius of a theatre, cached briefly as the theatre's hype zone"""
+    location = f"{movie_id}:{theatre_id}"
+    cached = await trading_cache.get_fdfs_hype_zone(location)
+    if cached and (radius_km is None or cached.get("radius_km") == radius_km):
+        return cached
+
+    position = (await redis_client.geopos(THEATRES_KEY, theatre_id))[0]
+    if not position:
+        return None
+    longitude, latitude = position
+    data = await radius_hype(movie_id, latitude, longitude, radius_km)
+    data["theatre_id"] = theatre_id
+    if radius_km is None:
+        await trading_cache.cache_fdfs_hype_zone(location, data, ttl=settings.FDFS_ZONE_CACHE_TTL)
+    return data
+
+
+async def top_zones(movie_id: str, limit: int = 10) -> List[Dict]:
+    """Hottest theatre zones for a movie, by total check-in hype"""
+    _, hype_key, count_key, _ = _keys(movie_id)
+    ranked = await redis_client.zrevrange(hype_key, 0, limit - 1, withscores=True)
+    if not ranked:
+        return []
+    theatre_ids = [theatre_id for theatre_id, _ in ranked]
+    counts = await redis_client.zmscore(count_key, theatre_ids)
+    meta = await _theatre_meta(theatre_ids)
+    return [
+        {
+            "theatre_id": theatre_id,
+            "name": meta.get(theatre_id, {}).get("name"),
+            "city": meta.get(theatre_id, {}).get("city"),
+            "hype": hype,
+            "check_ins": int(count or 0),
+            "average_excitement": hype / count if count else 0.0,
+        }
+        for (theatre_id, hype), count in zip(ranked, counts)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load FDFS theatres into the geo index")
+    parser.add_argument("path", help="JSON list of theatres (id, name, city, latitude, longitude)")
+    args = parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        theatres = json.load(f)
+    count = asyncio.run(register_theatres(theatres))
+    print(f"✅ Registered {count} theatres")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+CineStox Scheduled Jobs
+Periodic maintenance registered with the in-app scheduler
+"""
+
+from sqlalchemy import select, text
+from app.core.cache import MARKET_GROUPS, trading_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.scheduler import Scheduler
+from app.models.movie import Movie
+from app.models.trading import Prediction, PredictionType
+from app.services.catalog_snapshot import notify_catalog_changed
+from app.services.ledger import checkpoint_balances
+from app.services.market_stats import flush_window_stats
+from app.services.memes import prune_cache
+from app.services.nft_minting import mint_payouts, minting_pipeline
+from app.services.trade_archive import archive_cold_partitions
+from app.services.trade_partitions import ensure_partitions
+from app.services.tournaments import run_due_rounds
+from app.services import trending
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HYPE_DECAY_INTERVAL = 600  # seconds
+HYPE_BASELINE = 50.0  # Neutral hype that idle movies drift back to
+PREDICTION_BATCH_SIZE = 500
+
+# Prediction types that can be scored from data we already track
+AUTO_RESOLVED = {
+    PredictionType.HYPE_SCORE: Movie.hype_score,
+    PredictionType.REDDIT_SENTIMENT: Movie.reddit_sentiment,
+}
+
+
+async def decay_hype_scores():
+    """Pull every movie's hype back towards the baseline (exponential decay)"""
+    factor = 0.5 ** (HYPE_DECAY_INTERVAL / (settings.HYPE_DECAY_HALF_LIFE_HOURS * 3600))
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            text(
+                "UPDATE movies SET hype_score = :baseline + (hype_score - :baseline) * :factor "
+                "WHERE abs(hype_score - :baseline) > 0.01"
+            ),
+            {"baseline": HYPE_BASELINE, "factor": factor}
+        )
+        await session.commit()
+    await notify_catalog_changed()
+    logger.info(f"📉 Decayed hype for {result.rowcount} movies")
+
+
+async def refresh_sentiment_cache():
+    """Copy stored hype and Reddit sentiment into the market state cache"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Movie.id, Movie.hype_score, Movie.reddit_sentiment))
+        rows = result.all()
+
+    await trading_cache.cache_market_group_many(
+        "hype", {row.id: {"score": row.hype_score or 0.0} for row in rows}, MARKET_GROUPS["hype"]
+    )
+    await trading_cache.cache_market_group_many(
+        "sentiment", {row.id: {"sentiment": row.reddit_sentiment or 0.0} for row in rows},
+        MARKET_GROUPS["sentiment"]
+    )
+
+
+async def revalue_portfolios():
+    """Mark every open position to the current price in one statement.
+
+    Same arithmetic as ``Portfolio.calculate_current_value``.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(text("""
+            UPDATE portfolio p SET
+                current_value = (p.shares_owned - p.shares_shorted) * m.current_price,
+                unrealized_pnl =
+                    CASE WHEN p.average_buy_price > 0
+                         THEN (m.current_price - p.average_buy_price) * p.shares_owned ELSE 0 END
+                  + CASE WHEN p.average_sell_price > 0
+                         THEN (p.average_sell_price - m.current_price) * p.shares_shorted ELSE 0 END,
+                total_return =
+                    CASE WHEN p.total_invested > 0
+                         THEN ((p.shares_owned - p.shares_shorted) * m.current_price
+                               + p.realized_pnl - p.total_invested) / p.total_invested * 100
+                         ELSE p.total_return END,
+                updated_at = now()
+            FROM movies m
+            WHERE m.id = p.movie_id AND (p.shares_owned > 0 OR p.shares_shorted > 0)
+        """))
+        await session.commit()
+    logger.info(f"💼 Revalued {result.rowcount} positions")
+
+
+async def expire_predictions():
+    """Resolve expired hype and sentiment predictions against current values"""
+    now = datetime.now(timezone.utc)
+    resolved = 0
+    for prediction_type, column in AUTO_RESOLVED.items():
+        while True:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(Prediction, column).join(Movie, Movie.id == Prediction.movie_id).where(
+                        Prediction.prediction_type == prediction_type,
+                        Prediction.actual_value.is_(None),
+                        Prediction.expires_at <= now
+                    ).limit(PREDICTION_BATCH_SIZE).with_for_update(of=Prediction, skip_locked=True)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+
+                points = defaultdict(int)
+                for prediction, actual in rows:
+                    prediction.resolve_prediction(actual or 0.0)
+                    points[prediction.user_id] += prediction.points_earned
+                await session.execute(
+                    text("UPDATE users SET research_score = research_score + :points WHERE id = :user_id"),
+                    [{"user_id": user_id, "points": total} for user_id, total in points.items()]
+                )
+                # Accurate calls earn an NFT, queued with the resolution
+                minted = await mint_payouts(session, [prediction for prediction, _ in rows])
+                await session.commit()
+                if minted:
+                    minting_pipeline.wake()
+                resolved += len(rows)
+            if len(rows) < PREDICTION_BATCH_SIZE:
+                break
+    if resolved:
+        logger.info(f"🔮 Resolved {resolved} expired predictions")
+
+
+async def snapshot_market_history():
+    # Imported here: the backtest module loads numpy, which workers otherwise never need
+    from app.services.backtest import record_market_history
+
+    async with AsyncSessionLocal() as session:
+        await record_market_history(session)
+        # Hype and sentiment rises since the previous snapshot feed trending
+        await trending.record_market_moves(session)
+
+
+async def checkpoint_ledger():
+    async with AsyncSessionLocal() as session:
+        await checkpoint_balances(session)
+
+
+async def prune_meme_cache():
+    # Walking the cache directory blocks: keep it off the event loop
+    removed = await asyncio.get_running_loop().run_in_executor(None, prune_cache)
+    if removed:
+        logger.info(f"🖼️ Pruned {removed} cached memes")
+
+
+def register_jobs(scheduler: Scheduler):
+    """Register CineStox's periodic jobs"""
+    scheduler.add_interval("market_stats_flush", settings.MARKET_STATS_FLUSH_SECONDS, flush_window_stats,
+                           timeout=settings.MARKET_STATS_FLUSH_SECONDS * 4)
+    scheduler.add_interval("hype_decay", HYPE_DECAY_INTERVAL, decay_hype_scores, jitter=30, timeout=300)
+    scheduler.add_cron("sentiment_refresh", "*/30 * * * *", refresh_sentiment_cache, jitter=60, timeout=600)
+    scheduler.add_interval("portfolio_revaluation", 300, revalue_portfolios, jitter=20, timeout=240)
+    scheduler.add_cron("prediction_expiry", "* * * * *", expire_predictions, jitter=5, timeout=300)
+    scheduler.add_interval("market_history", settings.MARKET_HISTORY_INTERVAL_SECONDS,
+                           snapshot_market_history, jitter=10, timeout=300)
+    scheduler.add_interval("ledger_checkpoint", settings.LEDGER_CHECKPOINT_INTERVAL_SECONDS,
+                           checkpoint_ledger, jitter=60, timeout=600)
+    scheduler.add_cron("trade_partitions", "15 0 * * *", ensure_partitions, jitter=60, timeout=300)
+    scheduler.add_interval("tournament_rounds", 60, run_due_rounds, timeout=1800)
+    scheduler.add_interval("trending_prune", 3600, trending.prune, jitter=60, timeout=300)
+    scheduler.add_cron("meme_cache_prune", "45 4 * * *", prune_meme_cache, jitter=60, timeout=1800)
+    scheduler.add_cron("trade_archive", "30 3 * * *", archive_cold_partitions, timeout=6 * 3600)
@@ -0,0 +1,173 @@
+"""
+CineStox Balance Ledger
+Append-only cash ledger with atomic, conditional balance updates
+
+Balances are never read, modified and written back. Each change is one
+``UPDATE users SET current_balance = current_balance + :delta`` guarded by
+``current_balance + :delta >= 0``, so concurrent trades by the same user
+need no lock held across the request, and a debit that would overdraw
+simply matches no row. Every change is also appended to ``balance_ledger``
+in the same transaction; periodic checkpoints replay the ledger to verify
+the recorded balances and bound how much of it an audit has to read.
+"""
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+from app.core.config import settings
+from app.models.ledger import BalanceCheckpoint, LedgerEntry
+import logging
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DRIFT_TOLERANCE = 0.005  # Float rounding, not a discrepancy
+
+
+class InsufficientFunds(Exception):
+    """Raised when a debit would take a balance below zero"""
+
+    def __init__(self, user_ids: List[str]):
+        super().__init__(f"insufficient balance for user(s) {', '.join(user_ids)}")
+        self.user_ids = user_ids
+
+
+class BalanceDelta(NamedTuple):
+    """One ledger entry to apply"""
+    user_id: str
+    amount: float
+    entry_type: str = "adjustment"
+    reference_id: Optional[str] = None
+
+
+async def apply_deltas(session: AsyncSession, deltas: List[BalanceDelta]) -> Dict[str, float]:
+    """Apply balance changes and append their ledger entries.
+
+    Runs in the caller's transaction and returns each user's new balance.
+    Raises ``InsufficientFunds`` if any user's net change would overdraw;
+    the caller must then roll back, as other users may already be updated.
+    """
+    if not deltas:
+        return {}
+    net = defaultdict(float)
+    for delta in deltas:
+        net[delta.user_id] += delta.amount
+    user_ids = sorted(net)
+
+    # Credits always apply; debits only while the balance covers them
+    result = await session.execute(
+        text("""
+            UPDATE users AS u
+            SET current_balance = u.current_balance + d.delta, updated_at = now()
+            FROM unnest(CAST(:user_ids AS varchar[]), CAST(:deltas AS float8[])) AS d(user_id, delta)
+            WHERE u.id = d.user_id AND (d.delta >= 0 OR u.current_balance + d.delta >= 0)
+            RETURNING u.id, u.current_balance
+        """),
+        {"user_ids": user_ids, "deltas": [net[user_id] for user_id in user_ids]}
+    )
+    balances = {row.id: row.current_balance for row in result.all()}
+    missing = [user_id for user_id in user_ids if user_id not in balances]
+    if missing:
+        raise InsufficientFunds(missing)
+
+    # Walk each user's entries backwards from the final balance
+    running = dict(balances)
+    rows = []
+    for delta in reversed(deltas):
+        rows.append({
+            "user_id": delta.user_id,
+            "amount": delta.amount,
+            "balance_after": running[delta.user_id],
+            "entry_type": delta.entry_type,
+            "reference_id": delta.reference_id,
+        })
+        running[delta.user_id] -= delta.amount
+    rows.reverse()
+    await session.execute(insert(LedgerEntry), rows)
+    return balances
+
+
+async def apply_delta(session: AsyncSession, user_id: str, amount: float,
+                      entry_type: str = "adjustment", reference_id: Optional[str] = None) -> float:
+    """Apply one balance change in the caller's transaction; returns the new balance"""
+    balances = await apply_deltas(session, [BalanceDelta(user_id, amount, entry_type, reference_id)])
+    return balances[user_id]
+
+
+async def replay_balance(session: AsyncSession, user_id: str) -> float:
+    """A user's balance rebuilt from the last checkpoint plus later ledger entries"""
+    result = await session.execute(
+        select(BalanceCheckpoint.ledger_entry_id, BalanceCheckpoint.balance)
+        .where(BalanceCheckpoint.user_id == user_id)
+        .order_by(BalanceCheckpoint.ledger_entry_id.desc())
+        .limit(1)
+    )
+    checkpoint = result.first()
+    after_id, balance = (checkpoint.ledger_entry_id, checkpoint.balance) if checkpoint else (0, None)
+
+    result = await session.execute(
+        select(func.coalesce(func.sum(LedgerEntry.amount), 0.0), func.min(LedgerEntry.id))
+        .where(LedgerEntry.user_id == user_id, LedgerEntry.id > after_id)
+    )
+    total, first_id = result.one()
+    if balance is None:
+        if first_id is None:
+            return 0.0
+        # No checkpoint yet: the opening balance is implied by the first entry
+        first = await session.get(LedgerEntry, first_id)
+        balance = first.balance_after - first.amount
+    return balance + total
+
+
+async def checkpoint_balances(session: AsyncSession) -> int:
+    """Checkpoint every user with ledger entries since the last run.
+
+    Only entries past the newest checkpointed entry id are read (a range on
+    the primary key), and each user's previous checkpoint is one index probe.
+    Entries for one user are appended while their users row is locked, so
+    ids increase in commit order per user. Across users a smaller id can
+    still commit late, so entries younger than LEDGER_CHECKPOINT_SETTLE_SECONDS
+    wait for the next run. Drift (replayed minus recorded balance) should be 0.
+    """
+    result = await session.execute(
+        text("""
+            WITH recent AS (
+                SELECT id, user_id, amount, created_at
+                FROM balance_ledger
+                WHERE id > (SELECT COALESCE(max(ledger_entry_id), 0) FROM balance_checkpoints)
+            ), pending AS (
+                SELECT user_id, min(id) AS first_id, max(id) AS last_id, sum(amount) AS total
+                FROM recent
+                WHERE id <= (
+                    SELECT max(id) FROM recent
+                    WHERE created_at < now() - make_interval(secs => :settle_seconds)
+                )
+                GROUP BY user_id
+            )
+            INSERT INTO balance_checkpoints (user_id, ledger_entry_id, balance, drift)
+            SELECT p.user_id, p.last_id, e.balance_after,
+                   COALESCE(c.balance, f.balance_after - f.amount) + p.total - e.balance_after
+            FROM pending p
+            JOIN balance_ledger e ON e.id = p.last_id
+            JOIN balance_ledger f ON f.id = p.first_id
+            LEFT JOIN LATERAL (
+                SELECT balance FROM balance_checkpoints
+                WHERE user_id = p.user_id
+                ORDER BY ledger_entry_id DESC
+                LIMIT 1
+            ) c ON true
+            RETURNING user_id, drift
+        """),
+        {"settle_seconds": settings.LEDGER_CHECKPOINT_SETTLE_SECONDS}
+    )
+    rows = result.all()
+    await session.commit()
+
+    drifted = [row for row in rows if abs(row.drift or 0.0) > DRIFT_TOLERANCE]
+    for row in drifted:
+        logger.error(f"Balance drift of {row.drift:.2f} for user {row.user_id}")
+    logger.info(f"📒 Checkpointed {len(rows)} balances ({len(drifted)} drifted)")
+    return len(rows)
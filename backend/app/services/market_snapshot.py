@@ -0,0 +1,204 @@
+"""
+CineStox Market Snapshot
+Compact, versioned, columnar board of every active symbol
+
+Wire format (little-endian), one payload per response:
+
+    header   4s magic b"CSX1", B format, B kind (0 full, 1 delta), H reserved,
+             I version, I base_version, I count, I total_symbols
+    full     symbols: count x (B length + ASCII symbol)
+    delta    indices: u32[count] positions in the last full symbol table
+    columns  price f32[count], change_24h f32[count], volume_24h f32[count],
+             hype u8[count]
+
+Versions are a CRC32 of the board contents, so every worker building the
+same board serves the same version. Clients keep the symbol table from their
+last full payload and apply deltas by index; a delta is only served while the
+symbol table is unchanged.
+"""
+
+from sqlalchemy import select
+from app.core.cache import trading_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.movie import Movie, MovieStatus
+import array
+import asyncio
+import logging
+import struct
+import sys
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CSX1"
+FORMAT_VERSION = 1
+KIND_FULL = 0
+KIND_DELTA = 1
+HEADER = struct.Struct("<4sBBHIIII")
+MEDIA_TYPE = "application/x-cinestox-snapshot"
+
+ACTIVE_STATUSES = [
+    MovieStatus.ANNOUNCED,
+    MovieStatus.IN_PRODUCTION,
+    MovieStatus.SHOOTING,
+    MovieStatus.POST_PRODUCTION,
+    MovieStatus.TRAILER_RELEASED
+]
+
+
+def _le_bytes(values: array.array) -> bytes:
+    if sys.byteorder == "big":
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class BoardState:
+    """One version of the board: symbol table plus column arrays"""
+
+    __slots__ = ("version", "symbols", "price", "change", "volume", "hype")
+
+    def __init__(self, version: int, symbols: Tuple[str, ...], price: array.array,
+                 change: array.array, volume: array.array, hype: array.array):
+        self.version = version
+        self.symbols = symbols
+        self.price = price
+        self.change = change
+        self.volume = volume
+        self.hype = hype
+
+    def body(self) -> bytes:
+        """Symbol table and full columns, without the header"""
+        parts = []
+        for symbol in self.symbols:
+            raw = symbol.encode("ascii", "replace")
+            parts.append(bytes([len(raw)]) + raw)
+        parts.extend(_le_bytes(col) for col in (self.price, self.change, self.volume, self.hype))
+        return b"".join(parts)
+
+    def encode(self, kind: int = KIND_FULL, base_version: int = 0,
+               indices: Optional[List[int]] = None, body: Optional[bytes] = None) -> bytes:
+        if indices is None:
+            header = HEADER.pack(MAGIC, FORMAT_VERSION, kind, 0, self.version, base_version,
+                                 len(self.symbols), len(self.symbols))
+            return header + (body if body is not None else self.body())
+
+        parts = [HEADER.pack(MAGIC, FORMAT_VERSION, kind, 0, self.version, base_version,
+                             len(indices), len(self.symbols)),
+                 _le_bytes(array.array("I", indices))]
+        parts.extend(
+            _le_bytes(array.array(col.typecode, (col[i] for i in indices)))
+            for col in (self.price, self.change, self.volume, self.hype)
+        )
+        return b"".join(parts)
+
+    def changed_since(self, old: "BoardState") -> List[int]:
+        """Indices whose values differ from an older state with the same symbols"""
+        return [
+            i for i in range(len(self.symbols))
+            if self.price[i] != old.price[i] or self.change[i] != old.change[i]
+            or self.volume[i] != old.volume[i] or self.hype[i] != old.hype[i]
+        ]
+
+
+class MarketSnapshotBoard:
+    """Builds the board once per tick and serves encoded payloads from memory"""
+
+    def __init__(self, history: int = 32):
+        self.history_size = history
+        self.history: "OrderedDict[int, BoardState]" = OrderedDict()
+        self.current: Optional[BoardState] = None
+        self.full_payload: Optional[bytes] = None
+        self._deltas: Dict[int, bytes] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def publish(self, symbols: Tuple[str, ...], price: array.array, change: array.array,
+                volume: array.array, hype: array.array) -> BoardState:
+        """Install a new board state; the version changes only if the contents do"""
+        state = BoardState(0, symbols, price, change, volume, hype)
+        body = state.body()
+        state.version = zlib.crc32(body)
+        if self.current and self.current.version == state.version:
+            return self.current
+
+        self.current = state
+        self.full_payload = state.encode(body=body)
+        self._deltas = {}
+        self.history.pop(state.version, None)
+        self.history[state.version] = state
+        while len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+        return state
+
+    def payload(self, since: Optional[int] = None) -> bytes:
+        """Full payload, or a delta against a client's last version when possible"""
+        if self.current is None:
+            raise LookupError("market snapshot not built yet")
+        if since is None:
+            return self.full_payload
+        if since == self.current.version:
+            return self.current.encode(KIND_DELTA, since, [])
+
+        base = self.history.get(since)
+        if base is None or base.symbols != self.current.symbols:
+            return self.full_payload
+
+        if since not in self._deltas:
+            self._deltas[since] = self.current.encode(KIND_DELTA, since, self.current.changed_since(base))
+        return self._deltas[since]
+
+    async def rebuild(self) -> BoardState:
+        """Read active symbols' market columns and publish a new version"""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(
+                    Movie.id, Movie.contract_symbol, Movie.current_price,
+                    Movie.price_change_24h, Movie.volume_24h, Movie.hype_score
+                ).where(
+                    Movie.status.in_(ACTIVE_STATUSES),
+                    Movie.available_shares > 0
+                ).order_by(Movie.contract_symbol)
+            )
+            rows = result.all()
+
+        live_prices = await trading_cache.get_movie_prices([row.id for row in rows])
+        return self.publish(
+            tuple(row.contract_symbol for row in rows),
+            array.array("f", (live_prices.get(row.id, row.current_price or 0.0) for row in rows)),
+            array.array("f", (row.price_change_24h or 0.0 for row in rows)),
+            array.array("f", (row.volume_24h or 0.0 for row in rows)),
+            array.array("B", (max(0, min(100, int(round(row.hype_score or 0)))) for row in rows))
+        )
+
+    async def _run(self):
+        while True:
+            try:
+                await self.rebuild()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Market snapshot rebuild failed: {e}")
+            await asyncio.sleep(settings.MARKET_SNAPSHOT_TICK_SECONDS)
+
+    def start(self):
+        """Start rebuilding every tick (call from the app lifespan)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the rebuild loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+market_snapshot = MarketSnapshotBoard()
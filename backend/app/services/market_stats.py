@@ -0,0 +1,322 @@
+"""
+CineStox Market Statistics
+Rolling 24h volume, trade count, VWAP and buy/sell imbalance per movie
+
+Each executed trade is folded into a per-movie ring of time buckets in Redis
+(``movie:stats:{id}``). Running totals are kept alongside the ring; when time
+advances past a bucket its counts are subtracted from the totals, so both
+recording a trade and reading the window are O(1) amortized and the trades
+table is never rescanned. A scheduled flush materializes the window into the
+volume group of each movie's market state hash and the movies table columns.
+"""
+
+from sqlalchemy import text
+from app.core.cache import redis_client, trading_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.trading import Trade, TradeStatus, TradeType
+from app.services.catalog_snapshot import notify_catalog_changed
+import logging
+import time
+from typing import Dict, List
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ACTIVE_KEY = "movie:stats:active"
+
+# Trades that add buying pressure; sells and shorts add selling pressure
+BUY_SIDE = (TradeType.BUY, TradeType.COVER)
+
+# Ring layout: "head" is the newest bucket rolled to; slot i holds bucket
+# "b:i" with counters v (notional), s (shares), n (trades), bu/se (buy/sell
+# shares) and o/h/l/c prices. Totals hold the sum of all live slots.
+#
+# Window prices are kept incrementally too: "first" is the oldest live
+# bucket (its open is the window's open), "close" the last trade price, and
+# two monotonic deques held in the hash ("hq" for highs, "lq" for lows, at
+# most one entry per bucket) have the window's high and low at their front.
+# A bucket leaving the window drops its deque entries from the front, so
+# every step is O(1) amortized.
+_ROLL = """
+local function dq_bounds(key, q)
+    local b = redis.call('HMGET', key, q .. ':h', q .. ':t')
+    return tonumber(b[1] or '0'), tonumber(b[2] or '0')
+end
+
+local function dq_entry(key, q, k)
+    local e = redis.call('HMGET', key, q .. ':b:' .. k, q .. ':p:' .. k)
+    return tonumber(e[1]), e[2]
+end
+
+-- sign 1: prices strictly falling front to back (highs); -1: rising (lows)
+local function dq_push(key, q, sign, bucket, price_str)
+    local price = tonumber(price_str)
+    local h, t = dq_bounds(key, q)
+    while t > h do
+        local b, p = dq_entry(key, q, t - 1)
+        if tonumber(p) * sign > price * sign then
+            -- Beaten by an entry that leaves the window no earlier
+            if b == bucket then return end
+            break
+        end
+        t = t - 1
+        redis.call('HDEL', key, q .. ':b:' .. t, q .. ':p:' .. t)
+    end
+    redis.call('HSET', key, q .. ':b:' .. t, bucket, q .. ':p:' .. t, price_str, q .. ':h', h, q .. ':t', t + 1)
+end
+
+local function dq_expire(key, q, oldest)
+    local h, t = dq_bounds(key, q)
+    local start = h
+    while t > h and dq_entry(key, q, h) < oldest do
+        redis.call('HDEL', key, q .. ':b:' .. h, q .. ':p:' .. h)
+        h = h + 1
+    end
+    if h ~= start then redis.call('HSET', key, q .. ':h', h) end
+end
+
+local function dq_front(key, q)
+    local h, t = dq_bounds(key, q)
+    if t > h then
+        local _, p = dq_entry(key, q, h)
+        return p
+    end
+    return false
+end
+
+local function live(key, b, slots)
+    return tonumber(redis.call('HGET', key, 'b:' .. (b % slots)) or '-1') == b
+end
+
+local function roll(key, now, slots)
+    local head = tonumber(redis.call('HGET', key, 'head') or now)
+    -- Never step back in time (worker clocks may disagree slightly)
+    if now < head then now = head end
+    local from = math.max(head + 1, now - slots + 1)
+    for b = from, now do
+        local i = b % slots
+        local held = redis.call('HGET', key, 'b:' .. i)
+        if held and tonumber(held) ~= b then
+            local c = redis.call('HMGET', key, 'v:' .. i, 's:' .. i, 'n:' .. i, 'bu:' .. i, 'se:' .. i)
+            redis.call('HINCRBYFLOAT', key, 'volume', -tonumber(c[1] or '0'))
+            redis.call('HINCRBYFLOAT', key, 'shares', -tonumber(c[2] or '0'))
+            redis.call('HINCRBYFLOAT', key, 'trades', -tonumber(c[3] or '0'))
+            redis.call('HINCRBYFLOAT', key, 'buy', -tonumber(c[4] or '0'))
+            redis.call('HINCRBYFLOAT', key, 'sell', -tonumber(c[5] or '0'))
+            redis.call('HDEL', key, 'b:' .. i, 'v:' .. i, 's:' .. i, 'n:' .. i, 'bu:' .. i, 'se:' .. i,
+                       'o:' .. i, 'h:' .. i, 'l:' .. i, 'c:' .. i)
+        end
+    end
+    redis.call('HSET', key, 'head', now)
+
+    local oldest = now - slots + 1
+    dq_expire(key, 'hq', oldest)
+    dq_expire(key, 'lq', oldest)
+    local first = tonumber(redis.call('HGET', key, 'first') or '-1')
+    if first >= 0 and first < oldest then
+        -- The open moves to the next live bucket; "first" only ever moves forward
+        local b = math.max(first + 1, oldest)
+        while b <= now and not live(key, b, slots) do b = b + 1 end
+        if b <= now then redis.call('HSET', key, 'first', b) else redis.call('HDEL', key, 'first') end
+    end
+
+    -- Float subtraction drifts; an empty window is exactly zero
+    if tonumber(redis.call('HGET', key, 'trades') or '0') < 0.5 then
+        redis.call('HSET', key, 'volume', 0, 'shares', 0, 'trades', 0, 'buy', 0, 'sell', 0)
+        redis.call('HDEL', key, 'first', 'close')
+    end
+    return now
+end
+"""
+
+# KEYS: stats hash, active set
+# ARGV: now_bucket, slots, movie_id, shares, price, is_buy, ttl
+_RECORD_TRADE_SCRIPT = _ROLL + """
+local slots = tonumber(ARGV[2])
+local now = roll(KEYS[1], tonumber(ARGV[1]), slots)
+local i = now % slots
+local shares, price = tonumber(ARGV[4]), tonumber(ARGV[5])
+if tonumber(redis.call('HGET', KEYS[1], 'b:' .. i) or '-1') ~= now then
+    redis.call('HSET', KEYS[1], 'b:' .. i, now, 'o:' .. i, ARGV[5], 'h:' .. i, ARGV[5], 'l:' .. i, ARGV[5])
+end
+local side = ARGV[6] == '1' and 'bu' or 'se'
+redis.call('HINCRBYFLOAT', KEYS[1], 'v:' .. i, shares * price)
+redis.call('HINCRBYFLOAT', KEYS[1], 's:' .. i, shares)
+redis.call('HINCRBY', KEYS[1], 'n:' .. i, 1)
+redis.call('HINCRBYFLOAT', KEYS[1], side .. ':' .. i, shares)
+redis.call('HINCRBYFLOAT', KEYS[1], 'volume', shares * price)
+redis.call('HINCRBYFLOAT', KEYS[1], 'shares', shares)
+redis.call('HINCRBYFLOAT', KEYS[1], 'trades', 1)
+redis.call('HINCRBYFLOAT', KEYS[1], side == 'bu' and 'buy' or 'sell', shares)
+if price > tonumber(redis.call('HGET', KEYS[1], 'h:' .. i)) then
+    redis.call('HSET', KEYS[1], 'h:' .. i, ARGV[5])
+end
+if price < tonumber(redis.call('HGET', KEYS[1], 'l:' .. i)) then
+    redis.call('HSET', KEYS[1], 'l:' .. i, ARGV[5])
+end
+redis.call('HSET', KEYS[1], 'c:' .. i, ARGV[5], 'close', ARGV[5])
+redis.call('HSETNX', KEYS[1], 'first', now)
+dq_push(KEYS[1], 'hq', 1, now, ARGV[5])
+dq_push(KEYS[1], 'lq', -1, now, ARGV[5])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[7]))
+redis.call('SADD', KEYS[2], ARGV[3])
+return 1
+"""
+
+# KEYS: stats hash
+# ARGV: now_bucket, slots
+# Returns: {volume, shares, trades, buy, sell, open, high, low, close} as strings
+_WINDOW_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {'0', '0', '0', '0', '0', '', '', '', ''}
+end
+""" + _ROLL + """
+local slots = tonumber(ARGV[2])
+roll(KEYS[1], tonumber(ARGV[1]), slots)
+local t = redis.call('HMGET', KEYS[1], 'volume', 'shares', 'trades', 'buy', 'sell', 'first', 'close')
+local open, high, low, close = false, false, false, false
+if tonumber(t[3] or '0') > 0 and t[6] then
+    open = redis.call('HGET', KEYS[1], 'o:' .. (tonumber(t[6]) % slots))
+    high = dq_front(KEYS[1], 'hq')
+    low = dq_front(KEYS[1], 'lq')
+    close = t[7]
+end
+return {t[1] or '0', t[2] or '0', t[3] or '0', t[4] or '0', t[5] or '0',
+        open or '', high or '', low or '', close or ''}
+"""
+
+# Drop idle movies from the active set, re-checking each window under the
+# same atomicity as record_trade, so a trade since the flush read keeps it.
+#
+# KEYS: active set, stats hash per movie
+# ARGV: now_bucket, slots, movie_id per stats hash
+# Returns: number of movies dropped
+_DEACTIVATE_SCRIPT = _ROLL + """
+local slots = tonumber(ARGV[2])
+local dropped = 0
+for k = 2, #KEYS do
+    local idle = true
+    if redis.call('EXISTS', KEYS[k]) == 1 then
+        roll(KEYS[k], tonumber(ARGV[1]), slots)
+        idle = tonumber(redis.call('HGET', KEYS[k], 'trades') or '0') < 0.5
+    end
+    if idle then
+        dropped = dropped + redis.call('SREM', KEYS[1], ARGV[k + 1])
+    end
+end
+return dropped
+"""
+
+_record_trade = redis_client.register_script(_RECORD_TRADE_SCRIPT)
+_window = redis_client.register_script(_WINDOW_SCRIPT)
+_deactivate = redis_client.register_script(_DEACTIVATE_SCRIPT)
+
+
+def _stats_key(movie_id: str) -> str:
+    return f"movie:stats:{movie_id}"
+
+
+def _ring() -> tuple:
+    """(current bucket number, number of slots) for the configured window"""
+    bucket = settings.MARKET_STATS_BUCKET_SECONDS
+    return int(time.time() // bucket), max(1, settings.MARKET_STATS_WINDOW_SECONDS // bucket)
+
+
+def summarize(raw: List[str]) -> Dict:
+    """Turn a window script reply into volume, VWAP and imbalance figures"""
+    volume, shares, trades, buy, sell = (float(v) for v in raw[:5])
+    open_, high, low, close = (float(v) if v else None for v in raw[5:9])
+    return {
+        "volume": volume,
+        "shares": shares,
+        "trades": int(round(trades)),
+        "vwap": volume / shares if shares else None,
+        "buy_volume": buy,
+        "sell_volume": sell,
+        "imbalance": (buy - sell) / (buy + sell) if buy + sell else 0.0,
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "price_change_24h": (close - open_) / open_ * 100 if open_ else None,
+    }
+
+
+async def record_trade(trade: Trade) -> bool:
+    """Fold an executed trade into its movie's rolling window (call after commit)"""
+    if trade.status != TradeStatus.EXECUTED:
+        return False
+    now, slots = _ring()
+    try:
+        await _record_trade(
+            keys=[_stats_key(trade.movie_id), ACTIVE_KEY],
+            args=[
+                now, slots, trade.movie_id, trade.shares,
+                trade.execution_price or trade.price_per_share,
+                1 if trade.trade_type in BUY_SIDE else 0,
+                settings.MARKET_STATS_WINDOW_SECONDS + settings.MARKET_STATS_BUCKET_SECONDS
+            ]
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Market stats update error for movie {trade.movie_id}: {e}")
+        return False
+
+
+async def get_window_stats(movie_ids: List[str]) -> Dict[str, Dict]:
+    """Current rolling-window statistics for many movies in one round trip"""
+    if not movie_ids:
+        return {}
+    now, slots = _ring()
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for movie_id in movie_ids:
+            await _window(keys=[_stats_key(movie_id)], args=[now, slots], client=pipe)
+        results = await pipe.execute()
+    return {movie_id: summarize(raw) for movie_id, raw in zip(movie_ids, results)}
+
+
+async def flush_window_stats() -> int:
+    """Write every active movie's window to the cache and the database (scheduled job)"""
+    movie_ids = list(await redis_client.smembers(ACTIVE_KEY))
+    stats = await get_window_stats(movie_ids)
+    if not stats:
+        return 0
+
+    await trading_cache.cache_trading_volumes(
+        stats, ttl=int(max(60, settings.MARKET_STATS_FLUSH_SECONDS * 4))
+    )
+
+    traded = [
+        {"movie_id": movie_id, "volume": s["volume"], "change": s["price_change_24h"],
+         "high": s["high"], "low": s["low"]}
+        for movie_id, s in stats.items() if s["trades"]
+    ]
+    idle = [{"movie_id": movie_id} for movie_id, s in stats.items() if not s["trades"]]
+
+    async with AsyncSessionLocal() as session:
+        if traded:
+            await session.execute(
+                text(
+                    "UPDATE movies SET volume_24h = :volume, price_change_24h = :change, "
+                    "high_24h = :high, low_24h = :low WHERE id = :movie_id"
+                ),
+                traded
+            )
+        if idle:
+            await session.execute(
+                text("UPDATE movies SET volume_24h = 0 WHERE id = :movie_id"), idle
+            )
+        await session.commit()
+
+    if idle:
+        # Dropped only after the zero is persisted, and only if still idle
+        now, slots = _ring()
+        idle_ids = [row["movie_id"] for row in idle]
+        await _deactivate(
+            keys=[ACTIVE_KEY] + [_stats_key(movie_id) for movie_id in idle_ids],
+            args=[now, slots] + idle_ids
+        )
+    await notify_catalog_changed(stats.keys())
+    return len(stats)
@@ -0,0 +1,111 @@
+"""
+CineStox Meme Rendering
+Drawing side of stonk memes, imported only inside render pool workers
+
+Pillow, the decoded templates and the loaded fonts live here, so the app
+workers that queue renders never load them. ``init_worker`` fills the
+template and font caches once per process; ``render`` draws one meme.
+"""
+
+from app.core.config import settings
+from app.services.memes import MEME_SIZE, TEMPLATES, MemeSpec, meme_path
+import os
+from typing import Dict, Tuple
+from PIL import Image, ImageDraw, ImageFont, features
+
+# Decoded once per process
+_templates: Dict[str, Image.Image] = {}
+_fonts: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
+
+
+def _draw_background(name: str) -> Image.Image:
+    spec = TEMPLATES[name]
+    width, height = MEME_SIZE
+    (r1, g1, b1), (r2, g2, b2) = spec["colors"]
+    column = Image.new("RGB", (1, height))
+    column.putdata([
+        (r1 + (r2 - r1) * y // height, g1 + (g2 - g1) * y // height, b1 + (b2 - b1) * y // height)
+        for y in range(height)
+    ])
+    image = column.resize(MEME_SIZE)
+    draw = ImageDraw.Draw(image)
+    if spec["arrow"]:
+        # Zig-zag chart line across the middle band
+        points = [(80 + i * 80, 420 - (i * 35 if i % 2 == 0 else i * 35 - 60)) for i in range(9)]
+        if spec["arrow"] == "down":
+            points = [(x, 600 - y) for x, y in points]
+        color = (40, 220, 90) if spec["arrow"] == "up" else (255, 70, 70)
+        draw.line(points, fill=color, width=12, joint="curve")
+    return image
+
+
+def _load_template(name: str) -> Image.Image:
+    for extension in ("png", "jpg", "jpeg"):
+        path = os.path.join(settings.MEME_TEMPLATE_DIR, f"{name}.{extension}")
+        if os.path.exists(path):
+            with Image.open(path) as image:
+                return image.convert("RGB").resize(MEME_SIZE)
+    return _draw_background(name)
+
+
+def _font(role: str, size: int) -> ImageFont.ImageFont:
+    """Latin or Telugu font at a size, cached (first configured path that loads)"""
+    cached = _fonts.get((role, size))
+    if cached is not None:
+        return cached
+    paths = settings.MEME_TELUGU_FONT_PATHS if role == "telugu" else settings.MEME_FONT_PATHS
+    # Telugu conjuncts need complex shaping (libraqm) to render correctly
+    layout = ImageFont.Layout.RAQM if features.check("raqm") else ImageFont.Layout.BASIC
+    font = None
+    for path in paths:
+        try:
+            font = ImageFont.truetype(path, size, layout_engine=layout)
+            break
+        except OSError:
+            continue
+    if font is None:
+        font = ImageFont.load_default(size=size)
+    _fonts[(role, size)] = font
+    return font
+
+
+def init_worker():
+    for name in TEMPLATES:
+        _templates[name] = _load_template(name)
+    for size in (64, 40, 36):
+        _font("latin", size)
+    _font("telugu", 40)
+
+
+def _centered(draw: ImageDraw.ImageDraw, y: int, text: str, font, fill=(255, 255, 255)):
+    width = draw.textlength(text, font=font)
+    # Keep long titles inside the frame
+    while width > MEME_SIZE[0] - 40 and len(text) > 4:
+        text = text[:-4] + "..."
+        width = draw.textlength(text, font=font)
+    draw.text(((MEME_SIZE[0] - width) / 2, y), text, font=font, fill=fill,
+              stroke_width=3, stroke_fill=(0, 0, 0))
+
+
+def render(spec: MemeSpec) -> str:
+    """Draw a meme to its content-addressed path (runs in a pool worker); returns the path"""
+    path = meme_path(spec.key)
+    if os.path.exists(path):
+        return path
+    if spec.template not in _templates:
+        _templates[spec.template] = _load_template(spec.template)
+    image = _templates[spec.template].copy()
+    draw = ImageDraw.Draw(image)
+
+    _centered(draw, 30, TEMPLATES[spec.template]["headline"].format(symbol=spec.symbol), _font("latin", 64))
+    _centered(draw, 120, spec.title, _font("latin", 40))
+    if spec.telugu_title:
+        _centered(draw, 175, spec.telugu_title, _font("telugu", 40))
+    _centered(draw, 470, f"₹{spec.price:,.2f}", _font("latin", 64), fill=(255, 230, 80))
+    _centered(draw, 545, f"Reddit says: {spec.mood}", _font("latin", 36))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    image.save(tmp_path, format="PNG", optimize=True)
+    os.replace(tmp_path, path)
+    return path
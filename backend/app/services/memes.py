@@ -0,0 +1,202 @@
+"""
+CineStox Stonk Memes
+Price and sentiment meme images, rendered in a process pool and cached on disk
+
+A meme is addressed by its content: (template, symbol, price bucket, mood).
+Prices are bucketed geometrically (MEME_PRICE_BUCKET_PCT apart) and the image
+shows the bucket's price, so every input that maps to a key renders the same
+bytes. The key hashes to MEME_CACHE_DIR/<2 chars>/<key>.png. An existing
+file is served as is, and concurrent requests for a missing one in the same
+worker share a single render. Renders run in a small process pool whose
+workers decode the templates and load the fonts once, in their initializer;
+the drawing code and Pillow live in meme_render and are only imported there.
+Files are written to a temp name and renamed, so readers never see a
+partial image.
+
+Templates are PNG/JPEG files in MEME_TEMPLATE_DIR named after a template
+below. A missing file falls back to a drawn background, so the service
+works without any assets.
+"""
+
+from app.core.config import settings
+import asyncio
+import hashlib
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, NamedTuple, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RENDER_VERSION = 1  # Bump when drawing changes, so old cached files are not reused
+MEME_SIZE = (800, 600)
+
+# Template name -> headline, background gradient (top, bottom), arrow direction
+TEMPLATES: Dict[str, Dict] = {
+    "stonks": {"headline": "{symbol} STONKS", "colors": ((24, 48, 120), (70, 130, 220)), "arrow": "up"},
+    "not_stonks": {"headline": "{symbol} NOT STONKS", "colors": ((90, 10, 20), (200, 40, 50)), "arrow": "down"},
+    "to_the_moon": {"headline": "{symbol} TO THE MOON", "colors": ((5, 5, 25), (40, 30, 90)), "arrow": "up"},
+    "hype_train": {"headline": "ALL ABOARD {symbol}", "colors": ((200, 80, 0), (250, 180, 40)), "arrow": None},
+}
+
+# Movie.sentiment_emoji buckets, as words the fonts can draw
+MOODS = {
+    "🚀": "TO THE MOON",
+    "📈": "BULLISH",
+    "➡️": "SIDEWAYS",
+    "📉": "BEARISH",
+    "💀": "REKT",
+}
+
+
+class MemeSpec(NamedTuple):
+    """Everything that is drawn on a meme"""
+    template: str
+    symbol: str
+    title: str
+    telugu_title: Optional[str]
+    price: float  # The price bucket's price, not the live one
+    mood: str
+
+    @property
+    def key(self) -> str:
+        # The title is fixed per symbol, so it is not part of the address
+        raw = f"{RENDER_VERSION}:{self.template}:{self.symbol}:{self.price:.2f}:{self.mood}"
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def price_bucket(price: float) -> float:
+    """Round a price down to its bucket (buckets MEME_PRICE_BUCKET_PCT apart)"""
+    if price <= 0:
+        return 0.0
+    step = math.log1p(settings.MEME_PRICE_BUCKET_PCT / 100)
+    return round(math.exp(math.floor(math.log(price) / step) * step), 2)
+
+
+def meme_path(key: str) -> str:
+    return os.path.join(settings.MEME_CACHE_DIR, key[:2], f"{key}.png")
+
+
+def build_spec(template: str, symbol: str, title: str, telugu_title: Optional[str],
+               price: float, sentiment_emoji: str) -> MemeSpec:
+    if template not in TEMPLATES:
+        raise ValueError(f"unknown meme template {template!r}")
+    return MemeSpec(template, symbol, title, telugu_title, price_bucket(price), MOODS.get(sentiment_emoji, "SIDEWAYS"))
+
+
+# Pool workers import the drawing code (and Pillow) themselves
+
+def _init_worker():
+    from app.services.meme_render import init_worker
+    init_worker()
+
+
+def _render(spec: MemeSpec) -> str:
+    from app.services.meme_render import render
+    return render(spec)
+
+
+class MemeRenderer:
+    """Per-worker front end: disk cache lookup, render coalescing and the process pool"""
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.metrics = {"hits": 0, "renders": 0, "coalesced": 0, "render_seconds": 0.0}
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned, not forked: the app process has a running loop and open connections
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.MEME_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._pool
+
+    async def _render_in_pool(self, spec: MemeSpec) -> str:
+        for attempt in range(2):
+            pool = self._executor()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, _render, spec)
+            except BrokenProcessPool:
+                # A render process died (e.g. out of memory): retry once in a fresh pool
+                if self._pool is pool:
+                    self._pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+                if attempt:
+                    raise
+
+    async def get(self, spec: MemeSpec) -> str:
+        """Path of the rendered meme, rendering it at most once per worker"""
+        key = spec.key
+        path = meme_path(key)
+        if os.path.exists(path):
+            self.metrics["hits"] += 1
+            return path
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.metrics["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.ensure_future(self._render_in_pool(spec))
+        self._inflight[key] = future
+        started = time.monotonic()
+        try:
+            path = await asyncio.shield(future)
+        finally:
+            self._inflight.pop(key, None)
+        self.metrics["renders"] += 1
+        self.metrics["render_seconds"] += time.monotonic() - started
+        return path
+
+    def stats(self) -> Dict:
+        """Cache and render counters for this worker"""
+        return {**self.metrics, "rendering": len(self._inflight)}
+
+    def stop(self):
+        """Shut the render pool down (call from the app lifespan)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def prune_cache() -> int:
+    """Delete cached memes not served for MEME_CACHE_TTL_DAYS (scheduled job, blocking)"""
+    if not os.path.isdir(settings.MEME_CACHE_DIR):
+        return 0
+    cutoff = time.time() - settings.MEME_CACHE_TTL_DAYS * 86400
+    removed = 0
+    for directory, _, filenames in os.walk(settings.MEME_CACHE_DIR):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def touch(path: str):
+    """Mark a cached meme as recently served (at most daily, keeps it from being pruned)"""
+    try:
+        if os.stat(path).st_mtime < time.time() - 86400:
+            os.utime(path)
+    except OSError:
+        pass
+
+
+def template_names() -> List[str]:
+    return list(TEMPLATES)
+
+
+meme_renderer = MemeRenderer()
@@ -0,0 +1,28 @@
+"""
+CineStox Market State Migration
+Folds the old movie:price/movie:volume/movie:hype/reddit:sentiment string keys
+into per-movie market state hashes
+
+Usage:
+    python -m app.services.migrate_market_state
+
+Run once after every worker writes hashes only (MARKET_STATE_LEGACY_WRITES
+off), then turn MARKET_STATE_LEGACY_READS off.
+"""
+
+from app.core.cache import trading_cache
+import asyncio
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    migrated = asyncio.run(trading_cache.migrate_legacy_market_keys())
+    print(f"✅ Migrated {migrated} legacy market keys")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+CineStox NFT Chain Adapters
+Build, send and confirm batches of mints on a chain
+
+``get_chain()`` returns the adapter named by NFT_CHAIN_BACKEND. A batch is
+built (signed) first, which fixes its transaction hash without sending
+anything, so the pipeline can record the hash before the transaction
+exists anywhere else. Only the ``local`` chain ships here: it keeps its
+transactions, receipts and minted serials in Redis, so every worker sees
+the same chain, assigns sequential token ids and confirms a batch
+NFT_LOCAL_CHAIN_CONFIRM_SECONDS after it was sent. A real chain plugs in
+by implementing the same four calls.
+"""
+
+from app.core.cache import redis_client
+from app.core.config import settings
+import hashlib
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, List, NamedTuple, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MintRequest(NamedTuple):
+    """One token to mint"""
+    nft_id: str
+    owner_id: str
+    movie_id: str
+    serial: int
+    metadata: Dict
+
+
+class Receipt(NamedTuple):
+    """Outcome of a confirmed (or reverted) batch transaction"""
+    tx_hash: str
+    success: bool
+    token_ids: Dict[str, int]  # nft_id -> token id
+    error: Optional[str] = None
+
+
+class ChainAdapter(ABC):
+    """Interface the minting pipeline talks to"""
+
+    @abstractmethod
+    async def build_batch(self, mints: List[MintRequest]) -> str:
+        """Sign a batch-mint transaction without sending it; returns its hash"""
+
+    @abstractmethod
+    async def send_batch(self, tx_hash: str, mints: List[MintRequest]):
+        """Broadcast a built transaction (sending it twice is harmless)"""
+
+    @abstractmethod
+    async def get_receipt(self, tx_hash: str) -> Optional[Receipt]:
+        """The receipt once the transaction is final, None while pending or unknown"""
+
+    @abstractmethod
+    async def knows(self, tx_hash: str) -> bool:
+        """False if the transaction was never sent, so it can never produce a receipt"""
+
+
+# Confirm a sent batch once: revert if any serial exists, else assign token ids.
+#
+# KEYS: receipt hash, minted serials hash, token id counter
+# ARGV: ttl, then nft_id, "movie_id:serial" per mint
+# Returns: the receipt hash as a flat field/value list
+_CONFIRM_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    local duplicate = nil
+    for i = 2, #ARGV, 2 do
+        if redis.call('HEXISTS', KEYS[2], ARGV[i + 1]) == 1 then
+            duplicate = ARGV[i + 1]
+            break
+        end
+    end
+    if duplicate then
+        redis.call('HSET', KEYS[1], '_error', 'serial ' .. duplicate .. ' exists')
+    else
+        for i = 2, #ARGV, 2 do
+            local token_id = redis.call('INCR', KEYS[3])
+            redis.call('HSET', KEYS[2], ARGV[i + 1], token_id)
+            redis.call('HSET', KEYS[1], ARGV[i], token_id)
+        end
+        redis.call('HSET', KEYS[1], '_ok', 1)
+    end
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[1]))
+end
+return redis.call('HGETALL', KEYS[1])
+"""
+
+
+class LocalChain(ChainAdapter):
+    """Redis-backed stand-in chain for development and tests, shared by all workers"""
+
+    RETENTION_SECONDS = 7 * 86400  # Sent transactions and receipts kept this long
+    MINTED_KEY = "nftchain:local:minted"  # "movie_id:serial" -> token id
+    TOKEN_ID_KEY = "nftchain:local:token_id"
+
+    def __init__(self, confirm_seconds: Optional[float] = None, client=None):
+        self.confirm_seconds = (
+            settings.NFT_LOCAL_CHAIN_CONFIRM_SECONDS if confirm_seconds is None else confirm_seconds
+        )
+        self.client = client or redis_client
+        self._confirm = self.client.register_script(_CONFIRM_SCRIPT)
+
+    @staticmethod
+    def _tx_key(tx_hash: str) -> str:
+        return f"nftchain:local:tx:{tx_hash}"
+
+    @staticmethod
+    def _receipt_key(tx_hash: str) -> str:
+        return f"nftchain:local:receipt:{tx_hash}"
+
+    async def build_batch(self, mints: List[MintRequest]) -> str:
+        digest = hashlib.sha256(f"{uuid.uuid4()}:{len(mints)}".encode()).hexdigest()
+        return f"0x{digest}"
+
+    async def send_batch(self, tx_hash: str, mints: List[MintRequest]):
+        payload = {
+            "confirm_at": time.time() + self.confirm_seconds,
+            "mints": [[mint.nft_id, f"{mint.movie_id}:{mint.serial}"] for mint in mints],
+        }
+        await self.client.set(self._tx_key(tx_hash), json.dumps(payload), nx=True, ex=self.RETENTION_SECONDS)
+
+    async def get_receipt(self, tx_hash: str) -> Optional[Receipt]:
+        raw = await self.client.get(self._tx_key(tx_hash))
+        if raw is None:
+            return None
+        payload = json.loads(raw)
+        if time.time() < payload["confirm_at"]:
+            return None
+        args = [self.RETENTION_SECONDS]
+        for nft_id, serial_key in payload["mints"]:
+            args.extend((nft_id, serial_key))
+        flat = await self._confirm(
+            keys=[self._receipt_key(tx_hash), self.MINTED_KEY, self.TOKEN_ID_KEY], args=args
+        )
+        fields = dict(zip(flat[::2], flat[1::2]))
+        if "_error" in fields:
+            # Like a contract revert: the whole batch fails
+            return Receipt(tx_hash, False, {}, fields["_error"])
+        fields.pop("_ok", None)
+        return Receipt(tx_hash, True, {nft_id: int(token_id) for nft_id, token_id in fields.items()})
+
+    async def knows(self, tx_hash: str) -> bool:
+        return bool(await self.client.exists(self._tx_key(tx_hash), self._receipt_key(tx_hash)))
+
+
+CHAIN_BACKENDS = {
+    "local": LocalChain,
+}
+
+_chain: Optional[ChainAdapter] = None
+
+
+def get_chain() -> ChainAdapter:
+    """The configured chain adapter (one per process)"""
+    global _chain
+    if _chain is None:
+        backend = CHAIN_BACKENDS.get(settings.NFT_CHAIN_BACKEND)
+        if backend is None:
+            raise ValueError(f"unknown NFT_CHAIN_BACKEND {settings.NFT_CHAIN_BACKEND!r}")
+        _chain = backend()
+    return _chain
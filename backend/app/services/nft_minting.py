@@ -0,0 +1,374 @@
+"""
+CineStox Prediction NFT Minting
+Reserve capped supply atomically, queue mints, submit them to the chain in batches
+
+Requesting a mint never waits on the chain. In one transaction it reserves
+serial numbers with a conditional update of ``movies.nft_supply_used`` (never
+past MAX_NFT_SUPPLY, partially granted when nearly sold out), charges
+NFT_MINTING_FEE for user mints and inserts the NFT rows as QUEUED.
+
+The ``nfts`` table is the queue. Each worker's pipeline claims up to
+NFT_MINT_BATCH_SIZE queued rows (SKIP LOCKED, so workers never share a row),
+marks them SUBMITTED and sends them as one batch transaction. A separate
+loop polls receipts: confirmed batches become MINTED with their token ids,
+while reverted or lost ones are retried and eventually FAILED (with the fee
+refunded). A batch's transaction hash is recorded before it is sent, and
+every later change to its rows is conditional on that batch, its status and
+its hash, so a batch is never requeued while its transaction may confirm.
+Accurate-prediction payouts queue thousands of rows at once and drain at
+batch size per submission.
+"""
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.nft import NFT, NFTStatus
+from app.models.trading import Prediction
+from app.services import ledger
+from app.services.nft_chain import MintRequest, get_chain
+import asyncio
+import logging
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Grant each movie as many of the wanted serials as its supply has left.
+# FOR UPDATE re-reads concurrently updated rows, so grants never overlap.
+_RESERVE_SUPPLY = text("""
+    UPDATE movies m SET nft_supply_used = m.nft_supply_used + g.granted
+    FROM (
+        SELECT mv.id, LEAST(r.wanted, :max_supply - mv.nft_supply_used) AS granted
+        FROM movies mv
+        JOIN (
+            SELECT unnest(CAST(:movie_ids AS text[])) AS movie_id, unnest(CAST(:counts AS int[])) AS wanted
+        ) AS r ON r.movie_id = mv.id
+        WHERE mv.nft_supply_used < :max_supply
+        ORDER BY mv.id
+        FOR UPDATE OF mv
+    ) AS g
+    WHERE m.id = g.id
+    RETURNING m.id, m.nft_supply_used - g.granted + 1 AS first_serial, g.granted
+""")
+
+# Record a built batch's transaction hash; matches nothing once the batch
+# was requeued, in which case the transaction must not be sent
+_RECORD_TX = text("""
+    UPDATE nfts SET tx_hash = :tx_hash
+    WHERE batch_id = :batch_id AND status = 'SUBMITTED' AND tx_hash IS NULL
+""")
+
+# Put a batch back in the queue, or give up on rows out of attempts. Only
+# while its transaction hash is still the one the decision was based on, so
+# a hash recorded meanwhile (a send under way) keeps the batch.
+_RETRY_OR_FAIL = text("""
+    UPDATE nfts SET
+        status = CASE WHEN attempts >= :max_attempts THEN 'FAILED' ELSE 'QUEUED' END::nftstatus,
+        error = :error, tx_hash = NULL, batch_id = NULL
+    WHERE batch_id = :batch_id AND status = 'SUBMITTED'
+      AND tx_hash IS NOT DISTINCT FROM CAST(:tx_hash AS varchar)
+    RETURNING id, owner_id, fee_paid, status
+""")
+
+# Apply a confirmed batch's token ids to rows still submitted in it
+_MARK_MINTED = text("""
+    UPDATE nfts n SET status = 'MINTED', token_id = m.token_id, minted_at = :minted_at, error = NULL
+    FROM unnest(CAST(:nft_ids AS varchar[]), CAST(:token_ids AS bigint[])) AS m(id, token_id)
+    WHERE n.id = m.id AND n.batch_id = :batch_id AND n.status = 'SUBMITTED' AND n.tx_hash = :tx_hash
+""")
+
+
+class MintingError(Exception):
+    """Raised when a mint cannot be queued"""
+
+
+async def reserve_supply(session: AsyncSession, wanted: Dict[str, int]) -> Dict[str, Tuple[int, int]]:
+    """Reserve serials per movie in the caller's transaction: {movie_id: (first serial, granted)}"""
+    if not wanted:
+        return {}
+    movie_ids = sorted(wanted)
+    result = await session.execute(_RESERVE_SUPPLY, {
+        "movie_ids": movie_ids, "counts": [wanted[movie_id] for movie_id in movie_ids],
+        "max_supply": settings.MAX_NFT_SUPPLY
+    })
+    return {row.id: (row.first_serial, row.granted) for row in result.all()}
+
+
+async def queue_mints(session: AsyncSession, requests: List[Dict]) -> List[Dict]:
+    """Reserve supply for and insert QUEUED NFT rows, in the caller's transaction.
+
+    Each request has owner_id, movie_id and optionally prediction_id,
+    fee_paid and token_metadata. Requests beyond a movie's remaining supply
+    are dropped (first come, first served); the queued rows are returned.
+    """
+    reserved = await reserve_supply(session, Counter(request["movie_id"] for request in requests))
+    next_serial = {movie_id: first for movie_id, (first, _) in reserved.items()}
+    remaining = {movie_id: granted for movie_id, (_, granted) in reserved.items()}
+
+    rows = []
+    for request in requests:
+        movie_id = request["movie_id"]
+        if not remaining.get(movie_id):
+            continue
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "movie_id": movie_id,
+            "owner_id": request["owner_id"],
+            "prediction_id": request.get("prediction_id"),
+            "serial": next_serial[movie_id],
+            "status": NFTStatus.QUEUED,
+            "fee_paid": request.get("fee_paid", 0.0),
+            "attempts": 0,
+            "token_metadata": request.get("token_metadata", {}),
+        })
+        next_serial[movie_id] += 1
+        remaining[movie_id] -= 1
+    if rows:
+        await session.execute(insert(NFT), rows)
+    return rows
+
+
+async def request_mint(session: AsyncSession, user_id: str, movie_id: str,
+                       prediction_id: Optional[str] = None) -> Dict:
+    """A user-paid mint: reserve, charge NFT_MINTING_FEE and queue (commits)"""
+    metadata = {"kind": "fan"}
+    if prediction_id:
+        prediction = await session.get(Prediction, prediction_id)
+        if prediction is None or prediction.user_id != user_id or prediction.movie_id != movie_id:
+            raise MintingError("prediction not found")
+        # One NFT per prediction (nfts.prediction_id is unique), user-minted or a payout
+        existing = await session.execute(select(NFT.id).where(NFT.prediction_id == prediction_id))
+        if existing.first() is not None:
+            raise MintingError("an NFT was already minted for this prediction")
+        metadata = _prediction_metadata(prediction)
+
+    try:
+        rows = await queue_mints(session, [{
+            "owner_id": user_id, "movie_id": movie_id, "prediction_id": prediction_id,
+            "fee_paid": settings.NFT_MINTING_FEE, "token_metadata": metadata,
+        }])
+    except IntegrityError:
+        # A concurrent mint of the same prediction committed first
+        await session.rollback()
+        raise MintingError("an NFT was already minted for this prediction")
+    if not rows:
+        await session.rollback()
+        raise MintingError("NFT supply for this movie is sold out")
+    # Raises InsufficientFunds, rolling back the reservation with it
+    await ledger.apply_delta(session, user_id, -settings.NFT_MINTING_FEE, "nft_mint", rows[0]["id"])
+    await session.commit()
+    minting_pipeline.wake()
+    return rows[0]
+
+
+def _prediction_metadata(prediction: Prediction) -> Dict:
+    return {
+        "kind": "prediction",
+        "prediction_type": prediction.prediction_type.value,
+        "predicted_value": prediction.predicted_value,
+        "actual_value": prediction.actual_value,
+        "accuracy": round(prediction.accuracy_score or 0.0, 2),
+    }
+
+
+async def mint_payouts(session: AsyncSession, predictions: List[Prediction]) -> int:
+    """Queue a free NFT for each accurate resolved prediction, in the caller's transaction"""
+    winners = [
+        p for p in predictions
+        if p.is_resolved and (p.accuracy_score or 0.0) >= settings.NFT_PAYOUT_MIN_ACCURACY
+    ]
+    if not winners:
+        return 0
+    result = await session.execute(
+        select(NFT.prediction_id).where(NFT.prediction_id.in_([p.id for p in winners]))
+    )
+    already = set(result.scalars().all())
+    rows = await queue_mints(session, [
+        {"owner_id": p.user_id, "movie_id": p.movie_id, "prediction_id": p.id,
+         "token_metadata": _prediction_metadata(p)}
+        for p in winners if p.id not in already
+    ])
+    return len(rows)
+
+
+class MintingPipeline:
+    """Claims queued NFTs in batches, submits them and tracks confirmations"""
+
+    def __init__(self):
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.metrics = {"batches": 0, "submitted": 0, "minted": 0, "retried": 0, "failed": 0}
+
+    def wake(self):
+        """Submit without waiting for the next poll (rows queued by this worker)"""
+        self._wake.set()
+
+    async def _claim_batch(self) -> Tuple[Optional[str], List[NFT]]:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(NFT).where(NFT.status == NFTStatus.QUEUED)
+                .order_by(NFT.created_at)
+                .limit(settings.NFT_MINT_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            nfts = result.scalars().all()
+            if not nfts:
+                return None, []
+            # Claimed before sending, so no other worker can submit the same rows
+            batch_id = str(uuid.uuid4())
+            now = datetime.now(timezone.utc)
+            for nft in nfts:
+                nft.status = NFTStatus.SUBMITTED
+                nft.batch_id = batch_id
+                nft.attempts = (nft.attempts or 0) + 1
+                nft.submitted_at = now
+            await session.commit()
+            return batch_id, nfts
+
+    async def submit_once(self) -> int:
+        """Submit one batch; returns its size (0 when the queue is empty)"""
+        batch_id, nfts = await self._claim_batch()
+        if not nfts:
+            return 0
+        mints = [
+            MintRequest(nft.id, nft.owner_id, nft.movie_id, nft.serial, nft.token_metadata or {})
+            for nft in nfts
+        ]
+        chain = get_chain()
+        try:
+            tx_hash = await chain.build_batch(mints)
+        except Exception as e:
+            logger.error(f"NFT batch {batch_id} could not be built: {e}")
+            await self._retry_or_fail(batch_id, None, str(e))
+            return len(nfts)
+
+        # Recorded before sending: once sent, only its receipt decides the batch
+        async with AsyncSessionLocal() as session:
+            recorded = await session.execute(_RECORD_TX, {"tx_hash": tx_hash, "batch_id": batch_id})
+            await session.commit()
+        if recorded.rowcount == 0:
+            logger.error(f"NFT batch {batch_id} was requeued before it was sent")
+            return len(nfts)
+
+        try:
+            await chain.send_batch(tx_hash, mints)
+        except Exception as e:
+            # It may have gone out anyway; the batch is requeued once the chain
+            # still does not know it after NFT_MINT_SUBMIT_TIMEOUT_SECONDS
+            logger.error(f"NFT batch {batch_id} submission failed: {e}")
+            return len(nfts)
+        self.metrics["batches"] += 1
+        self.metrics["submitted"] += len(nfts)
+        return len(nfts)
+
+    async def _retry_or_fail(self, batch_id: str, tx_hash: Optional[str], error: str):
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(_RETRY_OR_FAIL, {
+                "batch_id": batch_id, "tx_hash": tx_hash, "error": error[:1000],
+                "max_attempts": settings.NFT_MINT_MAX_ATTEMPTS
+            })
+            rows = result.all()
+            failed = [row for row in rows if row.status == NFTStatus.FAILED.name]
+            refunds = [
+                ledger.BalanceDelta(row.owner_id, row.fee_paid, "nft_refund", row.id)
+                for row in failed if row.fee_paid
+            ]
+            if refunds:
+                await ledger.apply_deltas(session, refunds)
+            await session.commit()
+        self.metrics["retried"] += len(rows) - len(failed)
+        self.metrics["failed"] += len(failed)
+
+    async def confirm_once(self) -> int:
+        """Apply every available receipt; returns NFTs minted"""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(text(
+                "SELECT batch_id, tx_hash, min(submitted_at) AS submitted_at FROM nfts "
+                "WHERE status = 'SUBMITTED' GROUP BY batch_id, tx_hash"
+            ))
+            batches = result.all()
+
+        chain = get_chain()
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.NFT_MINT_SUBMIT_TIMEOUT_SECONDS)
+        minted = 0
+        for batch in batches:
+            if batch.tx_hash is None or not await chain.knows(batch.tx_hash):
+                # Never sent (its worker died, or the send failed): requeue once stale.
+                # Guarded by the hash read here, so a send recorded since is left alone.
+                if batch.submitted_at < stale_before:
+                    await self._retry_or_fail(batch.batch_id, batch.tx_hash, "submission lost")
+                continue
+            receipt = await chain.get_receipt(batch.tx_hash)
+            if receipt is None:
+                continue
+            if not receipt.success:
+                logger.error(f"NFT batch {batch.batch_id} reverted: {receipt.error}")
+                await self._retry_or_fail(batch.batch_id, batch.tx_hash, receipt.error or "reverted")
+                continue
+
+            nft_ids = list(receipt.token_ids)
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(_MARK_MINTED, {
+                    "nft_ids": nft_ids, "token_ids": [receipt.token_ids[nft_id] for nft_id in nft_ids],
+                    "minted_at": datetime.now(timezone.utc), "batch_id": batch.batch_id,
+                    "tx_hash": batch.tx_hash
+                })
+                await session.commit()
+            minted += result.rowcount
+        self.metrics["minted"] += minted
+        return minted
+
+    async def _submit_loop(self):
+        while True:
+            try:
+                # Keep going while full batches remain (payout bursts)
+                while await self.submit_once() >= settings.NFT_MINT_BATCH_SIZE:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"NFT submit loop error: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.NFT_MINT_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _confirm_loop(self):
+        while True:
+            try:
+                await self.confirm_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"NFT confirm loop error: {e}")
+            await asyncio.sleep(settings.NFT_MINT_POLL_SECONDS)
+
+    def stats(self) -> Dict:
+        """Minting counters for this worker"""
+        return dict(self.metrics)
+
+    def start(self):
+        """Start submitting and confirming (call from the app lifespan)"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._submit_loop()), asyncio.create_task(self._confirm_loop())]
+
+    async def stop(self):
+        """Stop the loops; claimed batches are confirmed or requeued by any worker later"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+
+minting_pipeline = MintingPipeline()
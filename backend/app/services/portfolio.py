@@ -0,0 +1,152 @@
+"""
+CineStox Portfolio Service
+Incrementally maintained positions, valued lazily at read time
+
+Every settlement batch advances its users' position version while it holds
+their settlement locks. A cold seed reads the database and the version
+under the same lock (shared), so the version says exactly which trades the
+seed contains, and ``apply_trade`` skips deltas the seed already has.
+"""
+
+from sqlalchemy import select, text
+from app.core.cache import trading_cache
+from app.core.database import AsyncSessionLocal
+from app.models.trading import Portfolio, Trade, TradeStatus
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+METRICS = ("owned", "shorted", "cost", "proceeds", "realized", "invested", "last")
+
+
+def positions_from_rows(rows: List[Portfolio]) -> Dict[str, float]:
+    """Build positions hash fields from Portfolio rows"""
+    fields = {}
+    for row in rows:
+        m = row.movie_id
+        fields[f"owned:{m}"] = row.shares_owned or 0
+        fields[f"shorted:{m}"] = row.shares_shorted or 0
+        fields[f"cost:{m}"] = (row.shares_owned or 0) * (row.average_buy_price or 0.0)
+        fields[f"proceeds:{m}"] = (row.shares_shorted or 0) * (row.average_sell_price or 0.0)
+        fields[f"realized:{m}"] = row.realized_pnl or 0.0
+        fields[f"invested:{m}"] = row.total_invested or 0.0
+        if row.shares_owned or row.shares_shorted:
+            # Last known value per share, until a live price or trade replaces it
+            net = (row.shares_owned or 0) - (row.shares_shorted or 0)
+            fields[f"last:{m}"] = (row.current_value or 0.0) / net if net else row.average_buy_price or 0.0
+    return fields
+
+
+def value_positions(fields: Dict[str, float], prices: Dict[str, float]) -> Dict:
+    """Value a positions hash at current prices.
+
+    Same arithmetic as ``Portfolio.calculate_current_value``, applied per movie.
+    """
+    by_movie = defaultdict(dict)
+    for field, value in fields.items():
+        metric, _, movie_id = field.partition(":")
+        if metric in METRICS:
+            by_movie[movie_id][metric] = value
+
+    positions = []
+    totals = {"current_value": 0.0, "unrealized_pnl": 0.0, "realized_pnl": 0.0, "total_invested": 0.0}
+    for movie_id, p in by_movie.items():
+        owned = p.get("owned", 0.0)
+        shorted = p.get("shorted", 0.0)
+        realized = p.get("realized", 0.0)
+        if not owned and not shorted and not realized:
+            continue
+
+        average_buy_price = p.get("cost", 0.0) / owned if owned else 0.0
+        average_sell_price = p.get("proceeds", 0.0) / shorted if shorted else 0.0
+        current_price = prices.get(movie_id, p.get("last", average_buy_price or average_sell_price))
+
+        current_value = (owned * current_price) - (shorted * current_price)
+        long_pnl = (current_price - average_buy_price) * owned if average_buy_price > 0 else 0
+        short_pnl = (average_sell_price - current_price) * shorted if average_sell_price > 0 else 0
+        unrealized_pnl = long_pnl + short_pnl
+        invested = p.get("invested", 0.0)
+
+        total_return = 0.0
+        if invested > 0:
+            total_return = ((current_value + realized - invested) / invested) * 100
+
+        positions.append({
+            "movie_id": movie_id,
+            "shares_owned": int(owned),
+            "shares_shorted": int(shorted),
+            "net_position": int(owned - shorted),
+            "average_buy_price": average_buy_price,
+            "average_sell_price": average_sell_price,
+            "current_price": current_price,
+            "current_value": current_value,
+            "unrealized_pnl": unrealized_pnl,
+            "realized_pnl": realized,
+            "total_invested": invested,
+            "total_return": total_return
+        })
+        totals["current_value"] += current_value
+        totals["unrealized_pnl"] += unrealized_pnl
+        totals["realized_pnl"] += realized
+        totals["total_invested"] += invested
+
+    return {"positions": positions, **totals}
+
+
+async def load_positions(user_id: str) -> Dict[str, float]:
+    """Get a user's positions hash, seeding it from the primary on a cold miss"""
+    from app.services.settlement import SETTLEMENT_LOCK_CLASS
+
+    fields = await trading_cache.get_user_positions(user_id)
+    if fields is not None:
+        return fields
+
+    async with AsyncSessionLocal() as session:
+        # Shared settlement lock: no batch of this user is between its version bump and commit
+        await session.execute(
+            text("SELECT pg_advisory_xact_lock_shared(:lock_class, hashtext(:user_id))"),
+            {"lock_class": SETTLEMENT_LOCK_CLASS, "user_id": user_id}
+        )
+        result = await session.execute(select(Portfolio).where(Portfolio.user_id == user_id))
+        fields = positions_from_rows(result.scalars().all())
+        version = await trading_cache.get_position_version(user_id)
+        await session.commit()
+
+    if version is not None:
+        await trading_cache.seed_user_positions(user_id, fields, version)
+    return fields
+
+
+async def get_portfolio_snapshot(user_id: str) -> Dict:
+    """Current portfolio for a user: cached positions valued at live prices"""
+    fields = await load_positions(user_id)
+    movie_ids = list({field.partition(":")[2] for field in fields if ":" in field})
+    prices = await trading_cache.get_movie_prices(movie_ids)
+    snapshot = value_positions(fields, prices)
+    snapshot["user_id"] = user_id
+    return snapshot
+
+
+async def apply_trade(trade: Trade, version: Optional[int]) -> bool:
+    """Apply an executed trade, settled at position ``version``, to its user's cached positions.
+
+    Call after commit. Without a version (Redis was unavailable at
+    settlement) the cached positions are dropped and rebuilt on next read.
+    """
+    if trade.status != TradeStatus.EXECUTED:
+        return False
+    if version is None:
+        await trading_cache.invalidate_user_positions(trade.user_id)
+        return False
+    return await trading_cache.apply_position_delta(
+        trade.user_id,
+        trade.movie_id,
+        trade.trade_type.value,
+        trade.shares,
+        trade.execution_price or trade.price_per_share,
+        version
+    )
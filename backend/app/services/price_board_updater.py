@@ -0,0 +1,108 @@
+"""
+CineStox Price Board Updater
+Keeps the host's shared-memory price board (app.core.price_board) current
+
+Every worker runs one of these, but only the worker holding an exclusive
+``flock`` on PRICE_BOARD_LOCK_PATH publishes: it reads the catalog's market
+hashes from Redis in one pipeline every PRICE_BOARD_TICK_SECONDS and writes
+them to the board. The others retry the lock, so if the updating worker
+dies (releasing the lock with its file descriptor) another takes over.
+"""
+
+from app.core.cache import trading_cache
+from app.core.config import settings
+from app.core.price_board import price_board
+from app.services.catalog_snapshot import catalog_snapshot
+import asyncio
+import fcntl
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class PriceBoardUpdater:
+    """Elects one publisher per host and refreshes the board on a fixed tick"""
+
+    def __init__(self):
+        self._lock_fd: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {"ticks": 0, "rows": 0, "errors": 0, "last_tick_ms": 0.0}
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_fd is not None
+
+    def _try_lead(self) -> bool:
+        """Take the host-wide updater lock without blocking"""
+        fd = os.open(settings.PRICE_BOARD_LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def _release(self):
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    async def publish_once(self) -> int:
+        """Copy every catalog movie's market state from Redis to the board"""
+        started = time.monotonic()
+        await catalog_snapshot.ensure_loaded()
+        rows = await trading_cache.get_board_rows(list(catalog_snapshot.entries))
+        written = price_board.publish(rows)
+        self.metrics["ticks"] += 1
+        self.metrics["rows"] = written
+        self.metrics["last_tick_ms"] = (time.monotonic() - started) * 1000
+        return written
+
+    async def _run(self):
+        while True:
+            if not self.is_leader and self._try_lead():
+                price_board.create()
+                logger.info(f"📋 Price board updater elected (pid {os.getpid()})")
+            if self.is_leader:
+                try:
+                    await self.publish_once()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Readers fall back to Redis once the heartbeat goes stale
+                    self.metrics["errors"] += 1
+                    logger.error(f"Price board publish failed: {e}")
+                await asyncio.sleep(settings.PRICE_BOARD_TICK_SECONDS)
+            else:
+                await asyncio.sleep(settings.PRICE_BOARD_ELECTION_SECONDS)
+
+    def stats(self) -> Dict:
+        """Updater role and last tick for this worker"""
+        return {**self.metrics, "leader": self.is_leader, "board_available": price_board.available}
+
+    def start(self):
+        """Start electing and publishing (call from the app lifespan)"""
+        if settings.PRICE_BOARD_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop publishing and hand the lock to another worker"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._release()
+        price_board.close()
+
+
+price_board_updater = PriceBoardUpdater()
@@ -0,0 +1,305 @@
+"""
+CineStox Trade Settlement
+Group-commits executed trades: many executions, one transaction
+
+Executions are buffered for a few milliseconds (or until a batch fills) and
+written together: one multi-row INSERT for the trades, one bulk UPDATE for
+the touched positions and one conditional balance update (with its ledger
+entries) for the users. Each caller awaits its own future, which resolves
+once the batch has committed, so throughput scales with batch size rather
+than with commit (fsync) latency.
+"""
+
+from sqlalchemy import insert, select, text, tuple_, update
+from app.core.cache import trading_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, mark_user_wrote
+from app.models.trading import Portfolio, Trade, TradeOrderKey, TradeStatus, TradeType
+from app.services import ledger, market_stats, portfolio, trending
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Advisory lock class for per-user settlement (second key is hashtext(user_id))
+SETTLEMENT_LOCK_CLASS = 4201
+
+HOLDING_FIELDS = (
+    "shares_owned", "shares_shorted", "average_buy_price", "average_sell_price",
+    "realized_pnl", "total_invested", "last_trade_at", "updated_at"
+)
+
+# Trades that pay cash out of the balance; the rest pay into it
+DEBITS = {TradeType.BUY, TradeType.COVER}
+
+# Trades that close shares held in the position
+CLOSING = {TradeType.SELL: "shares_owned", TradeType.COVER: "shares_shorted"}
+
+
+class SettlementError(Exception):
+    """Raised to a caller whose trade could not be settled"""
+
+
+def cash_delta(trade: Trade) -> float:
+    """Balance change caused by a trade"""
+    return -trade.total_amount if trade.trade_type in DEBITS else trade.total_amount
+
+
+def _trade_row(trade: Trade, settled_at: datetime) -> Dict:
+    """Column values for a multi-row INSERT, with Python-side defaults applied"""
+    if trade.id is None:
+        trade.id = str(uuid.uuid4())
+    if trade.created_at is None:
+        trade.created_at = settled_at
+    row = {}
+    for column in Trade.__table__.columns:
+        value = getattr(trade, column.key)
+        if value is None and column.default is not None and column.default.is_scalar:
+            value = column.default.arg
+            setattr(trade, column.key, value)
+        row[column.key] = value
+    return row
+
+
+def _new_position(user_id: str, movie_id: str) -> Portfolio:
+    return Portfolio(
+        id=str(uuid.uuid4()), user_id=user_id, movie_id=movie_id,
+        shares_owned=0, shares_shorted=0, average_buy_price=0.0, average_sell_price=0.0,
+        realized_pnl=0.0, total_invested=0.0
+    )
+
+
+def oversells(position: Optional[Portfolio], trade: Trade) -> bool:
+    """True if a SELL or COVER closes more shares than the position holds"""
+    field = CLOSING.get(trade.trade_type)
+    if field is None:
+        return False
+    held = getattr(position, field) if position is not None else 0
+    return (held or 0) < trade.shares
+
+
+def apply_to_position(position: Portfolio, trade: Trade):
+    """``Portfolio.update_holdings`` plus the invested total the positions cache keeps"""
+    position.update_holdings(trade)
+    if trade.trade_type == TradeType.BUY:
+        position.total_invested = (position.total_invested or 0.0) + trade.shares * trade.execution_price
+
+
+async def write_batch(trades: List[Trade]) -> Tuple[Optional[Dict[str, int]], List[Trade]]:
+    """Persist executed trades, positions and balances in one transaction.
+
+    Trades selling or covering more shares than the position holds (each
+    validated before settlement, but concurrently) are left out. Returns
+    each user's position version for this batch (see
+    ``portfolio.apply_trade``, None if Redis could not assign them) and the
+    rejected trades.
+    """
+    settled_at = datetime.now(timezone.utc)
+    user_ids = sorted({trade.user_id for trade in trades})
+    pairs = {(trade.user_id, trade.movie_id) for trade in trades}
+
+    async with AsyncSessionLocal() as session:
+        # Serialize settlement per user across workers (sorted: no deadlocks),
+        # so positions are never created twice and balances never interleave
+        await session.execute(
+            text(
+                "SELECT pg_advisory_xact_lock(:lock_class, hashtext(u)) "
+                "FROM (SELECT unnest(CAST(:user_ids AS text[])) AS u ORDER BY 1) AS s"
+            ),
+            {"lock_class": SETTLEMENT_LOCK_CLASS, "user_ids": user_ids}
+        )
+        # Under the locks, so a position seed sees this batch entirely or not at all
+        versions = await trading_cache.bump_position_versions(user_ids)
+
+        result = await session.execute(
+            select(Portfolio.__table__).where(
+                tuple_(Portfolio.user_id, Portfolio.movie_id).in_(list(pairs))
+            )
+        )
+        # Detached copies: holdings are computed in Python, then written in bulk
+        positions = {(row.user_id, row.movie_id): Portfolio(**row._mapping) for row in result.all()}
+        created = set()
+        accepted, rejected = [], []
+
+        for trade in trades:
+            key = (trade.user_id, trade.movie_id)
+            # Checked in batch order under the user's lock, so oversells never credit cash
+            if oversells(positions.get(key), trade):
+                rejected.append(trade)
+                continue
+            if key not in positions:
+                positions[key] = _new_position(*key)
+                created.add(key)
+            apply_to_position(positions[key], trade)
+            accepted.append(trade)
+
+        if not accepted:
+            await session.commit()
+            return versions, rejected
+
+        await session.execute(insert(Trade), [_trade_row(trade, settled_at) for trade in accepted])
+        order_keys = [
+            {"user_id": trade.user_id, "order_id": trade.order_id, "trade_id": trade.id,
+             "created_at": trade.created_at}
+            for trade in accepted if trade.order_id
+        ]
+        if order_keys:
+            # A replayed order id fails the batch; retried alone, only the duplicate fails
+            await session.execute(insert(TradeOrderKey), order_keys)
+
+        if created:
+            await session.execute(insert(Portfolio), [
+                {"id": positions[key].id, "user_id": key[0], "movie_id": key[1],
+                 **{field: getattr(positions[key], field) for field in HOLDING_FIELDS}}
+                for key in created
+            ])
+        existing = [key for key in positions if key not in created]
+        if existing:
+            await session.execute(update(Portfolio), [
+                {"id": positions[key].id, **{field: getattr(positions[key], field) for field in HOLDING_FIELDS}}
+                for key in existing
+            ])
+
+        # Raises InsufficientFunds (rolling the batch back) if any user would overdraw
+        await ledger.apply_deltas(session, [
+            ledger.BalanceDelta(trade.user_id, cash_delta(trade), "trade", trade.id) for trade in accepted
+        ])
+        await session.commit()
+    return versions, rejected
+
+
+class SettlementPipeline:
+    """Buffers executed trades and settles them in group commits"""
+
+    def __init__(self, max_batch: Optional[int] = None, max_delay_ms: Optional[float] = None):
+        self.max_batch = max_batch or settings.SETTLEMENT_MAX_BATCH
+        self.max_delay = (settings.SETTLEMENT_MAX_DELAY_MS if max_delay_ms is None else max_delay_ms) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {
+            "batches": 0,
+            "trades": 0,
+            "failed": 0,
+            "rejected": 0,
+            "largest_batch": 0,
+            "commit_seconds": 0.0,
+        }
+
+    def submit(self, trade: Trade) -> asyncio.Future:
+        """Queue an executed trade; the future resolves with it after commit"""
+        if trade.status != TradeStatus.EXECUTED or trade.execution_price is None:
+            raise ValueError("only executed trades can be settled")
+        if self._task is None:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((trade, future))
+        return future
+
+    async def settle(self, trade: Trade) -> Trade:
+        """Settle a trade and wait for its batch to commit.
+
+        The trade still settles if the caller goes away mid-wait.
+        """
+        return await asyncio.shield(self.submit(trade))
+
+    async def _next_batch(self) -> Tuple[List[Tuple[Trade, asyncio.Future]], bool]:
+        item = await self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        if self._queue.empty():
+            # Idle: linger briefly so concurrent executions share the commit.
+            # Under load the queue refills while the previous batch commits.
+            await asyncio.sleep(self.max_delay)
+        while len(batch) < self.max_batch and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _settle(self, batch: List[Tuple[Trade, asyncio.Future]]):
+        trades = [trade for trade, _ in batch]
+        started = time.monotonic()
+        try:
+            versions, rejected = await write_batch(trades)
+        except Exception as e:
+            if len(batch) > 1:
+                # One bad trade (e.g. a duplicate order id) must not fail its neighbours
+                logger.error(f"Settlement batch of {len(batch)} failed, settling individually: {e}")
+                for item in batch:
+                    await self._settle([item])
+                return
+            logger.error(f"Settlement failed for trade {trades[0].id}: {e}")
+            self.metrics["failed"] += 1
+            trade, future = batch[0]
+            if not future.done():
+                future.set_exception(SettlementError(str(e)))
+            return
+
+        self.metrics["batches"] += 1
+        self.metrics["trades"] += len(batch) - len(rejected)
+        self.metrics["rejected"] += len(rejected)
+        self.metrics["largest_batch"] = max(self.metrics["largest_batch"], len(batch))
+        self.metrics["commit_seconds"] += time.monotonic() - started
+
+        for trade in rejected:
+            logger.error(f"Settlement rejected trade {trade.id}: not enough shares to {trade.trade_type.value}")
+        rejected_ids = {id(trade) for trade in rejected}
+        trades = [trade for trade in trades if id(trade) not in rejected_ids]
+
+        # Post-commit hooks: cached positions, rolling stats, trending, read-your-writes
+        await asyncio.gather(
+            *(portfolio.apply_trade(trade, versions and versions.get(trade.user_id)) for trade in trades),
+            *(market_stats.record_trade(trade) for trade in trades),
+            trending.record_trades(trades),
+            *(mark_user_wrote(user_id) for user_id in {trade.user_id for trade in trades}),
+            return_exceptions=True
+        )
+        for trade, future in batch:
+            if future.done():
+                continue
+            if id(trade) in rejected_ids:
+                future.set_exception(SettlementError(f"not enough shares to {trade.trade_type.value}"))
+            else:
+                future.set_result(trade)
+
+    async def _run(self):
+        while True:
+            batch, stopping = await self._next_batch()
+            if batch:
+                await self._settle(batch)
+            if stopping:
+                return
+
+    def stats(self) -> Dict:
+        """Settlement throughput counters for this worker"""
+        batches = self.metrics["batches"]
+        return {
+            **self.metrics,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "average_batch": self.metrics["trades"] / batches if batches else 0.0,
+            "average_commit_ms": self.metrics["commit_seconds"] / batches * 1000 if batches else 0.0,
+        }
+
+    def start(self):
+        """Start the settlement loop (call from the app lifespan)"""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Settle everything already queued, then stop"""
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            await self._task
+            self._task = None
+
+
+settlement_pipeline = SettlementPipeline()
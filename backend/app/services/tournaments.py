@@ -0,0 +1,357 @@
+"""
+CineStox Tournaments
+Time-boxed trading competitions: Sankranthi battles and Box Office Battle Royale
+
+Usage:
+    python -m app.services.tournaments sankranthi --year 2027
+    python -m app.services.tournaments battle-royale --start 2027-01-10 --days 7
+
+A participant's tournament P&L counts only trades inside the window (and
+before their elimination): cash from those trades plus the net shares they
+opened, marked at the current price. Every round the scheduler
+
+1. folds trades since the last round into ``tournament_positions`` (a range
+   read of recent trades through a BRIN index: no locks beyond what any
+   SELECT takes, so live trading is unaffected). Trades count from the
+   participant's enrolment. Each fold re-reads the last
+   TOURNAMENT_FOLD_RESCAN_SECONDS before the previous one and skips trades
+   recorded in ``tournament_folded_trades``, so a settlement that commits
+   after its ``created_at`` has passed the fold is still counted, then
+2. ranks every surviving participant in one INSERT ... SELECT into
+   ``tournament_standings`` and eliminates the bottom of the table,
+
+all in one REPEATABLE READ transaction, so a round is one consistent cut
+across all participants. Leaderboards and personal standings are index
+reads of the latest round.
+"""
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.movie import Movie
+from app.models.tournament import (
+    Tournament, TournamentEntry, TournamentKind, TournamentStanding, TournamentStatus
+)
+import argparse
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SANKRANTHI_DAY = (1, 14)  # Bhogi, Sankranthi and Kanuma fall around January 14
+SANKRANTHI_RELEASE_WINDOW_DAYS = 7  # Festival releases this close to Sankranthi compete
+
+# Add in-window trades not folded yet to each participant's running totals
+_FOLD_TRADES = text("""
+    WITH candidate AS (
+        SELECT t.id, t.user_id, t.movie_id, t.trade_type, t.total_amount, t.shares, t.created_at
+        FROM trades t
+        JOIN tournament_entries e ON e.tournament_id = :tournament_id AND e.user_id = t.user_id
+        WHERE t.created_at >= :fold_from AND t.created_at < :fold_to
+          AND t.status = 'EXECUTED'
+          AND t.created_at >= e.enrolled_at
+          AND (e.eliminated_at IS NULL OR t.created_at < e.eliminated_at)
+          AND (cardinality(CAST(:movie_ids AS text[])) = 0 OR t.movie_id = ANY(CAST(:movie_ids AS text[])))
+    ), fresh AS (
+        INSERT INTO tournament_folded_trades (tournament_id, trade_id, created_at)
+        SELECT :tournament_id, id, created_at FROM candidate
+        ON CONFLICT DO NOTHING
+        RETURNING trade_id
+    )
+    INSERT INTO tournament_positions (tournament_id, user_id, movie_id, cash, net_shares)
+    SELECT :tournament_id, c.user_id, c.movie_id,
+           sum(CASE WHEN c.trade_type IN ('BUY', 'COVER') THEN -c.total_amount ELSE c.total_amount END),
+           sum(CASE WHEN c.trade_type IN ('BUY', 'COVER') THEN c.shares ELSE -c.shares END)
+    FROM candidate c JOIN fresh f ON f.trade_id = c.id
+    GROUP BY c.user_id, c.movie_id
+    ON CONFLICT (tournament_id, user_id, movie_id) DO UPDATE SET
+        cash = tournament_positions.cash + EXCLUDED.cash,
+        net_shares = tournament_positions.net_shares + EXCLUDED.net_shares
+""")
+
+# Folded trades older than the re-scanned window can never be read again
+_PRUNE_FOLDED = text("""
+    DELETE FROM tournament_folded_trades
+    WHERE tournament_id = :tournament_id AND created_at < :fold_from
+""")
+
+_ENROLL = text("""
+    INSERT INTO tournament_entries (tournament_id, user_id, enrolled_at)
+    VALUES (:tournament_id, :user_id, now())
+    ON CONFLICT (tournament_id, user_id) DO NOTHING
+""")
+
+# Rank every surviving participant by P&L at current prices (ties: earliest enrolment)
+_RANK_ROUND = text("""
+    INSERT INTO tournament_standings (tournament_id, round, user_id, pnl, rank, taken_at)
+    SELECT :tournament_id, :round, e.user_id, coalesce(p.pnl, 0),
+           row_number() OVER (ORDER BY coalesce(p.pnl, 0) DESC, e.enrolled_at, e.user_id),
+           :taken_at
+    FROM tournament_entries e
+    LEFT JOIN (
+        SELECT tp.user_id, sum(tp.cash + tp.net_shares * m.current_price) AS pnl
+        FROM tournament_positions tp JOIN movies m ON m.id = tp.movie_id
+        WHERE tp.tournament_id = :tournament_id
+        GROUP BY tp.user_id
+    ) p ON p.user_id = e.user_id
+    WHERE e.tournament_id = :tournament_id AND e.eliminated_at IS NULL
+""")
+
+# Knock out everyone ranked below the survivors' cut (their round rank is final)
+_ELIMINATE = text("""
+    UPDATE tournament_entries e
+    SET eliminated_at = :taken_at, eliminated_round = :round, final_rank = s.rank
+    FROM tournament_standings s
+    WHERE s.tournament_id = :tournament_id AND s.round = :round AND s.rank > :survivors
+      AND e.tournament_id = s.tournament_id AND e.user_id = s.user_id
+""")
+
+# Tournament over: survivors' last round rank is their final rank
+_FINALIZE = text("""
+    UPDATE tournament_entries e
+    SET final_rank = s.rank
+    FROM tournament_standings s
+    WHERE s.tournament_id = :tournament_id AND s.round = :round
+      AND e.tournament_id = s.tournament_id AND e.user_id = s.user_id AND e.eliminated_at IS NULL
+""")
+
+
+class TournamentError(Exception):
+    """Raised when a tournament action is not allowed"""
+
+
+async def create_tournament(
+    db: AsyncSession,
+    name: str,
+    kind: TournamentKind,
+    starts_at: datetime,
+    ends_at: datetime,
+    movie_ids: Optional[List[str]] = None,
+    round_minutes: Optional[int] = None,
+    elimination_fraction: Optional[float] = None
+) -> Tournament:
+    """Schedule a tournament"""
+    if ends_at <= starts_at:
+        raise TournamentError("tournament must end after it starts")
+    if elimination_fraction is None:
+        elimination_fraction = (
+            settings.BATTLE_ROYALE_ELIMINATION_FRACTION if kind == TournamentKind.BATTLE_ROYALE else 0.0
+        )
+    tournament = Tournament(
+        name=name,
+        kind=kind,
+        status=TournamentStatus.UPCOMING,
+        movie_ids=movie_ids or [],
+        starts_at=starts_at,
+        ends_at=ends_at,
+        round_minutes=round_minutes or settings.TOURNAMENT_ROUND_MINUTES,
+        elimination_fraction=elimination_fraction,
+        rounds_taken=0,
+        folded_until=starts_at
+    )
+    db.add(tournament)
+    await db.commit()
+    logger.info(f"🏆 Scheduled {kind.value} '{name}' ({starts_at:%Y-%m-%d %H:%M} - {ends_at:%Y-%m-%d %H:%M})")
+    return tournament
+
+
+async def create_sankranthi_battle(db: AsyncSession, year: int) -> Tournament:
+    """A battle between the festival releases around Sankranthi of ``year``"""
+    festival = datetime(year, *SANKRANTHI_DAY, tzinfo=timezone.utc)
+    window = timedelta(days=SANKRANTHI_RELEASE_WINDOW_DAYS)
+    result = await db.execute(
+        select(Movie.id).where(
+            Movie.is_festival_release.is_(True),
+            Movie.release_date >= festival - window,
+            Movie.release_date <= festival + window
+        )
+    )
+    movie_ids = list(result.scalars().all())
+    if not movie_ids:
+        raise TournamentError(f"no festival releases around Sankranthi {year}")
+    # Bhogi morning to the end of the battle
+    starts_at = festival - timedelta(days=1)
+    return await create_tournament(
+        db, f"Sankranthi Battle {year}", TournamentKind.SANKRANTHI_BATTLE,
+        starts_at, starts_at + timedelta(days=settings.SANKRANTHI_BATTLE_DURATION_DAYS),
+        movie_ids=movie_ids
+    )
+
+
+async def enroll(db: AsyncSession, tournament_id: str, user_id: str) -> TournamentEntry:
+    """Enter a user; open until the tournament ends, or until the first elimination round"""
+    tournament = await db.get(Tournament, tournament_id)
+    if tournament is None:
+        raise TournamentError("tournament not found")
+    if tournament.status == TournamentStatus.FINISHED or datetime.now(timezone.utc) >= tournament.ends_at:
+        raise TournamentError("tournament has finished")
+    if tournament.elimination_fraction and tournament.rounds_taken:
+        raise TournamentError("enrolment closed after the first elimination round")
+
+    # Concurrent enrolments of the same user both succeed with the one entry
+    await db.execute(_ENROLL, {"tournament_id": tournament_id, "user_id": user_id})
+    await db.commit()
+    return await db.get(TournamentEntry, (tournament_id, user_id), populate_existing=True)
+
+
+def survivors_after(participants: int, fraction: float) -> int:
+    """How many stay in after a round: at least one goes out, at least one stays"""
+    return max(1, participants - max(1, math.floor(participants * fraction)))
+
+
+async def take_round(tournament_id: str, now: Optional[datetime] = None) -> Optional[int]:
+    """Fold new trades, rank survivors and eliminate, as one consistent cut; returns the round"""
+    now = now or datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as session:
+        # One snapshot for the fold, the ranking and the eliminations
+        await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        tournament = await session.get(Tournament, tournament_id, with_for_update=True)
+        if tournament is None or tournament.status == TournamentStatus.FINISHED:
+            return None
+
+        # Leave settlement in flight a moment to commit before its trades are folded
+        fold_to = min(now - timedelta(seconds=settings.TOURNAMENT_FOLD_LAG_SECONDS), tournament.ends_at)
+        folded_until = tournament.folded_until or tournament.starts_at
+        # Re-read the tail of the last fold for trades that committed late
+        fold_from = max(
+            folded_until - timedelta(seconds=settings.TOURNAMENT_FOLD_RESCAN_SECONDS), tournament.starts_at
+        )
+        if fold_to > fold_from:
+            fold_params = {"tournament_id": tournament_id, "fold_from": fold_from}
+            await session.execute(_FOLD_TRADES, {
+                **fold_params, "fold_to": fold_to, "movie_ids": list(tournament.movie_ids or [])
+            })
+            await session.execute(_PRUNE_FOLDED, fold_params)
+            tournament.folded_until = max(folded_until, fold_to)
+
+        round_number = (tournament.rounds_taken or 0) + 1
+        params = {"tournament_id": tournament_id, "round": round_number, "taken_at": now}
+        ranked = (await session.execute(_RANK_ROUND, params)).rowcount
+
+        # The final round waits out the re-scan window, so late commits at the end count too
+        finished = now >= tournament.ends_at + timedelta(seconds=settings.TOURNAMENT_FOLD_RESCAN_SECONDS)
+        if finished:
+            await session.execute(_FINALIZE, params)
+            tournament.status = TournamentStatus.FINISHED
+        else:
+            tournament.status = TournamentStatus.ACTIVE
+            if tournament.elimination_fraction and ranked > 1:
+                survivors = survivors_after(ranked, tournament.elimination_fraction)
+                await session.execute(_ELIMINATE, {**params, "survivors": survivors})
+
+        tournament.rounds_taken = round_number
+        tournament.last_round_at = now
+        await session.commit()
+
+    logger.info(f"🏆 Tournament {tournament_id} round {round_number}: {ranked} ranked"
+                f"{' (final)' if finished else ''}")
+    return round_number
+
+
+async def run_due_rounds() -> int:
+    """Take every round that is due (scheduled job)"""
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Tournament).where(
+                Tournament.status != TournamentStatus.FINISHED, Tournament.starts_at <= now
+            )
+        )
+        tournaments = result.scalars().all()
+
+    taken = 0
+    for tournament in tournaments:
+        # Rounds sit on a fixed grid from the start, whenever the job happens to run
+        next_round = (tournament.rounds_taken or 0) + 1
+        due = tournament.starts_at + timedelta(minutes=tournament.round_minutes * next_round)
+        ended = now >= tournament.ends_at + timedelta(seconds=settings.TOURNAMENT_FOLD_RESCAN_SECONDS)
+        if ended or (now >= due and due <= tournament.ends_at):
+            try:
+                await take_round(tournament.id, now)
+                taken += 1
+            except Exception as e:
+                logger.error(f"Tournament round failed for {tournament.id}: {e}")
+    return taken
+
+
+async def leaderboard(db: AsyncSession, tournament: Tournament, skip: int = 0, limit: int = 50) -> List[Dict]:
+    """A page of the latest round's table, best first"""
+    if not tournament.rounds_taken:
+        return []
+    result = await db.execute(
+        select(TournamentStanding.user_id, TournamentStanding.pnl, TournamentStanding.rank)
+        .where(
+            TournamentStanding.tournament_id == tournament.id,
+            TournamentStanding.round == tournament.rounds_taken,
+            TournamentStanding.rank > skip
+        )
+        .order_by(TournamentStanding.rank)
+        .limit(limit)
+    )
+    return [{"user_id": row.user_id, "pnl": row.pnl, "rank": row.rank} for row in result.all()]
+
+
+async def standing(db: AsyncSession, tournament: Tournament, user_id: str) -> Optional[Dict]:
+    """A participant's rank and P&L as of the latest round they were ranked in"""
+    entry = await db.get(TournamentEntry, (tournament.id, user_id))
+    if entry is None:
+        return None
+    round_number = entry.eliminated_round or tournament.rounds_taken or 0
+    row = None
+    participants = 0
+    if round_number:
+        row = await db.get(TournamentStanding, (tournament.id, round_number, user_id))
+        participants = await db.scalar(
+            select(func.count()).select_from(TournamentStanding).where(
+                TournamentStanding.tournament_id == tournament.id, TournamentStanding.round == round_number
+            )
+        )
+    return {
+        "user_id": user_id,
+        "round": round_number,
+        "rank": row.rank if row else None,
+        "pnl": row.pnl if row else 0.0,
+        "participants": participants,
+        "eliminated": entry.eliminated_at is not None,
+        "eliminated_round": entry.eliminated_round,
+        "final_rank": entry.final_rank,
+    }
+
+
+def _utc_date(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+async def _create_from_args(args) -> Tournament:
+    async with AsyncSessionLocal() as session:
+        if args.command == "sankranthi":
+            return await create_sankranthi_battle(session, args.year)
+        starts_at = _utc_date(args.start)
+        return await create_tournament(
+            session, args.name or f"Box Office Battle Royale {starts_at:%Y-%m-%d}",
+            TournamentKind.BATTLE_ROYALE, starts_at, starts_at + timedelta(days=args.days)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule CineStox tournaments")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sankranthi = commands.add_parser("sankranthi", help="Battle between the Sankranthi festival releases")
+    sankranthi.add_argument("--year", type=int, required=True)
+    royale = commands.add_parser("battle-royale", help="Whole-market elimination tournament")
+    royale.add_argument("--start", required=True, help="UTC start date, YYYY-MM-DD")
+    royale.add_argument("--days", type=int, default=7)
+    royale.add_argument("--name")
+    args = parser.parse_args()
+    tournament = asyncio.run(_create_from_args(args))
+    print(f"✅ Scheduled {tournament.name} ({tournament.id})")
+
+
+if __name__ == "__main__":
+    main()
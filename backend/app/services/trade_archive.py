@@ -0,0 +1,247 @@
+"""
+CineStox Trade Archive
+Exports cold trades partitions to Parquet, drops them, and reads them back
+
+Usage:
+    python -m app.services.trade_archive [--dry-run]
+
+Partitions that ended more than TRADES_HOT_DAYS ago are streamed to
+TRADES_ARCHIVE_DIR/trades_<start>_<end>.parquet (sorted by user, so row-group
+statistics let user lookups skip most of a file), verified by row count,
+then detached and dropped. ``trade_history`` answers from the database and,
+for older ranges, from the archive files.
+
+pandas and pyarrow are imported where they are used, so scheduling the
+archive job does not load them into every app worker.
+"""
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.models.trading import Trade, TradeOrderKey
+from app.services.trade_partitions import TradePartition, list_partitions
+import argparse
+import asyncio
+import enum
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_ARCHIVE_NAME = re.compile(r"^trades_(\d{8})_(\d{8})\.parquet$")
+JSON_COLUMNS = {"tags"}
+
+
+def _arrow_type(column):
+    import pyarrow as pa
+
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    # Strings, enums (stored by value) and JSON (stored as text)
+    return pa.string()
+
+
+@lru_cache(maxsize=None)
+def archive_schema():
+    """Fixed schema: every file and every chunk agree, even on all-null columns"""
+    import pyarrow as pa
+
+    return pa.schema([(column.key, _arrow_type(column)) for column in Trade.__table__.columns])
+
+
+def _plain(value: Any) -> Any:
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def trade_record(row) -> Dict:
+    """A trades row as a plain dict (enums as their values)"""
+    return {key: _plain(value) for key, value in row._mapping.items()}
+
+
+def archive_path(partition: TradePartition) -> str:
+    return os.path.join(
+        settings.TRADES_ARCHIVE_DIR,
+        f"trades_{partition.start:%Y%m%d}_{partition.end:%Y%m%d}.parquet"
+    )
+
+
+def archived_ranges() -> List[TradePartition]:
+    """Archive files with the created_at range each covers, oldest first"""
+    if not os.path.isdir(settings.TRADES_ARCHIVE_DIR):
+        return []
+    ranges = []
+    for filename in os.listdir(settings.TRADES_ARCHIVE_DIR):
+        match = _ARCHIVE_NAME.match(filename)
+        if match:
+            start, end = (datetime.strptime(d, "%Y%m%d").replace(tzinfo=timezone.utc) for d in match.groups())
+            ranges.append(TradePartition(os.path.join(settings.TRADES_ARCHIVE_DIR, filename), start, end))
+    return sorted(ranges, key=lambda r: r.start)
+
+
+def _to_arrow(records: List[Dict]):
+    import pandas as pd
+    import pyarrow as pa
+
+    schema = archive_schema()
+    frame = pd.DataFrame.from_records(records, columns=schema.names)
+    for column in JSON_COLUMNS:
+        frame[column] = frame[column].map(lambda v: v if v is None or isinstance(v, str) else json.dumps(v))
+    return pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+
+
+async def export_partition(partition: TradePartition) -> int:
+    """Stream one partition into a compressed Parquet file; returns rows written"""
+    import pyarrow.parquet as pq
+
+    os.makedirs(settings.TRADES_ARCHIVE_DIR, exist_ok=True)
+    path = archive_path(partition)
+    tmp_path = f"{path}.tmp"
+    loop = asyncio.get_running_loop()
+    table = Trade.__table__
+    query = select(table).where(
+        table.c.created_at >= partition.start, table.c.created_at < partition.end
+    ).order_by(table.c.user_id, table.c.created_at)
+
+    rows = 0
+    writer = pq.ParquetWriter(tmp_path, archive_schema(), compression=settings.TRADES_ARCHIVE_COMPRESSION)
+    try:
+        async with engine.connect() as conn:
+            result = await conn.stream(query)
+            async for chunk in result.partitions(settings.TRADES_ARCHIVE_CHUNK_ROWS):
+                batch = _to_arrow([trade_record(row) for row in chunk])
+                # One row group per chunk; compression runs off the event loop
+                await loop.run_in_executor(None, writer.write_table, batch)
+                rows += len(chunk)
+    except BaseException:
+        writer.close()
+        os.remove(tmp_path)
+        raise
+    writer.close()
+
+    written = pq.ParquetFile(tmp_path).metadata.num_rows
+    if written != rows:
+        os.remove(tmp_path)
+        raise RuntimeError(f"archive of {partition.name} has {written} rows, expected {rows}")
+    os.replace(tmp_path, path)
+    return rows
+
+
+async def archive_cold_partitions(dry_run: bool = False) -> int:
+    """Archive and drop every partition older than TRADES_HOT_DAYS (scheduled job)"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.TRADES_HOT_DAYS)
+    async with AsyncSessionLocal() as session:
+        cold = [p for p in await list_partitions(session) if p.end <= cutoff]
+
+    archived = 0
+    for partition in cold:
+        if dry_run:
+            logger.info(f"Would archive {partition.name} ({partition.start:%Y-%m-%d} - {partition.end:%Y-%m-%d})")
+            continue
+        rows = await export_partition(partition)
+        async with AsyncSessionLocal() as session:
+            # Detach first: the parent's lock is brief, then the drop touches only the child
+            await session.execute(text(f"ALTER TABLE trades DETACH PARTITION {partition.name}"))
+            await session.execute(text(f"DROP TABLE {partition.name}"))
+            await session.execute(
+                delete(TradeOrderKey).where(
+                    TradeOrderKey.created_at >= partition.start, TradeOrderKey.created_at < partition.end
+                )
+            )
+            await session.commit()
+        archived += 1
+        logger.info(f"📦 Archived {rows} trades from {partition.name} to {archive_path(partition)}")
+    return archived
+
+
+def read_archive(path: str, user_id: str, movie_id: Optional[str],
+                 start: Optional[datetime], end: Optional[datetime]) -> List[Dict]:
+    """Matching trades from one archive file (blocking; run in an executor)"""
+    import pandas as pd
+
+    filters = [("user_id", "=", user_id)]
+    if movie_id:
+        filters.append(("movie_id", "=", movie_id))
+    if start:
+        filters.append(("created_at", ">=", pd.Timestamp(start)))
+    if end:
+        filters.append(("created_at", "<", pd.Timestamp(end)))
+    frame = pd.read_parquet(path, filters=filters)
+
+    records = []
+    for record in frame.to_dict("records"):
+        for key, value in record.items():
+            if pd.isna(value):
+                record[key] = None  # NaN / NaT from nullable columns
+            elif isinstance(value, pd.Timestamp):
+                record[key] = value.to_pydatetime()
+        for column in JSON_COLUMNS:
+            if isinstance(record.get(column), str):
+                record[column] = json.loads(record[column])
+        records.append(record)
+    return records
+
+
+async def trade_history(
+    session: AsyncSession,
+    user_id: str,
+    movie_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 500
+) -> List[Dict]:
+    """A user's trades, newest first, from hot partitions then the archive"""
+    table = Trade.__table__
+    query = select(table).where(table.c.user_id == user_id)
+    if movie_id:
+        query = query.where(table.c.movie_id == movie_id)
+    if start:
+        query = query.where(table.c.created_at >= start)
+    if end:
+        query = query.where(table.c.created_at < end)
+    result = await session.execute(query.order_by(table.c.created_at.desc()).limit(limit))
+    trades = [trade_record(row) for row in result.all()]
+
+    if len(trades) < limit:
+        loop = asyncio.get_running_loop()
+        seen = {trade["id"] for trade in trades}
+        # Newest archive first; stop reading files once the page is full
+        for archive in reversed(archived_ranges()):
+            if (start and archive.end <= start) or (end and archive.start >= end):
+                continue
+            records = await loop.run_in_executor(
+                None, read_archive, archive.name, user_id, movie_id, start, end
+            )
+            # A file can briefly coexist with its partition while it is being dropped
+            trades.extend(r for r in records if r["id"] not in seen)
+            seen.update(r["id"] for r in records)
+            if len(trades) >= limit:
+                break
+
+    trades.sort(key=lambda t: t["created_at"], reverse=True)
+    return trades[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive cold trades partitions to Parquet")
+    parser.add_argument("--dry-run", action="store_true", help="List partitions that would be archived")
+    args = parser.parse_args()
+    archived = asyncio.run(archive_cold_partitions(dry_run=args.dry_run))
+    print(f"✅ Archived {archived} partitions")
+
+
+if __name__ == "__main__":
+    main()
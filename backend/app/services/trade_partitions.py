@@ -0,0 +1,95 @@
+"""
+CineStox Trade Partitions
+Range partitions of the trades table by created_at
+
+Partitions span TRADES_PARTITION_DAYS days (aligned so 7-day partitions
+start on Mondays) and are named trades_pYYYYMMDD after their first day.
+They are created TRADES_PARTITIONS_AHEAD periods in advance at startup and
+by a daily job, so inserts always find a partition; there is deliberately
+no default partition, which would block creating ranges it already holds.
+"""
+
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import List, NamedTuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+class TradePartition(NamedTuple):
+    name: str
+    start: datetime
+    end: datetime
+
+
+def partition_for(day: date, days: int = None) -> TradePartition:
+    """The partition holding trades created on ``day``"""
+    days = days or settings.TRADES_PARTITION_DAYS
+    ordinal = day.toordinal()
+    first = date.fromordinal(ordinal - (ordinal - 1) % days)
+    start = datetime(first.year, first.month, first.day, tzinfo=timezone.utc)
+    return TradePartition(f"trades_p{first:%Y%m%d}", start, start + timedelta(days=days))
+
+
+def partitions_between(first: date, last: date, days: int = None) -> List[TradePartition]:
+    """Consecutive partitions covering ``first`` through ``last``"""
+    partitions = [partition_for(first, days)]
+    while partitions[-1].end.date() <= last:
+        partitions.append(partition_for(partitions[-1].end.date(), days))
+    return partitions
+
+
+def create_partition_sql(partition: TradePartition) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition.name} PARTITION OF trades "
+        f"FOR VALUES FROM ('{partition.start.isoformat()}') TO ('{partition.end.isoformat()}')"
+    )
+
+
+def upcoming_partitions(today: date = None) -> List[TradePartition]:
+    """The current partition and the ones created ahead of it"""
+    today = today or datetime.now(timezone.utc).date()
+    ahead = today + timedelta(days=settings.TRADES_PARTITION_DAYS * settings.TRADES_PARTITIONS_AHEAD)
+    return partitions_between(today, ahead)
+
+
+async def list_partitions(session) -> List[TradePartition]:
+    """Attached trades partitions, oldest first"""
+    result = await session.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'trades'::regclass"
+    ))
+    partitions = []
+    for name, bound in result.all():
+        match = _BOUND.search(bound or "")
+        if match:
+            partitions.append(TradePartition(
+                name, datetime.fromisoformat(match.group(1)), datetime.fromisoformat(match.group(2))
+            ))
+    return sorted(partitions, key=lambda p: p.start)
+
+
+async def ensure_partitions() -> int:
+    """Create missing partitions up to TRADES_PARTITIONS_AHEAD periods ahead"""
+    async with AsyncSessionLocal() as session:
+        existing = await list_partitions(session)
+        created = 0
+        for partition in upcoming_partitions():
+            if any(p.start < partition.end and partition.start < p.end for p in existing):
+                # Already covered (possibly by a range from a different TRADES_PARTITION_DAYS)
+                continue
+            await session.execute(text(create_partition_sql(partition)))
+            created += 1
+        await session.commit()
+    if created:
+        logger.info(f"🗂️ Created {created} trades partitions")
+    return created
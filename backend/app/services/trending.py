@@ -0,0 +1,230 @@
+"""
+CineStox Trending Engine
+Time-decayed trending scores kept incrementally in Redis sorted sets
+
+A movie's trend score is the sum of its events' weights, each decayed with
+half-life TRENDING_HALF_LIFE_HOURS. Instead of rewriting every score as time
+passes, each event is stored in log space relative to a fixed epoch:
+
+    ln(weight) + rate * (event_time - EPOCH)
+
+and folded into the member's score with log-add-exp. Every member shifts by
+the same amount as time passes, so the stored order is already the decayed
+order: top-N is one ZREVRANGE, and the decayed value at any time is
+``exp(stored - rate * (now - EPOCH))``.
+
+Events come from settled trades (notional), and from rises in hype and
+Reddit sentiment between market history snapshots. Each source also has
+its own set, so the strongest one becomes the ``trend_reason``.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import redis_client
+from app.core.config import settings
+from app.models.trading import Trade, TradeStatus
+from app.services.catalog_snapshot import CatalogEntry, catalog_snapshot
+import logging
+import math
+import time
+from typing import Dict, Iterable, List, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EPOCH = 1704067200  # 2024-01-01T00:00:00Z; scores are stored relative to it
+SCORE_KEY = "trending:score"
+SOURCE_KEYS = {
+    "trades": "trending:trades",
+    "hype": "trending:hype",
+    "sentiment": "trending:sentiment",
+}
+REASONS = {
+    "trades": "📈 Heavy trading",
+    "hype": "🔥 Hype surge",
+    "sentiment": "💬 Positive Reddit buzz",
+}
+
+# Fold log-space events into the total and one source set.
+#
+# KEYS: total zset, source zset
+# ARGV: member1, log_weight1, member2, log_weight2, ...
+_RECORD_SCRIPT = """
+for i = 1, #ARGV, 2 do
+    local member, x = ARGV[i], tonumber(ARGV[i + 1])
+    for _, key in ipairs(KEYS) do
+        local current = redis.call('ZSCORE', key, member)
+        local value = x
+        if current then
+            local a, b = tonumber(current), x
+            if a < b then a, b = b, a end
+            value = a + math.log(1 + math.exp(b - a))
+        end
+        redis.call('ZADD', key, string.format('%.17g', value), member)
+    end
+end
+return #ARGV / 2
+"""
+
+_record = redis_client.register_script(_RECORD_SCRIPT)
+
+
+def decay_rate() -> float:
+    """Per-second decay constant for the configured half-life"""
+    return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+
+def log_weight(weight: float, at: float) -> float:
+    """An event's weight in stored (log, epoch-relative) form"""
+    return math.log(weight) + decay_rate() * (at - EPOCH)
+
+
+def decayed(stored: float, now: float) -> float:
+    """A stored score's decayed value at ``now``"""
+    return math.exp(stored - decay_rate() * (now - EPOCH))
+
+
+async def record_events(source: str, weights: Dict[str, float], at: float = None):
+    """Add positive-weight events for movies from one source (trades, hype, sentiment)"""
+    at = time.time() if at is None else at
+    args = []
+    for movie_id, weight in weights.items():
+        if weight > 0:
+            args.extend((movie_id, repr(log_weight(weight, at))))
+    if not args:
+        return
+    try:
+        await _record(keys=[SCORE_KEY, SOURCE_KEYS[source]], args=args)
+    except Exception as e:
+        logger.error(f"Trending update error ({source}): {e}")
+
+
+async def record_trades(trades: Iterable[Trade]):
+    """Fold settled trades into trending, weighted by notional (call after commit)"""
+    weights: Dict[str, float] = {}
+    for trade in trades:
+        if trade.status == TradeStatus.EXECUTED and trade.total_amount:
+            weights[trade.movie_id] = weights.get(trade.movie_id, 0.0) + trade.total_amount
+    await record_events("trades", {
+        movie_id: notional / settings.TRENDING_TRADE_NOTIONAL_UNIT for movie_id, notional in weights.items()
+    })
+
+
+async def record_market_moves(db: AsyncSession) -> int:
+    """Turn hype and sentiment rises since the previous market history snapshot into events"""
+    result = await db.execute(
+        text("""
+            SELECT movie_id, hype_delta, sentiment_delta FROM (
+                SELECT movie_id,
+                       hype_score - lag(hype_score) OVER w AS hype_delta,
+                       reddit_sentiment - lag(reddit_sentiment) OVER w AS sentiment_delta,
+                       row_number() OVER (PARTITION BY movie_id ORDER BY recorded_at DESC) AS rn
+                FROM market_history
+                WHERE recorded_at > now() - make_interval(secs => :window)
+                WINDOW w AS (PARTITION BY movie_id ORDER BY recorded_at)
+            ) AS moves
+            WHERE rn = 1 AND (hype_delta >= :min_move OR sentiment_delta >= :min_move)
+        """),
+        {"window": settings.MARKET_HISTORY_INTERVAL_SECONDS * 2.5, "min_move": settings.TRENDING_MIN_MOVE}
+    )
+    rows = result.all()
+    # Small drifts (e.g. hype decaying back up to the baseline) are not news
+    await record_events("hype", {
+        row.movie_id: row.hype_delta * settings.TRENDING_HYPE_WEIGHT
+        for row in rows if (row.hype_delta or 0) >= settings.TRENDING_MIN_MOVE
+    })
+    await record_events("sentiment", {
+        row.movie_id: row.sentiment_delta * settings.TRENDING_SENTIMENT_WEIGHT
+        for row in rows if (row.sentiment_delta or 0) >= settings.TRENDING_MIN_MOVE
+    })
+    return len(rows)
+
+
+async def top_movies(limit: int) -> List[Tuple[str, float]]:
+    """Highest (movie_id, decayed score) pairs, best first"""
+    ranked = await redis_client.zrevrange(SCORE_KEY, 0, limit - 1, withscores=True)
+    now = time.time()
+    return [(movie_id, decayed(stored, now)) for movie_id, stored in ranked]
+
+
+async def trend_reasons(movie_ids: List[str]) -> Dict[str, str]:
+    """The source contributing most to each movie's score"""
+    if not movie_ids:
+        return {}
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key in SOURCE_KEYS.values():
+            pipe.zmscore(key, movie_ids)
+        results = await pipe.execute()
+    reasons = {}
+    for i, movie_id in enumerate(movie_ids):
+        # Same epoch shift for every source: compare stored values directly
+        scores = {source: results[j][i] for j, source in enumerate(SOURCE_KEYS)}
+        best = max((s for s in scores if scores[s] is not None), key=scores.get, default=None)
+        reasons[movie_id] = REASONS[best] if best else "🎬 Popular pick"
+    return reasons
+
+
+async def trending_entries(limit: int) -> List[Tuple[CatalogEntry, float]]:
+    """Active movies by decayed trend score, topped up by hype when few have events"""
+    await catalog_snapshot.ensure_loaded()
+    entries = catalog_snapshot.entries
+    try:
+        # Over-fetch: halted or removed movies are skipped
+        ranked = await top_movies(limit * 2)
+    except Exception as e:
+        logger.error(f"Trending read error: {e}")
+        ranked = []
+
+    picked = []
+    for movie_id, score in ranked:
+        entry = entries.get(movie_id)
+        if entry is not None and entry.is_trading_active:
+            picked.append((entry, score))
+            if len(picked) == limit:
+                return picked
+    seen = {entry.id for entry, _ in picked}
+    for entry in catalog_snapshot.trending(limit * 2):
+        if entry.id not in seen:
+            picked.append((entry, 0.0))
+            if len(picked) == limit:
+                break
+    return picked
+
+
+async def changes_24h(db: AsyncSession, entries: List[CatalogEntry]) -> Dict[str, Tuple[float, float]]:
+    """(volume change %, hype change in points) against the snapshot from ~24h ago"""
+    if not entries:
+        return {}
+    result = await db.execute(
+        text("""
+            SELECT m.id, h.hype_score, h.volume_24h
+            FROM unnest(CAST(:movie_ids AS text[])) AS m(id)
+            CROSS JOIN LATERAL (
+                SELECT hype_score, volume_24h FROM market_history
+                WHERE movie_id = m.id AND recorded_at <= now() - interval '24 hours'
+                ORDER BY recorded_at DESC LIMIT 1
+            ) AS h
+        """),
+        {"movie_ids": [entry.id for entry in entries]}
+    )
+    previous = {row.id: row for row in result.all()}
+    changes = {}
+    for entry in entries:
+        row = previous.get(entry.id)
+        if row is None:
+            changes[entry.id] = (0.0, 0.0)
+            continue
+        volume_change = (entry.volume_24h - row.volume_24h) / row.volume_24h * 100 if row.volume_24h else 0.0
+        changes[entry.id] = (volume_change, entry.hype_score - (row.hype_score or 0.0))
+    return changes
+
+
+async def prune() -> int:
+    """Drop members whose decayed score fell below TRENDING_MIN_SCORE (scheduled job)"""
+    cutoff = log_weight(settings.TRENDING_MIN_SCORE, time.time())
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key in (SCORE_KEY, *SOURCE_KEYS.values()):
+            pipe.zremrangebyscore(key, "-inf", f"({cutoff!r}")
+        removed = await pipe.execute()
+    return removed[0]
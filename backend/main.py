@@ -5,14 +5,28 @@ Main FastAPI application entry point
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
-import uvicorn
+import asyncio
+import sys
 
 from app.core.config import settings
 from app.core.database import engine, Base
-from app.api.v1.api import api_router
-from app.core.cache import redis_client
+from app.api.v1.api import api_router, mount_lazy_endpoints
+from app.api.internal import internal_router
+from app.core.cache import redis_binary_client, redis_client
+from app.core.startup import fast_startup, recheck_until_ready
+from app.core.security import AuthContextMiddleware, token_verifier
+from app.services.market_snapshot import market_snapshot
+from app.services.catalog_snapshot import catalog_snapshot
+from app.services.memes import meme_renderer
+from app.services.nft_minting import minting_pipeline
+from app.services.price_board_updater import price_board_updater
+from app.services.settlement import settlement_pipeline
+from app.services.trade_partitions import ensure_partitions
+from app.core.scheduler import scheduler
+from app.services.jobs import register_jobs
 
 
 @asynccontextmanager
@@ -20,26 +34,85 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     print("🚀 Starting CineStox...")
+    app.state.ready = False
+    readiness_check = None
     
-    # Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    if settings.FAST_STARTUP:
+        # Verify migrations and pre-warm pools instead of create_all
+        problems = await fast_startup()
+        if problems:
+            print(f"❌ Not ready: {', '.join(problems)}")
+            # Keep checking: a transient outage at boot must not fail /ready for good
+            readiness_check = asyncio.create_task(recheck_until_ready(app))
+        else:
+            app.state.ready = True
+    else:
+        # Create database tables
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        
+        # Test Redis connection
+        try:
+            await redis_client.ping()
+            print("✅ Redis connected successfully")
+        except Exception as e:
+            print(f"❌ Redis connection failed: {e}")
+        
+        app.state.ready = True
     
-    # Test Redis connection
+    # Trades partitions must exist before the first insert
     try:
-        await redis_client.ping()
-        print("✅ Redis connected successfully")
+        await ensure_partitions()
     except Exception as e:
-        print(f"❌ Redis connection failed: {e}")
+        print(f"❌ Trades partition check failed: {e}")
     
-    print("🎬 CineStox is ready for trading!")
+    # Receive session revocations from other workers
+    token_verifier.start()
+    
+    # Pre-build the binary market board once per tick
+    market_snapshot.start()
+    
+    # In-process catalog for hot list endpoints, kept fresh by change notifications
+    catalog_snapshot.start()
+    
+    # Shared-memory price board; one worker per host publishes it
+    price_board_updater.start()
+    
+    # Group-commit settlement of executed trades
+    settlement_pipeline.start()
+    
+    # Batched NFT minting; requests only queue, this submits and confirms
+    minting_pipeline.start()
+    
+    # Periodic jobs (stats flush, hype decay, revaluation, expiry, ...)
+    if settings.SCHEDULER_ENABLED:
+        register_jobs(scheduler)
+        scheduler.start()
+    
+    if app.state.ready:
+        print("🎬 CineStox is ready for trading!")
     
     yield
     
     # Shutdown
     print("🛑 Shutting down CineStox...")
+    if readiness_check is not None:
+        readiness_check.cancel()
+    await token_verifier.stop()
+    await market_snapshot.stop()
+    await catalog_snapshot.stop()
+    await price_board_updater.stop()
+    await settlement_pipeline.stop()
+    await minting_pipeline.stop()
+    meme_renderer.stop()
+    # Only loaded (with NumPy) once a backtest has run in this worker
+    backtest = sys.modules.get("app.services.backtest")
+    if backtest is not None:
+        backtest.sweep_pool.stop()
+    await scheduler.stop()
     await engine.dispose()
     await redis_client.close()
+    await redis_binary_client.close()
 
 
 # Create FastAPI app
@@ -61,8 +134,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Local token verification (no Redis round trip to authenticate)
+app.add_middleware(AuthContextMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
+mount_lazy_endpoints(app, prefix="/api/v1")
+
+# Operational metrics (admins only)
+app.include_router(internal_router, prefix="/internal", tags=["Internal"])
 
 # Health check endpoint
 @app.get("/health")
@@ -75,6 +155,14 @@ async def health_check():
         "message": "🎬 Ready for some movie trading action!"
     }
 
+# Readiness endpoint
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check: migrations verified and connection pools warm"""
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -116,6 +204,8 @@ async def internal_error_handler(request, exc):
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
@@ -0,0 +1,34 @@
+"""
+CineStox AMM Tests
+Cached pools: never overwritten by an older version, and never kept forever
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.amm import _STORE_POOL_SCRIPT
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+
+def test_store_pool_keeps_the_newest_version_with_a_ttl():
+    async def scenario():
+        client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        store = client.register_script(_STORE_POOL_SCRIPT)
+        ttl = settings.AMM_POOL_CACHE_TTL
+
+        stored = [
+            await store(keys=["amm:pool:m1"], args=[100.0, 1000.0, 0.003, 2, ttl]),
+            await store(keys=["amm:pool:m1"], args=[90.0, 1111.0, 0.003, 1, ttl]),  # Late publish
+            await store(keys=["amm:pool:m1"], args=[95.0, 1052.0, 0.003, 3, ttl]),
+        ]
+        return stored, await client.hgetall("amm:pool:m1"), await client.ttl("amm:pool:m1")
+
+    stored, pool, ttl = asyncio.run(scenario())
+    assert stored == [1, 0, 1]
+    assert pool["version"] == "3" and float(pool["shares"]) == 95.0
+    # A fill whose publish failed is picked up from the movies row once this expires
+    assert 0 < ttl <= settings.AMM_POOL_CACHE_TTL
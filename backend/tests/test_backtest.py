@@ -0,0 +1,17 @@
+"""
+CineStox Backtest Tests
+Request windows are compared with aware history timestamps
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.schemas.backtest import BacktestWindow
+
+
+def test_window_is_utc():
+    window = BacktestWindow(start="2025-01-01T00:00:00", end="2025-01-02T05:30:00+05:30")
+    assert window.start == datetime(2025, 1, 1, tzinfo=timezone.utc)
+    assert window.end == datetime(2025, 1, 2, tzinfo=timezone.utc)
+    assert window.end.tzinfo is timezone.utc
+    # Comparable with timestamptz values from the history table
+    assert window.end - window.start == timedelta(days=1)
@@ -0,0 +1,94 @@
+"""
+CineStox Cache Tests
+Stampede protection in CacheManager.get_or_compute
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.cache import CacheManager
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+
+def _managers(count=1):
+    """Cache managers standing in for separate processes on one Redis"""
+    server = fakeredis.FakeServer()
+    return [
+        CacheManager(fakeredis.aioredis.FakeRedis(server=server, decode_responses=True),
+                     fakeredis.aioredis.FakeRedis(server=server))
+        for _ in range(count)
+    ]
+
+
+def _counting(value, delay=0.05):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return value
+    return compute, calls
+
+
+def test_concurrent_misses_compute_once():
+    (manager,) = _managers()
+    compute, calls = _counting({"rank": [1, 2, 3]})
+
+    async def scenario():
+        return await asyncio.gather(*(manager.get_or_compute("k", compute, ttl=60) for _ in range(20)))
+
+    assert asyncio.run(scenario()) == [{"rank": [1, 2, 3]}] * 20
+    assert len(calls) == 1
+
+
+def test_other_process_waits_for_the_lock_holder():
+    holder, waiter = _managers(2)
+    compute, calls = _counting("fresh", delay=0.2)
+
+    async def must_not_run():
+        raise AssertionError("the lock holder's result should be used")
+
+    async def scenario():
+        first = asyncio.create_task(holder.get_or_compute("k", compute, ttl=60))
+        await asyncio.sleep(0.05)
+        second = await waiter.get_or_compute("k", must_not_run, ttl=60)
+        return await first, second
+
+    assert asyncio.run(scenario()) == ("fresh", "fresh")
+    assert len(calls) == 1
+
+
+def test_hit_near_expiry_refreshes_in_background():
+    (manager,) = _managers()
+    old, old_calls = _counting("old", delay=0)
+    new, new_calls = _counting("new", delay=0)
+
+    async def scenario():
+        await manager.get_or_compute("k", old, ttl=60)
+        manager.beta = 1e9  # Every hit counts as close to expiry
+        served = await manager.get_or_compute("k", new, ttl=60)
+        await asyncio.gather(*manager._refreshes)
+        manager.beta = 0.0
+        return served, await manager.get_or_compute("k", new, ttl=60)
+
+    # The stale value is served while the refresh runs, then the new one
+    assert asyncio.run(scenario()) == ("old", "new")
+    assert len(old_calls) == len(new_calls) == 1
+
+
+def test_get_unwraps_the_envelope_and_none_is_not_cached():
+    (manager,) = _managers()
+    compute, _ = _counting([1, 2], delay=0)
+    nothing, nothing_calls = _counting(None, delay=0)
+
+    async def scenario():
+        await manager.get_or_compute("k", compute, ttl=60)
+        await manager.get_or_compute("missing", nothing, ttl=60)
+        await manager.get_or_compute("missing", nothing, ttl=60)
+        return await manager.get("k"), await manager.get("missing")
+
+    assert asyncio.run(scenario()) == ([1, 2], None)
+    assert len(nothing_calls) == 2
@@ -0,0 +1,29 @@
+"""
+CineStox Catalog Import Tests
+Dry runs over the TMDB fixture: parsing, transformation and batching
+"""
+
+import asyncio
+import os
+
+from app.services.catalog_import import import_tmdb_file, iter_batches
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "tmdb_sample.jsonl")
+
+
+def test_dry_run_counts():
+    stats = asyncio.run(import_tmdb_file(FIXTURE, batch_size=100, dry_run=True))
+    # One malformed line is not read; one record without an id is skipped;
+    # the repeated tmdb_id starts a new batch
+    assert stats == {"read": 9, "skipped": 1, "loaded": 8, "batches": 2}
+
+
+def test_dry_run_respects_batch_size():
+    stats = asyncio.run(import_tmdb_file(FIXTURE, batch_size=3, dry_run=True))
+    assert stats["loaded"] == 8
+    assert stats["batches"] == 3
+
+
+def test_batches_never_repeat_a_tmdb_id():
+    rows = [("a", 1), ("b", 2), ("c", 1), ("d", 3)]
+    assert list(iter_batches(rows, 10)) == [[("a", 1), ("b", 2)], [("c", 1), ("d", 3)]]
@@ -0,0 +1,92 @@
+"""
+CineStox FDFS Zone Tests
+Check-ins are attributed to the nearest theatre, and move with the fan
+"""
+
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.fdfs import CheckInRequest
+from app.services.fdfs_zones import THEATRES_KEY, _CHECK_IN_SCRIPT, _keys
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+# (longitude, latitude) of two Hyderabad theatres about 3 km apart
+PRASADS = (78.4735, 17.4126)
+SUDARSHAN = (78.4983, 17.4065)
+
+
+def _zones():
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    script = client.register_script(_CHECK_IN_SCRIPT)
+
+    async def check_in(user_id, longitude, latitude, excitement=5.0):
+        return await script(
+            keys=[THEATRES_KEY] + _keys("m1"),
+            args=[user_id, longitude, latitude, excitement, 2.0, settings.FDFS_CHECKIN_TTL]
+        )
+    return client, check_in
+
+
+async def _zone_totals(client):
+    _, hype_key, count_key, _ = _keys("m1")
+    return (dict(await client.zrange(hype_key, 0, -1, withscores=True)),
+            dict(await client.zrange(count_key, 0, -1, withscores=True)))
+
+
+def test_check_ins_count_towards_the_nearest_theatre():
+    async def scenario():
+        client, check_in = _zones()
+        await client.geoadd(THEATRES_KEY, [*PRASADS, "prasads", *SUDARSHAN, "sudarshan"])
+        zones = [
+            await check_in("u1", 78.4740, 17.4130, 8.0),
+            await check_in("u2", 78.4730, 17.4120, 6.0),
+            await check_in("u3", 78.4980, 17.4060, 4.0),
+        ]
+        return zones, await _zone_totals(client)
+
+    zones, (hype, counts) = asyncio.run(scenario())
+    assert zones == ["prasads", "prasads", "sudarshan"]
+    assert hype == {"prasads": 14.0, "sudarshan": 4.0}
+    assert counts == {"prasads": 2.0, "sudarshan": 1.0}
+
+
+def test_repeat_check_in_moves_the_fan():
+    async def scenario():
+        client, check_in = _zones()
+        await client.geoadd(THEATRES_KEY, [*PRASADS, "prasads", *SUDARSHAN, "sudarshan"])
+        await check_in("u1", 78.4740, 17.4130, 8.0)
+        moved = await check_in("u1", 78.4980, 17.4060, 9.0)
+        return moved, await _zone_totals(client)
+
+    moved, (hype, counts) = asyncio.run(scenario())
+    assert moved == "sudarshan"
+    # The old zone emptied out and is removed
+    assert hype == {"sudarshan": 9.0}
+    assert counts == {"sudarshan": 1.0}
+
+
+def test_no_theatre_in_range():
+    async def scenario():
+        client, check_in = _zones()
+        await client.geoadd(THEATRES_KEY, [*PRASADS, "prasads"])
+        await check_in("u1", 78.4740, 17.4130, 8.0)
+        # Vijayawada: far from every theatre, and leaves the previous zone
+        zone = await check_in("u1", 80.6480, 16.5062, 7.0)
+        user_zone = await client.hget(_keys("m1")[3], "u1")
+        return zone, user_zone, await _zone_totals(client)
+
+    zone, user_zone, (hype, counts) = asyncio.run(scenario())
+    assert zone is None
+    assert user_zone is None
+    assert hype == {} and counts == {}
+
+
+def test_latitudes_redis_cannot_index_are_rejected():
+    with pytest.raises(ValidationError):
+        CheckInRequest(latitude=89.0, longitude=0.0)
+    assert CheckInRequest(latitude=-85.05, longitude=0.0).latitude == -85.05
@@ -0,0 +1,63 @@
+"""
+CineStox Idempotency Tests
+Order retries replay the first result; the lock is released only by its owner
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.idempotency import IdempotencyConflict, IdempotencyStore
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+
+def _store():
+    return IdempotencyStore(fakeredis.aioredis.FakeRedis(decode_responses=True))
+
+
+def test_duplicates_execute_once():
+    calls = []
+
+    async def execute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"trade_id": "t1"}
+
+    async def scenario():
+        store = _store()
+        store.poll_interval = 0.01
+        payload = {"movie_id": "m1", "shares": 5}
+        # Concurrent duplicates wait for the first; a later retry reads the stored result
+        results = await asyncio.gather(*(store.run("u1", "k1", payload, execute) for _ in range(5)))
+        results.append(await store.run("u1", "k1", payload, execute))
+        return results
+
+    results = asyncio.run(scenario())
+    assert calls == [1]
+    assert results == [{"trade_id": "t1"}] * 6
+
+
+def test_key_reused_with_another_payload_conflicts():
+    async def execute():
+        return {"trade_id": "t1"}
+
+    async def scenario():
+        store = _store()
+        await store.run("u1", "k1", {"shares": 5}, execute)
+        await store.run("u1", "k1", {"shares": 6}, execute)
+
+    with pytest.raises(IdempotencyConflict):
+        asyncio.run(scenario())
+
+
+def test_lock_release_only_by_owner():
+    async def scenario():
+        store = _store()
+        await store.client.set("idem:lock:u1:k1", "other-token")
+        not_ours = await store._release_lock(keys=["idem:lock:u1:k1"], args=["my-token"])
+        ours = await store._release_lock(keys=["idem:lock:u1:k1"], args=["other-token"])
+        return not_ours, ours, await store.client.exists("idem:lock:u1:k1")
+
+    assert asyncio.run(scenario()) == (0, 1, 0)
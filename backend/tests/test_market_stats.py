@@ -0,0 +1,125 @@
+"""
+CineStox Market Stats Tests
+The rolling window scripts against a brute-force window over the same trades
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from app.services.market_stats import (
+    ACTIVE_KEY, _DEACTIVATE_SCRIPT, _RECORD_TRADE_SCRIPT, _WINDOW_SCRIPT, summarize
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+SLOTS = 6
+KEY = "movie:stats:m1"
+TTL = 3600
+
+
+class Ring:
+    """The stats scripts on a fake Redis, driven by explicit bucket numbers"""
+
+    def __init__(self):
+        self.client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        self.record = self.client.register_script(_RECORD_TRADE_SCRIPT)
+        self.window = self.client.register_script(_WINDOW_SCRIPT)
+        self.deactivate = self.client.register_script(_DEACTIVATE_SCRIPT)
+
+    async def trade(self, bucket, shares, price, is_buy=True, key=KEY, movie_id="m1"):
+        await self.record(keys=[key, ACTIVE_KEY],
+                          args=[bucket, SLOTS, movie_id, shares, price, 1 if is_buy else 0, TTL])
+
+    async def stats(self, bucket, key=KEY):
+        return summarize(await self.window(keys=[key], args=[bucket, SLOTS]))
+
+
+def _expected(trades, now):
+    live = [t for t in trades if t[0] > now - SLOTS]
+    if not live:
+        return {"trades": 0, "volume": 0.0, "open": None, "high": None, "low": None, "close": None}
+    return {
+        "trades": len(live),
+        "volume": pytest.approx(sum(shares * price for _, shares, price, _ in live)),
+        "open": live[0][2],
+        "high": max(t[2] for t in live),
+        "low": min(t[2] for t in live),
+        "close": live[-1][2],
+    }
+
+
+def test_window_totals_and_prices():
+    async def scenario():
+        ring = Ring()
+        await ring.trade(10, 5, 100.0, is_buy=True)
+        await ring.trade(10, 3, 104.0, is_buy=False)
+        await ring.trade(12, 2, 98.0, is_buy=True)
+        return await ring.stats(12)
+
+    stats = asyncio.run(scenario())
+    assert stats["trades"] == 3
+    assert stats["volume"] == pytest.approx(5 * 100 + 3 * 104 + 2 * 98)
+    assert stats["vwap"] == pytest.approx(stats["volume"] / 10)
+    assert stats["imbalance"] == pytest.approx((7 - 3) / 10)
+    assert (stats["open"], stats["high"], stats["low"], stats["close"]) == (100.0, 104.0, 98.0, 98.0)
+    assert stats["price_change_24h"] == pytest.approx(-2.0)
+
+
+def test_buckets_roll_out_of_the_window():
+    async def scenario():
+        ring = Ring()
+        await ring.trade(10, 1, 150.0)  # The window's high, until bucket 10 leaves
+        await ring.trade(12, 1, 90.0)
+        await ring.trade(13, 1, 120.0)
+        kept = await ring.stats(15)
+        rolled = await ring.stats(16)
+        empty = await ring.stats(30)
+        return kept, rolled, empty
+
+    kept, rolled, empty = asyncio.run(scenario())
+    assert (kept["trades"], kept["open"], kept["high"]) == (3, 150.0, 150.0)
+    assert (rolled["trades"], rolled["open"], rolled["high"], rolled["low"]) == (2, 90.0, 120.0, 90.0)
+    assert rolled["volume"] == pytest.approx(210.0)
+    assert empty["trades"] == 0 and empty["volume"] == 0.0
+    assert empty["open"] is None and empty["close"] is None
+
+
+def test_matches_a_brute_force_window():
+    rng = random.Random(7)
+
+    async def scenario():
+        for _ in range(10):
+            ring = Ring()
+            trades, bucket = [], 100
+            for _ in range(60):
+                bucket += rng.choice((0, 0, 1, 1, 2, 7))
+                trade = (bucket, rng.randint(1, 20), round(rng.uniform(50, 150), 2), rng.random() < 0.5)
+                await ring.trade(*trade)
+                trades.append(trade)
+                if rng.random() < 0.3:
+                    now = bucket + rng.randint(0, 3)
+                    stats = await ring.stats(now)
+                    expected = _expected(trades, now)
+                    assert {k: stats[k] for k in expected} == expected
+                    bucket = now
+
+    asyncio.run(scenario())
+
+
+def test_deactivate_drops_only_idle_movies():
+    async def scenario():
+        ring = Ring()
+        await ring.trade(10, 1, 100.0, key="movie:stats:old", movie_id="old")
+        await ring.trade(15, 1, 100.0, key="movie:stats:busy", movie_id="busy")
+        dropped = await ring.deactivate(
+            keys=[ACTIVE_KEY, "movie:stats:old", "movie:stats:busy", "movie:stats:gone"],
+            args=[17, SLOTS, "old", "busy", "gone"]
+        )
+        return dropped, await ring.client.smembers(ACTIVE_KEY)
+
+    dropped, active = asyncio.run(scenario())
+    assert dropped == 1
+    assert active == {"busy"}
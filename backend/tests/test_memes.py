@@ -0,0 +1,68 @@
+"""
+CineStox Meme Tests
+Price buckets decide when a cached meme can be reused; renders survive a dead pool process
+"""
+
+import asyncio
+import os
+import signal
+
+import pytest
+
+from app.core.config import settings
+from app.services.memes import MemeRenderer, build_spec, price_bucket
+
+
+@pytest.fixture(autouse=True)
+def one_percent_buckets(monkeypatch):
+    monkeypatch.setattr(settings, "MEME_PRICE_BUCKET_PCT", 1.0)
+
+
+def test_small_moves_share_a_bucket():
+    edge = price_bucket(100.0)
+    assert price_bucket(edge * 1.001) == price_bucket(edge * 1.008) == edge
+
+
+def test_buckets_are_one_step_apart():
+    low = price_bucket(100.0)
+    high = price_bucket(low * 1.011)
+    assert high / low == pytest.approx(1.01, abs=0.001)
+
+
+def test_bucket_never_exceeds_price():
+    for price in (0.37, 1.0, 99.99, 123.45, 5000.0):
+        assert price_bucket(price) <= price + 0.005
+
+
+def test_non_positive_prices():
+    assert price_bucket(0) == 0.0
+    assert price_bucket(-5) == 0.0
+
+
+def test_render_recovers_from_a_dead_process(tmp_path, monkeypatch):
+    pytest.importorskip("PIL")
+    cache_dir = str(tmp_path / "memes")
+    monkeypatch.setattr(settings, "MEME_CACHE_DIR", cache_dir)
+    monkeypatch.setattr(settings, "MEME_RENDER_WORKERS", 1)
+    # Spawned render processes read their settings from the environment
+    monkeypatch.setenv("MEME_CACHE_DIR", cache_dir)
+    monkeypatch.setenv("MEME_TEMPLATE_DIR", str(tmp_path / "templates"))
+    renderer = MemeRenderer()
+
+    async def run():
+        first = await renderer.get(build_spec("stonks", "RRR", "RRR", None, 100.0, "🚀"))
+        with open(first, "rb") as image:
+            assert image.read(8) == b"\x89PNG\r\n\x1a\n"
+        assert await renderer.get(build_spec("stonks", "RRR", "RRR", None, 100.0, "🚀")) == first
+
+        for process in list(renderer._pool._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+        second = await renderer.get(build_spec("not_stonks", "RRR", "RRR", None, 50.0, "📉"))
+        assert os.path.exists(second) and second != first
+
+    try:
+        asyncio.run(run())
+    finally:
+        renderer.stop()
+    assert renderer.metrics["hits"] == 1
+    assert renderer.metrics["renders"] == 2
@@ -0,0 +1,114 @@
+"""
+CineStox Price Board Tests
+One writer publishes into shared memory; separate handles read it back
+"""
+
+import math
+import time
+import uuid
+from multiprocessing import shared_memory
+
+import pytest
+
+from app.core.config import settings
+from app.core.price_board import HEADER_SIZE, SEQ, PriceBoard
+
+
+@pytest.fixture
+def board_name(monkeypatch):
+    monkeypatch.setattr(settings, "PRICE_BOARD_ENABLED", True)
+    name = f"cinestox_test_{uuid.uuid4().hex[:8]}"
+    yield name
+    # A plain attach registers with the resource tracker, which unlink then clears
+    segment = shared_memory.SharedMemory(name)
+    segment.close()
+    segment.unlink()
+
+
+def test_reader_sees_published_quotes(board_name):
+    writer = PriceBoard(board_name, capacity=4)
+    writer.create()
+    expires = time.time() + 60
+    writer.publish([
+        ("movie-1", 101.5, 110.0, 95.0, 2500.0, expires),
+        ("movie-2", 42.0, math.nan, math.nan, math.nan, expires),
+    ])
+
+    reader = PriceBoard(board_name)
+    quotes = reader.get_quotes(["movie-1", "movie-2", "movie-3"])
+    assert quotes["movie-1"] == {"price": 101.5, "high_24h": 110.0, "low_24h": 95.0, "volume_24h": 2500.0}
+    # NaN marks stats the updater did not have
+    assert quotes["movie-2"] == {"price": 42.0, "high_24h": None, "low_24h": None, "volume_24h": None}
+    assert "movie-3" not in quotes
+    # The reader's capacity comes from the board header
+    assert reader.capacity == 4
+
+    writer.publish([("movie-1", 103.0, 110.0, 95.0, 2600.0, expires)])
+    assert reader.get_prices(["movie-1"]) == {"movie-1": 103.0}
+    reader.close()
+    writer.close()
+
+
+def test_expired_rows_and_full_board(board_name):
+    writer = PriceBoard(board_name, capacity=2)
+    writer.create()
+    now = time.time()
+    written = writer.publish([
+        ("fresh", 10.0, 10.0, 10.0, 0.0, now + 60),
+        ("expired", 20.0, 20.0, 20.0, 0.0, now - 1),
+        ("overflow", 30.0, 30.0, 30.0, 0.0, now + 60),
+    ])
+    assert written == 2
+
+    reader = PriceBoard(board_name)
+    assert reader.get_prices(["fresh", "expired", "overflow"]) == {"fresh": 10.0}
+    reader.close()
+    writer.close()
+
+
+def test_read_ignores_slot_of_another_movie(board_name):
+    writer = PriceBoard(board_name, capacity=2)
+    writer.create()
+    expires = time.time() + 60
+    writer.publish([("movie-1", 10.0, 10.0, 10.0, 0.0, expires)])
+    reader = PriceBoard(board_name)
+    assert reader.get_prices(["movie-1"]) == {"movie-1": 10.0}
+
+    # Re-created with another movie in slot 0, before the reader re-indexes
+    writer.create()
+    writer.publish([("movie-2", 20.0, 20.0, 20.0, 0.0, expires)])
+    assert reader.read("movie-1") is None
+    assert reader.get_prices(["movie-1", "movie-2"]) == {"movie-2": 20.0}
+    reader.close()
+    writer.close()
+
+
+def test_takeover_after_writer_died_mid_write(board_name):
+    writer = PriceBoard(board_name, capacity=2)
+    writer.create()
+    expires = time.time() + 60
+    writer.publish([("m1", 10.0, 10.0, 10.0, 0.0, expires)])
+    # Killed between the two seq writes of slot 0: seq is left odd
+    seq = SEQ.unpack_from(writer._buf, HEADER_SIZE)[0]
+    SEQ.pack_into(writer._buf, HEADER_SIZE, seq + 1)
+    writer.close()
+
+    successor = PriceBoard(board_name, capacity=2)
+    successor.create()
+    reader = PriceBoard(board_name)
+    for tick in range(3):
+        successor.publish([("m1", 11.0 + tick, 11.0, 10.0, 0.0, expires)])
+        assert reader.get_prices(["m1"]) == {"m1": 11.0 + tick}
+    reader.close()
+    successor.close()
+
+
+def test_stale_heartbeat_falls_back(board_name, monkeypatch):
+    writer = PriceBoard(board_name, capacity=2)
+    writer.create()
+    writer.publish([("movie-1", 10.0, 10.0, 10.0, 0.0, time.time() + 60)])
+    monkeypatch.setattr(settings, "PRICE_BOARD_MAX_AGE_SECONDS", -1.0)
+
+    reader = PriceBoard(board_name)
+    assert reader.get_quotes(["movie-1"]) == {}
+    writer.close()
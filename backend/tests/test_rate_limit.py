@@ -0,0 +1,91 @@
+"""
+CineStox Admission Control Tests
+Token buckets and the in-flight cap, run through the real Lua script
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.rate_limit import INFLIGHT_KEY, AdmissionController
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_PER_SECOND", 0.001)
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_BURST", 3)
+    monkeypatch.setattr(settings, "RATE_LIMIT_IP_PER_SECOND", 0.001)
+    monkeypatch.setattr(settings, "RATE_LIMIT_IP_BURST", 5)
+    monkeypatch.setattr(settings, "MAX_CONCURRENT_TRADES", 100)
+
+
+async def _admit_many(controller, count, user_id="u1", ip="10.0.0.1"):
+    """Admit up to ``count`` requests (released at once); returns how many got in and the first error"""
+    for admitted in range(count):
+        try:
+            token = await controller.admit(user_id, ip)
+        except HTTPException as e:
+            return admitted, e
+        await controller.release(token)
+    return count, None
+
+
+def test_user_bucket_allows_burst_then_429(limits):
+    async def scenario():
+        controller = AdmissionController(fakeredis.aioredis.FakeRedis(decode_responses=True))
+        return await _admit_many(controller, 10)
+
+    admitted, error = asyncio.run(scenario())
+    assert admitted == 3
+    assert error.status_code == 429
+    assert int(error.headers["Retry-After"]) >= 1
+
+
+def test_ip_bucket_is_shared_across_users(limits):
+    async def scenario():
+        controller = AdmissionController(fakeredis.aioredis.FakeRedis(decode_responses=True))
+        first, _ = await _admit_many(controller, 3, user_id="u1")
+        second, error = await _admit_many(controller, 3, user_id="u2")
+        return first + second, error
+
+    admitted, error = asyncio.run(scenario())
+    assert admitted == 5
+    assert error.status_code == 429
+
+
+def test_refused_request_consumes_no_tokens(limits, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_IP_BURST", 1)
+
+    async def scenario():
+        client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        controller = AdmissionController(client)
+        await _admit_many(controller, 2, user_id="u1")
+        return float(await client.hget("ratelimit:user:u1", "tokens"))
+
+    # Only the admitted request took a user token; the IP refusal did not
+    assert asyncio.run(scenario()) == pytest.approx(2, abs=0.01)
+
+
+def test_inflight_cap_sheds_with_503(limits, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_CONCURRENT_TRADES", 2)
+
+    async def scenario():
+        client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        # Two workers share the cluster-wide cap; each is under its local cap
+        workers = [AdmissionController(client), AdmissionController(client)]
+        token = await workers[0].admit("u1", "10.0.0.1")
+        await workers[1].admit("u2", "10.0.0.2")
+        with pytest.raises(HTTPException) as shed:
+            await workers[1].admit("u3", "10.0.0.3")
+        await workers[0].release(token)
+        await workers[1].admit("u3", "10.0.0.3")
+        return shed.value, await client.zcard(INFLIGHT_KEY)
+
+    shed, inflight = asyncio.run(scenario())
+    assert shed.status_code == 503
+    assert inflight == 2
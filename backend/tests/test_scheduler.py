@@ -0,0 +1,109 @@
+"""
+CineStox Scheduler Tests
+Cron parsing, and one replica per occurrence and per running job
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.core.scheduler import CronSchedule, Job, Scheduler, _parse_cron_field
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("field, low, high, values", [
+    ("*", 0, 5, {0, 1, 2, 3, 4, 5}),
+    ("*/15", 0, 59, {0, 15, 30, 45}),
+    ("10-20/5", 0, 59, {10, 15, 20}),
+    ("5/20", 0, 59, {5, 25, 45}),  # From 5 to the top of the range
+    ("1,3,8-9", 0, 23, {1, 3, 8, 9}),
+])
+def test_cron_fields(field, low, high, values):
+    assert _parse_cron_field(field, low, high) == values
+
+
+@pytest.mark.parametrize("expression", ["60 * * * *", "* 5-2 * * *", "* * 0 * *", "* * * *"])
+def test_invalid_cron_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_weekday_ranges_and_sunday():
+    weekdays = CronSchedule("0 9 * * 1-5")
+    # Saturday 2026-10-17 -> Monday 09:00
+    assert weekdays.next_after(_utc(2026, 10, 17, 12, 0)) == _utc(2026, 10, 19, 9, 0)
+    assert weekdays.next_after(_utc(2026, 10, 19, 9, 0)) == _utc(2026, 10, 20, 9, 0)
+    # 0 and 7 are both Sunday
+    assert CronSchedule("30 6 * * 7").next_after(_utc(2026, 10, 19)) == _utc(2026, 10, 25, 6, 30)
+    assert CronSchedule("30 6 * * 0").weekdays == {0}
+
+
+def test_day_or_weekday_when_both_are_restricted():
+    # The 13th, or any Friday, whichever comes first
+    schedule = CronSchedule("0 0 13 * 5")
+    assert schedule.next_after(_utc(2026, 10, 19)) == _utc(2026, 10, 23)
+    assert schedule.next_after(_utc(2026, 11, 9)) == _utc(2026, 11, 13)
+
+
+def test_cron_rolls_over_months_and_years():
+    assert CronSchedule("0 0 1 1 *").next_after(_utc(2026, 6, 15, 8, 30)) == _utc(2027, 1, 1)
+    assert CronSchedule("*/20 * * * *").next_after(_utc(2026, 12, 31, 23, 59)) == _utc(2027, 1, 1)
+
+
+def test_interval_occurrences_are_aligned():
+    job = Job("flush", lambda: None, interval=60)
+    assert job.next_occurrence(1_000_030.5) == 1_000_080
+    assert job.period == 60
+
+
+def _replicas(count):
+    server = fakeredis.FakeServer()
+    return [Scheduler(fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)) for _ in range(count)]
+
+
+def test_each_occurrence_is_claimed_once():
+    async def scenario():
+        replicas = _replicas(3)
+        jobs = [replica.add_interval("flush", 60, asyncio.sleep) for replica in replicas]
+        first = [await replica._claim(job, 1_000_080) for replica, job in zip(replicas, jobs)]
+        second = [await replica._claim(job, 1_000_140) for replica, job in zip(replicas, jobs)]
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == [True, False, False]
+    assert second == [True, False, False]
+
+
+def test_running_lease_is_exclusive_and_renewed(monkeypatch):
+    # The lease would expire mid-run if it were not renewed
+    monkeypatch.setattr(settings, "SCHEDULER_LEASE_MS", 150)
+    runs = []
+
+    async def slow_job():
+        runs.append(1)
+        await asyncio.sleep(0.4)
+
+    async def scenario():
+        first, second = _replicas(2)
+        job_a = first.add_interval("revalue", 60, slow_job)
+        job_b = second.add_interval("revalue", 60, slow_job)
+        running = asyncio.create_task(first.run_job(job_a))
+        await asyncio.sleep(0.3)
+        overlapped = await second.run_job(job_b)
+        finished = await running
+        # Released when the run ends
+        after = await second.run_job(job_b)
+        return overlapped, finished, after, job_b.metrics["skipped"]
+
+    overlapped, finished, after, skipped = asyncio.run(scenario())
+    assert (overlapped, finished, after) == (False, True, True)
+    assert skipped == 1
+    assert len(runs) == 2
@@ -0,0 +1,38 @@
+"""
+CineStox Settlement Tests
+Which trades a batch may apply to a position
+"""
+
+# Every model module, so the mappers' relationships resolve
+from app.models import ledger, market, movie, nft, tournament, user  # noqa: F401
+from app.models.trading import Trade, TradeType
+from app.services.settlement import _new_position, apply_to_position, oversells
+
+
+def _trade(trade_type: TradeType, shares: int, price: float = 10.0) -> Trade:
+    return Trade(user_id="u", movie_id="m", trade_type=trade_type, shares=shares,
+                 execution_price=price, total_amount=shares * price)
+
+
+def test_closing_trades_need_the_shares():
+    position = _new_position("u", "m")
+    assert oversells(None, _trade(TradeType.SELL, 1))
+    assert oversells(position, _trade(TradeType.COVER, 1))
+    assert not oversells(None, _trade(TradeType.BUY, 5))
+    assert not oversells(None, _trade(TradeType.SHORT, 5))
+
+    apply_to_position(position, _trade(TradeType.BUY, 5))
+    assert not oversells(position, _trade(TradeType.SELL, 5))
+    assert oversells(position, _trade(TradeType.SELL, 6))
+
+
+def test_concurrent_sells_are_checked_in_order():
+    position = _new_position("u", "m")
+    apply_to_position(position, _trade(TradeType.BUY, 5))
+    first, second = _trade(TradeType.SELL, 4), _trade(TradeType.SELL, 4)
+
+    assert not oversells(position, first)
+    apply_to_position(position, first)
+    # Validated against the same holding, but only one shares' worth is left
+    assert oversells(position, second)
+    assert position.shares_owned == 1
@@ -0,0 +1,87 @@
+"""
+CineStox Startup Tests
+Fast-startup mode must not import the heavy analytics and imaging libraries,
+and failed readiness checks are retried
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("numpy", "pandas", "pyarrow", "PIL")
+
+# Modules main.py imports for its lifespan (everything except the API router)
+LIFESPAN_MODULES = (
+    "app.api.internal",
+    "app.core.scheduler",
+    "app.core.security",
+    "app.core.startup",
+    "app.services.catalog_snapshot",
+    "app.services.jobs",
+    "app.services.market_snapshot",
+    "app.services.memes",
+    "app.services.nft_minting",
+    "app.services.price_board_updater",
+    "app.services.settlement",
+    "app.services.trade_partitions",
+)
+
+_PROBE = """
+import sys
+try:
+    for module in {modules!r}:
+        __import__(module)
+except ModuleNotFoundError as e:
+    print("missing:" + (e.name or ""))
+else:
+    print("loaded:" + ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def heavy_modules_after_import(*modules):
+    """Heavy modules loaded by importing `modules` in a fresh FAST_STARTUP interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(modules=modules, heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "FAST_STARTUP": "1"},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    status, _, names = result.stdout.strip().splitlines()[-1].partition(":")
+    if status == "missing":
+        # A heavy module that is imported but not installed still counts as loaded
+        if names.split(".")[0] in HEAVY_MODULES:
+            return [names.split(".")[0]]
+        pytest.skip(f"{names} is not available in this environment")
+    return [name for name in names.split(",") if name]
+
+
+def test_lifespan_modules_skip_heavy_imports():
+    assert heavy_modules_after_import(*LIFESPAN_MODULES) == []
+
+
+def test_main_skips_heavy_imports():
+    assert heavy_modules_after_import("main") == []
+
+
+def test_readiness_is_rechecked_until_it_passes(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.core import startup
+
+    outcomes = [["database unreachable"], ["redis unreachable"], []]
+
+    async def flaky_fast_startup():
+        return outcomes.pop(0)
+
+    monkeypatch.setattr(startup, "fast_startup", flaky_fast_startup)
+    app = SimpleNamespace(state=SimpleNamespace(ready=False))
+    asyncio.run(asyncio.wait_for(startup.recheck_until_ready(app, interval=0.01), timeout=5))
+    assert app.state.ready
+    assert outcomes == []
@@ -0,0 +1,19 @@
+"""
+CineStox Tournament Tests
+Elimination round sizing
+"""
+
+import pytest
+
+from app.services.tournaments import survivors_after
+
+
+@pytest.mark.parametrize("participants, fraction, survivors", [
+    (100, 0.5, 50),
+    (10, 0.25, 8),   # floor(2.5) eliminated
+    (3, 0.1, 2),     # at least one goes out
+    (2, 0.9, 1),     # at least one stays
+    (1, 0.5, 1),
+])
+def test_survivors_after(participants, fraction, survivors):
+    assert survivors_after(participants, fraction) == survivors
@@ -0,0 +1,41 @@
+"""
+CineStox Trending Tests
+Log-space decayed scores: stored once, compared at any time
+"""
+
+import math
+
+import pytest
+
+from app.core.config import settings
+from app.services.trending import EPOCH, _RECORD_SCRIPT, decayed, log_weight
+
+
+def test_weight_halves_every_half_life():
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    at = EPOCH + 1_000_000
+    stored = log_weight(8.0, at)
+    assert decayed(stored, at) == pytest.approx(8.0)
+    assert decayed(stored, at + half_life) == pytest.approx(4.0)
+    assert decayed(stored, at + 3 * half_life) == pytest.approx(1.0)
+
+
+def test_order_is_stable_over_time():
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    old = log_weight(10.0, EPOCH + 1_000_000)
+    new = log_weight(6.0, EPOCH + 1_000_000 + half_life)
+    # Stored scores never change, yet rank as their decayed values do
+    assert new > old
+    assert decayed(new, EPOCH + 2_000_000) > decayed(old, EPOCH + 2_000_000)
+
+
+def test_record_script_adds_weights_in_log_space():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    client = fakeredis.FakeRedis(decode_responses=True)
+    record = client.register_script(_RECORD_SCRIPT)
+    at = EPOCH + 1_000_000
+    record(keys=["total", "source"], args=["m1", repr(log_weight(3.0, at)), "m1", repr(log_weight(5.0, at))])
+    for key in ("total", "source"):
+        assert decayed(client.zscore(key, "m1"), at) == pytest.approx(8.0)
+    assert math.isclose(client.zscore("total", "m1"), log_weight(8.0, at))